@@ -2,4 +2,13 @@ from .mixins import CustomModelView
 
 
 class TelegramUserView(CustomModelView):
-    pass
+    # Цепочка спонсоров хранится в таблице замыкания telegram_user_ancestors,
+    # которая заполняется при регистрации в боте, поэтому пользователи
+    # не создаются из админки, а спонсор и user_id не редактируются
+    can_create = False
+    form_excluded_columns = [
+        "user_id",
+        "sponsor",
+        "sponsor_user_id",
+        "invited_users",
+    ]
@@ -16,4 +16,10 @@ app.autodiscover_tasks(
     ]
 )
 
-app.conf.timezone = "Europe/Moscow"
\ No newline at end of file
+app.conf.timezone = "Europe/Moscow"
+app.conf.beat_schedule = {
+    "cancel-expired-donates": {
+        "task": "app.tasks.donate.cancel_expired_donates_task",
+        "schedule": settings.expired_donates_sweep_interval_seconds,
+    },
+}
\ No newline at end of file
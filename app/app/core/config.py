@@ -18,6 +18,11 @@ def field_validator(param, mode):
     pass
 
 
+class CacheBackend(str, Enum):
+    MEMORY = "memory"
+    REDIS = "redis"
+
+
 class Settings(BaseSettings):
     """Настройки проекта"""
 
@@ -33,10 +38,35 @@ class Settings(BaseSettings):
     donates_channel_link: str = Field(title="Ссылка на канал с донатами")
     web_app_link: str = Field(title="Ссылка на web app")
     message_per_second: float = Field(title="Кол-во сообщений в секунду", default=1)
+    callback_rate_limit: int = Field(title="Кол-во нажатий кнопок за окно", default=5)
+    callback_rate_window_seconds: float = Field(
+        title="Окно ограничения нажатий кнопок в секундах", default=1
+    )
+    donate_rate_limit: int = Field(title="Кол-во нажатий кнопок подарка за окно", default=1)
+    donate_rate_window_seconds: float = Field(
+        title="Окно ограничения нажатий кнопок подарка в секундах", default=5
+    )
+    throttling_memory_maxsize: int = Field(
+        title="Максимальное кол-во ключей ограничения частоты в памяти",
+        default=100_000,
+    )
     support_username: str = Field(title="Username аккаунта поддержки")
     log_level: LogLevel = Field(title="Уровень логирования", default=LogLevel.INFO)
     # endregion
 
+    # region Настройки webhook
+    webhook_url: str | None = Field(
+        title="Публичный адрес бота для webhook (https://...)", default=None
+    )
+    webhook_path: str = Field(title="Путь webhook", default="/webhook")
+    webhook_secret: str | None = Field(
+        title="Секретный токен webhook (X-Telegram-Bot-Api-Secret-Token)", default=None
+    )
+    webhook_host: str = Field(title="Хост веб-сервера webhook", default="0.0.0.0")
+    webhook_port: int = Field(title="Порт веб-сервера webhook", default=8080)
+    webhook_workers: int = Field(title="Кол-во процессов веб-сервера webhook", default=4)
+    # endregion
+
     debug: bool = Field(title="Режим отладки", default=True)
     secret_key: str = Field(
         title="Секретный ключ", default_factory=lambda: secrets.token_hex(16)
@@ -48,6 +78,11 @@ class Settings(BaseSettings):
     postgres_host: str = Field(title="Хост БД")
     postgres_port: int = Field(title="Порт ДБ", default="5432")
     postgres_db: str = Field(title="Название БД")
+    postgres_pool_size: int = Field(title="Кол-во постоянных соединений пула БД", default=5)
+    postgres_max_overflow: int = Field(
+        title="Кол-во дополнительных соединений пула БД сверх postgres_pool_size",
+        default=10,
+    )
     # endregion
 
     # region Настройки RabbitMQ
@@ -58,6 +93,14 @@ class Settings(BaseSettings):
     # region Настройки Redis
     redis_host: str = Field(title="Хост redis", default="redis")
     redis_port: int | str = Field(title="Порт redis", default=6379)
+    fsm_ttl_seconds: int = Field(
+        title="Время хранения состояний форм (FSM) в секундах",
+        default=24 * 60 * 60,
+    )
+    cache_backend: CacheBackend = Field(
+        title="Хранилище кэша (memory - в памяти процесса, redis - общий)",
+        default=CacheBackend.MEMORY,
+    )
     # endregion
 
     # region wallet
@@ -72,9 +115,49 @@ class Settings(BaseSettings):
         title="Время на подтверждение доната в минутах",
         default=45,
     )
-    check_is_matrix_free_with_donates_minutes_interval: int = Field(
-        title="Интервал проверки свободна ли матрица для доната",
-        default=5,
+    expired_donates_sweep_interval_seconds: int = Field(
+        title="Интервал отмены неподтвержденных донатов в секундах",
+        default=60,
+    )
+    celery_async_tasks_concurrency: int = Field(
+        title="Максимальное кол-во одновременно выполняемых корутин в celery воркере",
+        default=100,
+    )
+    celery_pool_stats_log_interval: int = Field(
+        title="Раз во сколько выполненных задач логировать состояние пула соединений БД",
+        default=1000,
+    )
+    statistic_cache_ttl_seconds: int = Field(
+        title="Время хранения статистики админ-панели в секундах",
+        default=30,
+    )
+    ban_cache_ttl_seconds: int = Field(
+        title="Время хранения флага блокировки пользователя в секундах",
+        default=60,
+    )
+    ban_cache_maxsize: int = Field(
+        title="Максимальное кол-во пользователей в кэше блокировок в памяти",
+        default=100_000,
+    )
+    subscription_member_cache_ttl_seconds: int = Field(
+        title="Время хранения подписки пользователя на чат в секундах",
+        default=600,
+    )
+    subscription_not_member_cache_ttl_seconds: int = Field(
+        title="Время хранения отсутствия подписки на чат в секундах",
+        default=60,
+    )
+    subscription_cache_maxsize: int = Field(
+        title="Максимальное кол-во пользователей в кэше подписок в памяти",
+        default=100_000,
+    )
+    broadcast_messages_per_second: float = Field(
+        title="Максимальное кол-во сообщений рассылки в секунду",
+        default=25,
+    )
+    broadcast_workers_count: int = Field(
+        title="Кол-во одновременных отправок рассылки",
+        default=10,
     )
 
     @computed_field
@@ -91,6 +174,13 @@ class Settings(BaseSettings):
             path=f"{self.postgres_db}",
         )
 
+    @computed_field
+    @property
+    def postgres_async_url(self) -> str:
+        return str(self.postgres_url).replace(
+            "postgresql://", "postgresql+asyncpg://", 1
+        )
+
     @computed_field
     @property
     def rabbitmq_url(self) -> str:
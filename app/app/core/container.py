@@ -1,24 +1,31 @@
 from dependency_injector import containers, providers
+from redis.asyncio import Redis
 
 from app.core.config import Settings
-from app.db.session import SyncSession
+from app.db.session import AsyncScopedSession
 from app.repositories.donate import RepositoryDonate, RepositoryDonateTransaction
 
 from app.repositories.telegram_user import RepositoryTelegramUser
 from app.repositories.admin_user import RepositoryAdminUser
-from app.repositories.matrix import RepositoryMatrix
+from app.repositories.matrix import RepositoryMatrix, RepositoryMatrixWaitlist, RepositoryAdminMatrixPool
 from app.repositories.transaction import RepositoryTransaction
 
 from app.models.telegram_user import TelegramUser
 from app.models.admin_user import AdminUser
 from app.models.donate import Donate, DonateTransaction
-from app.models.matrix import Matrix
+from app.models.matrix import Matrix, MatrixWaitlist, AdminMatrixPool
 from app.models.transaction import Transaction
 from app.services.donate_confirm_service import DonateConfirmService
 
 from app.services.telegram_user_service import TelegramUserService
 from app.services.matrix_service import MatrixService
+from app.services.admin_matrix_pool_service import AdminMatrixPoolService
+from app.services.matrix_occupancy_service import MatrixOccupancyService
 from app.services.donate_service import DonateService
+from app.services.statistic_service import StatisticService
+from app.services.subscription_service import SubscriptionService
+from app.utils.cache import MemoryCache, RedisCache
+from app.utils.throttling import MemoryThrottlingBackend, RedisThrottlingBackend
 
 
 class Container(containers.DeclarativeContainer):
@@ -30,15 +37,51 @@ class Container(containers.DeclarativeContainer):
             "app.handlers.ban_user",
             "app.handlers.referral_message",
             "app.middlewares.ban_user",
+            "app.middlewares.current_user",
             "app.middlewares.subscriptions",
             "app.tasks.donate",
+            "app.db.commit_decorator",
             "app.utils.excel",
         ]
     )
 
     config = providers.Singleton(Settings)
-    db = providers.Singleton(SyncSession, db_url=config.provided.postgres_url)
-    session = providers.Factory(db().create_session)
+    db = providers.Singleton(
+        AsyncScopedSession,
+        db_url=config.provided.postgres_async_url,
+        pool_size=config.provided.postgres_pool_size,
+        max_overflow=config.provided.postgres_max_overflow,
+    )
+    session = providers.Factory(db.provided.create_session.call())
+    redis = providers.Singleton(Redis.from_url, url=config.provided.redis_url)
+
+    # region cache
+    subscription_cache = providers.Selector(
+        config.provided.cache_backend.value,
+        memory=providers.Singleton(
+            MemoryCache, maxsize=config.provided.subscription_cache_maxsize
+        ),
+        redis=providers.Singleton(
+            RedisCache, redis=redis, prefix="chat_member"
+        ),
+    )
+    ban_cache = providers.Selector(
+        config.provided.cache_backend.value,
+        memory=providers.Singleton(
+            MemoryCache, maxsize=config.provided.ban_cache_maxsize
+        ),
+        redis=providers.Singleton(
+            RedisCache, redis=redis, prefix="is_banned"
+        ),
+    )
+    throttling_backend = providers.Selector(
+        config.provided.cache_backend.value,
+        memory=providers.Singleton(
+            MemoryThrottlingBackend, maxsize=config.provided.throttling_memory_maxsize
+        ),
+        redis=providers.Singleton(RedisThrottlingBackend, redis=redis),
+    )
+    # endregion
 
     # region repository
     repository_telegram_user = providers.Singleton(
@@ -50,6 +93,12 @@ class Container(containers.DeclarativeContainer):
     repository_matrix = providers.Singleton(
         RepositoryMatrix, model=Matrix, session=session
     )
+    repository_matrix_waitlist = providers.Singleton(
+        RepositoryMatrixWaitlist, model=MatrixWaitlist, session=session
+    )
+    repository_admin_matrix_pool = providers.Singleton(
+        RepositoryAdminMatrixPool, model=AdminMatrixPool, session=session
+    )
     repository_wallet_recharge = providers.Singleton(
         RepositoryTransaction, model=Transaction, session=session
     )
@@ -67,18 +116,36 @@ class Container(containers.DeclarativeContainer):
 
     # region services
     telegram_user_service = providers.Singleton(
-        TelegramUserService, repository_telegram_user=repository_telegram_user
+        TelegramUserService,
+        repository_telegram_user=repository_telegram_user,
+        ban_cache=ban_cache,
+        ban_cache_ttl_seconds=config.provided.ban_cache_ttl_seconds,
+    )
+    matrix_occupancy_service = providers.Singleton(
+        MatrixOccupancyService,
+        repository_matrix=repository_matrix,
+        repository_donate=repository_donate,
+    )
+    admin_matrix_pool_service = providers.Singleton(
+        AdminMatrixPoolService,
+        repository_admin_matrix_pool=repository_admin_matrix_pool,
+        repository_matrix=repository_matrix,
+        repository_telegram_user=repository_telegram_user,
+        matrix_occupancy_service=matrix_occupancy_service,
     )
     matrix_service = providers.Singleton(
         MatrixService,
         repository_matrix=repository_matrix,
         repository_telegram_user=repository_telegram_user,
+        admin_matrix_pool_service=admin_matrix_pool_service,
     )
     donate_service = providers.Singleton(
         DonateService,
         repository_telegram_user=repository_telegram_user,
         repository_matrix=repository_matrix,
-        repository_donate=repository_donate,
+        repository_matrix_waitlist=repository_matrix_waitlist,
+        admin_matrix_pool_service=admin_matrix_pool_service,
+        matrix_occupancy_service=matrix_occupancy_service,
     )
     donate_confirm_service = providers.Singleton(
         DonateConfirmService,
@@ -86,4 +153,16 @@ class Container(containers.DeclarativeContainer):
         repository_donate_transaction=repository_donate_transaction,
         repository_telegram_user=repository_telegram_user,
     )
+    subscription_service = providers.Singleton(
+        SubscriptionService,
+        cache=subscription_cache,
+        chat_id=config.provided.chat_id,
+        member_ttl_seconds=config.provided.subscription_member_cache_ttl_seconds,
+        not_member_ttl_seconds=config.provided.subscription_not_member_cache_ttl_seconds,
+    )
+    statistic_service = providers.Singleton(
+        StatisticService,
+        repository_telegram_user=repository_telegram_user,
+        cache_ttl_seconds=config.provided.statistic_cache_ttl_seconds,
+    )
     # endregion
@@ -1,23 +1,55 @@
 from functools import wraps
+from typing import Any, Callable
 
-from dependency_injector.wiring import inject
+from dependency_injector.wiring import inject, Provide
 
 from app.core.container import Container
 
 
+@inject
+def get_session(session=Provide[Container.session]):
+    """
+    Сессия экземпляра Container, связанного с модулем (Container().wire),
+    та же, что у репозиториев его сервисов.
+    """
+    return session
+
+
+def call_after_commit(callback: Callable[[], Any]) -> None:
+    """
+    Вызов callback после commit сессии текущей задачи
+    (commit_and_close_session, SQLAlchemySessionMiddleware).
+    При откате транзакции callback не вызывается.
+    """
+    get_session().info.setdefault("after_commit", []).append(callback)
+
+
+def run_after_commit_callbacks(session) -> None:
+    """Вызов callback'ов call_after_commit, вызывается сразу после commit сессии"""
+    for callback in session.info.pop("after_commit", []):
+        callback()
+
+
+def discard_after_commit_callbacks(session) -> None:
+    """Сброс callback'ов call_after_commit при откате или закрытии сессии"""
+    session.info.pop("after_commit", None)
+
+
 @inject
 def commit_and_close_session(func):
     @wraps(func)
     async def wrapper(*args, **kwargs):
-        session = Container.session()
+        session = get_session()
         try:
             result = await func(*args, **kwargs)
-            session.commit()
+            await session.commit()
+            run_after_commit_callbacks(session)
             return result
         except Exception as e:
-            session.rollback()
+            await session.rollback()
             raise e
         finally:
-            session.close()
+            discard_after_commit_callbacks(session)
+            await session.remove()
 
     return wrapper
@@ -1,7 +1,13 @@
+from asyncio import current_task
 from contextvars import ContextVar
 
 from sqlalchemy.orm import sessionmaker, scoped_session
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import (
+    create_async_engine,
+    async_sessionmaker,
+    async_scoped_session,
+)
 
 scope: ContextVar = ContextVar("db_session_scope")
 
@@ -21,3 +27,46 @@ class SyncSession:
 
     def create_session(self):
         return self.Session()
+
+
+class AsyncScopedSession:
+    """
+    Асинхронная сессия (asyncpg), своя для каждой asyncio задачи.
+    Каждый апдейт бота и каждая celery задача выполняются в отдельной задаче,
+    поэтому запросы разных пользователей не блокируют друг друга.
+    """
+
+    def __init__(self, db_url: str, pool_size: int = 5, max_overflow: int = 10):
+        self.engine = create_async_engine(
+            url=str(db_url),
+            pool_pre_ping=True,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+        )
+        self.session_factory = async_sessionmaker(
+            bind=self.engine,
+            expire_on_commit=False,
+        )
+        self.Session = async_scoped_session(
+            self.session_factory,
+            scopefunc=current_task,
+        )
+        self.connections_count = 0
+        event.listen(self.engine.sync_engine, "connect", self._on_connect)
+
+    def _on_connect(self, *args) -> None:
+        self.connections_count += 1
+
+    def create_session(self):
+        return self.Session
+
+    def get_pool_stats(self) -> dict[str, int]:
+        """Состояние пула соединений и кол-во открытых за все время соединений"""
+        pool = self.engine.pool
+        return {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "connections": self.connections_count,
+        }
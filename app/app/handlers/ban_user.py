@@ -7,11 +7,11 @@ from aiogram.types import Message, CallbackQuery, ReplyKeyboardRemove
 from dependency_injector.wiring import inject, Provide
 
 from app.core.container import Container
+from app.models.telegram_user import TelegramUser
 from app.services.telegram_user_service import TelegramUserService
 from app.db.commit_decorator import commit_and_close_session
 from app.core.config import settings
 from app.keyboards.donate import get_donate_keyboard
-from app.utils.pagination import Paginator
 from app.utils.texts import get_user_info_message
 from app.keyboards.reply import get_reply_keyboard
 from app.keyboards.reply import reply_cancel_keyboard
@@ -37,6 +37,7 @@ async def start_ban_user_context(callback: CallbackQuery, state: FSMContext) ->
 @inject
 async def process_name(
         message: Message,
+        current_user: TelegramUser,
         state: FSMContext,
         telegram_user_service: TelegramUserService = Provide[
             Container.telegram_user_service
@@ -46,9 +47,6 @@ async def process_name(
     telegram_user = await telegram_user_service.get_telegram_user(
         username=username
     )
-    current_user = await telegram_user_service.get_telegram_user(
-        user_id=message.from_user.id
-    )
     error_buttons = {
         "Попробовать ещё раз 🔄": "ban_user",
         "🔙 Назад": "donations",
@@ -107,7 +105,7 @@ async def confirm_ban_user_callback_handler(
     telegram_user = await telegram_user_service.get_telegram_user(
         user_id=telegram_id
     )
-    telegram_user.is_banned = True
+    await telegram_user_service.set_is_banned(telegram_user, is_banned=True)
     await callback.message.edit_text(
         f"Пользователь @{telegram_user.username} успешно заблокирован ✅.",
     )
@@ -135,21 +133,18 @@ async def banned_users_handler(
     page_number = int(callback.data.split("_")[-1])
     back_button = {"🔙 Назад": "donations"}
 
-    banned_users = await telegram_user_service.get_list(
-        is_banned=True
+    paginator = await telegram_user_service.paginate_list(
+        is_banned=True,
+        page_number=page_number,
+        per_page=1,
     )
-    if not banned_users:
+    if not paginator.count:
         await callback.message.edit_text(
             "Список пуст.",
             reply_markup=get_donate_keyboard(
                 buttons=back_button
         ))
         return
-    paginator = Paginator(
-        banned_users,
-        page_number=page_number,
-        per_page=1
-    )
     user = paginator.get_page()[0]
     message = get_user_info_message(user)
 
@@ -220,7 +215,7 @@ async def confirm_гтban_user_callback_handler(
     telegram_user = await telegram_user_service.get_telegram_user(
         user_id=telegram_id
     )
-    telegram_user.is_banned = False
+    await telegram_user_service.set_is_banned(telegram_user, is_banned=False)
     await callback.message.edit_text(
         f"Пользователь @{telegram_user.username} успешно разблокирован ✅."
     )
@@ -4,7 +4,6 @@ import uuid
 
 import loguru
 from aiogram import Router, F, Bot
-from aiogram.enums import ChatMemberStatus
 from aiogram.exceptions import TelegramBadRequest, TelegramAPIError
 from aiogram.types import CallbackQuery, FSInputFile
 from aiogram.filters import Command
@@ -14,28 +13,29 @@ from dependency_injector.wiring import inject, Provide
 
 from app.core.container import Container
 from app.schemas.donate import DonateEntity, DonateTransactionEntity
+from app.models.donate import Donate, DonateTransaction
 from app.services.donate_confirm_service import DonateConfirmService
 from app.services.telegram_user_service import TelegramUserService
 from app.models.telegram_user import status_list
 from app.services.donate_service import DonateService
+from app.services.statistic_service import StatisticService
+from app.services.subscription_service import SubscriptionService
 from app.schemas.telegram_user import TelegramUserEntity
 from app.keyboards.donate import get_donate_keyboard
 from app.utils.sponsor import get_callback_value
-from app.models.telegram_user import DonateStatus, MatrixBuildType
+from app.models.telegram_user import DonateStatus, MatrixBuildType, TelegramUser
 from app.core.config import settings
 from app.services.matrix_service import MatrixService
 from app.schemas.matrix import MatrixEntity
 from app.keyboards.donate import get_donations_keyboard
 from app.db.commit_decorator import commit_and_close_session
 from app.keyboards.reply import get_reply_keyboard
-from app.utils.pagination import Paginator
 from app.utils.sort import get_reversed_dict
 from app.utils.sponsor import check_is_second_status_higher
-from app.tasks.donate import check_is_donate_confirmed_or_delete_donate_task
 from app.utils.texts import get_donate_confirm_message
 from app.utils.excel import export_users_to_excel
 from app.utils.texts import get_user_statuses_statistic_message
-from app.tasks.matrix import check_is_matrix_free_with_donates_task
+from app.tasks.matrix import schedule_matrix_waitlist_notifications
 
 donate_router = Router()
 
@@ -62,17 +62,22 @@ async def subscribe_handler(
 @commit_and_close_session
 async def subscription_checker(
         callback: CallbackQuery,
+        current_user: TelegramUser | None,
         telegram_user_service: TelegramUserService = Provide[
             Container.telegram_user_service
         ],
+        subscription_service: SubscriptionService = Provide[
+            Container.subscription_service
+        ],
 ):
     sponsor_user_id = get_callback_value(callback.data)
     sponsor = await telegram_user_service.get_telegram_user(user_id=sponsor_user_id)
 
-    result = await callback.bot.get_chat_member(
-        chat_id=settings.chat_id, user_id=callback.from_user.id
+    # Пользователь сообщает, что подписался - статус в кэше мог устареть
+    is_subscribed = await subscription_service.is_subscribed(
+        bot=callback.bot, user_id=callback.from_user.id, refresh=True
     )
-    if result.status in (ChatMemberStatus.LEFT, ChatMemberStatus.KICKED):
+    if not is_subscribed:
         await callback.answer("Ты не подписался ❌", show_alert=True)
         return
 
@@ -88,11 +93,6 @@ async def subscription_checker(
         )
         return
 
-
-    current_user = await telegram_user_service.get_telegram_user(
-        user_id=callback.from_user.id
-    )
-
     if not current_user:
         user_dict = callback.from_user.model_dump()
         user_id = user_dict.pop("id")
@@ -144,12 +144,16 @@ async def donations_menu_handler(
 @inject
 async def donations_menu_handler(
         callback: CallbackQuery,
+        current_user: TelegramUser,
         telegram_user_service: TelegramUserService = Provide[
             Container.telegram_user_service
         ],
         donate_confirm_service: DonateConfirmService = Provide[
             Container.donate_confirm_service
         ],
+        statistic_service: StatisticService = Provide[
+            Container.statistic_service
+        ],
 ) -> None:
     build_type_str = callback.data.split("_")[-1]
     build_type = MatrixBuildType.BINARY \
@@ -160,22 +164,16 @@ async def donations_menu_handler(
         "Транзакции 💳": f"{build_type_str}_transactions",
         "АКТИВНЫЕ СТОЛЫ": f"team_{build_type_str}_1"
     }
-
-    current_user = await telegram_user_service.get_telegram_user(
-        user_id=callback.from_user.id
-    )
     user_status = current_user.get_status(build_type)
 
     if current_user.is_admin:
-        users = await telegram_user_service.get_list()
-        bills_sum = await telegram_user_service.get_bills_sum(build_type=build_type)
+        users_statistic = await statistic_service.get_users_statistic()
         statuses_statistic_message = get_user_statuses_statistic_message(
-            users,
-            matrix_build_type=build_type
+            users_statistic.get_statuses(build_type)
         )
         message_text = (
-            f"Партнеров в GiftNetwork: <b>{len(users)}</b>\n"
-            f"Всего подарили: <b>${int(bills_sum)}</b>\n\n"
+            f"Партнеров в GiftNetwork: <b>{users_statistic.users_count}</b>\n"
+            f"Всего подарили: <b>${int(users_statistic.get_bills_sum(build_type))}</b>\n\n"
             f"{statuses_statistic_message}\n"
             f"Лично приглашенных: <b>{current_user.invites_count}</b>\n"
             f"Получено подарков: <b>${int(current_user.get_bill(build_type))}</b>\n"
@@ -245,9 +243,9 @@ async def export_users_to_excel_callback_handler(
         parse_mode='HTML',
     )
 
-    file_name = "app/telegram_users.xlsx"
+    file_name = f"app/telegram_users_{callback.id}.xlsx"
     await export_users_to_excel(file_name)
-    file_input = FSInputFile(file_name)
+    file_input = FSInputFile(file_name, filename="telegram_users.xlsx")
 
     await callback.message.delete()
     await callback.message.answer_document(file_input)
@@ -285,11 +283,15 @@ async def confirm_donate(
     )
 
 
-@donate_router.callback_query(F.data.startswith("donate_"))
+@donate_router.callback_query(
+    F.data.startswith("donate_"),
+    flags={"throttling": "donate"},
+)
 @inject
 @commit_and_close_session
 async def donate_handler(
         callback: CallbackQuery,
+        current_user: TelegramUser,
         telegram_user_service: TelegramUserService = Provide[
             Container.telegram_user_service
         ],
@@ -306,9 +308,6 @@ async def donate_handler(
         if build_type_str == "b" else MatrixBuildType.TRINARY
 
     status = donate_service.get_donate_status(donate_sum)
-    current_user = await telegram_user_service.get_telegram_user(
-        user_id=callback.from_user.id
-    )
 
     if not callback.from_user.username:
         await callback.message.edit_text(
@@ -349,26 +348,25 @@ async def donate_handler(
         donations_data,
         matrix_build_type=build_type,
     )
-    now = datetime.now()
 
     if not is_available:
         await callback.message.edit_text(
             "Подождите пока подтвердятся подарки "
             "других пользователей на этот стол."
         )
-        check_is_matrix_free_with_donates_task.apply_async(
-            eta=now + timedelta(
-                minutes=settings.check_is_matrix_free_with_donates_minutes_interval
-            ),
-            kwargs={
-                "chat_id": current_user.user_id,
-                "matrix_id": matrix.id,
-                "build_type_str": build_type_str,
-                "donate_sum": donate_sum,
-            },
+        await donate_service.add_to_matrix_waitlist(
+            matrix=matrix,
+            telegram_user=current_user,
+            matrix_build_type=build_type,
+            donate_sum=donate_sum,
         )
         return
 
+    await donate_service.remove_from_matrix_waitlist(
+        telegram_user_id=current_user.id,
+        matrix_build_type=build_type,
+    )
+
     donate = await donate_confirm_service.create_donate(
         telegram_user_id=current_user.id,
         donate_data=donations_data,
@@ -377,14 +375,6 @@ async def donate_handler(
         quantity=donate_sum,
     )
 
-
-    check_is_donate_confirmed_or_delete_donate_task.apply_async(
-        kwargs={
-            "donate_id": donate.id,
-            "donate_sender_user_id": current_user.user_id,
-    },
-        eta=now + timedelta(minutes=settings.donate_confirmation_time_minutes)
-    )
     transactions = await donate_confirm_service.get_donate_transactions_by_donate_id(
         donate_id=donate.id
     )
@@ -563,12 +553,9 @@ async def cancel_confirm(
 
 
 @donate_router.callback_query(F.data.endswith("_transactions"))
-@inject
 async def get_transactions_menu(
         callback: CallbackQuery,
-        telegram_user_service: TelegramUserService = Provide[
-            Container.telegram_user_service
-        ],
+        current_user: TelegramUser,
 ) -> None:
     build_type_str = callback.data.split("_")[0]
 
@@ -576,9 +563,7 @@ async def get_transactions_menu(
         "Транзакции мне 📈": f"transactions_to_me_{build_type_str}_1",
         "Транзакции от меня 📉": f"transactions_from_me_{build_type_str}_1",
     }
-    user_id = callback.from_user.id
-    user = await telegram_user_service.get_telegram_user(user_id=user_id)
-    if user.is_admin:
+    if current_user.is_admin:
         buttons["Все транзакции 📊"] = f"all_transactions_{build_type_str}_1"
 
     buttons["🔙 Назад"] = f"donations_{build_type_str}"
@@ -595,9 +580,7 @@ async def get_transactions_menu(
 @commit_and_close_session
 async def get_transactions_list_to_me(
         callback: CallbackQuery,
-        telegram_user_service: TelegramUserService = Provide[
-            Container.telegram_user_service
-        ],
+        current_user: TelegramUser,
         donate_confirm_service: DonateConfirmService = Provide[
             Container.donate_confirm_service
         ],
@@ -607,15 +590,13 @@ async def get_transactions_list_to_me(
     build_type = MatrixBuildType.BINARY \
         if build_type_str == "b" else MatrixBuildType.TRINARY
 
-    user_id = callback.from_user.id
-    user = await telegram_user_service.get_telegram_user(user_id=user_id)
-    transactions = await (donate_confirm_service
-    .get_donate_transaction_by_sponsor_id_and_matrix_build_type(
-        sponsor_id=user.id,
+    paginator = await (donate_confirm_service
+    .paginate_donate_transactions_by_sponsor_id_and_matrix_build_type(
+        sponsor_id=current_user.id,
         matrix_build_type=build_type,
+        page_number=page_number,
+        per_page=5,
     ))
-
-    paginator = Paginator(transactions, page_number=page_number, per_page=5)
     buttons = {}
     sizes = (1, 1)
 
@@ -632,12 +613,7 @@ async def get_transactions_list_to_me(
 
     if transactions:
         for transaction in transactions:
-            donate = await donate_confirm_service.get_donate_by_id(
-                donate_id=transaction.donate_id
-            )
-            user = await telegram_user_service.get_telegram_user(
-                id=donate.telegram_user_id
-            )
+            user = transaction.donate.telegram_user
             message += (
                 f"ID: {transaction.id}\n"
                 f"Сумма: ${int(transaction.quantity)}\n"
@@ -671,9 +647,7 @@ async def get_transactions_list_to_me(
 @inject
 async def get_transactions_list_from_me(
         callback: CallbackQuery,
-        telegram_user_service: TelegramUserService = Provide[
-            Container.telegram_user_service
-        ],
+        current_user: TelegramUser,
         donate_service: DonateService = Provide[Container.donate_service],
         matrix_service: MatrixService = Provide[Container.matrix_service],
         donate_confirm_service: DonateConfirmService = Provide[
@@ -685,21 +659,20 @@ async def get_transactions_list_from_me(
     build_type = MatrixBuildType.BINARY \
         if build_type_str == "b" else MatrixBuildType.TRINARY
 
-    user_id = callback.from_user.id
-    user = await telegram_user_service.get_telegram_user(user_id=user_id)
-    donates = await donate_confirm_service.get_all_my_donates_and_transactions(
-        telegram_user_id=user.id,
+    paginator = await donate_confirm_service.paginate_my_donates_and_transactions(
+        telegram_user_id=current_user.id,
         matrix_build_type=build_type,
+        page_number=page_number,
+        per_page=3,
     )
-
-    paginator = Paginator(list(donates.items()), page_number=page_number, per_page=3)
     buttons = {}
     sizes = (1, 1)
     message = "<b><u>Ваши подарки и транзакции</u></b>\n\n"
 
     donates = paginator.get_page()
     if donates:
-        for donate, transactions in donates:
+        for donate in donates:
+            transactions = donate.transactions
             message += (
                 f"<b><u>Подарок на сумму: ${int(donate.quantity)}</u></b>\n"
                 f"ID: {donate.id}\n"
@@ -714,10 +687,7 @@ async def get_transactions_list_from_me(
 
             if transactions:
                 for transaction in transactions:
-                    sponsor = await telegram_user_service.get_telegram_user(
-                        id=transaction.sponsor_id
-                    )
-                    message += f"Кому: @{sponsor.username}\n\n"
+                    message += f"Кому: @{transaction.sponsor.username}\n\n"
     else:
         message = "У Вас нет подарков"
 
@@ -754,19 +724,15 @@ async def get_all_transactions(
     build_type = MatrixBuildType.BINARY \
         if build_type_str == "b" else MatrixBuildType.TRINARY
 
-    donates_and_transactions = (
-        await donate_confirm_service.get_all_donates_and_transactions(
-            matrix_build_type=build_type,
-        )
-    )
-
-    paginator = Paginator(
-        list(donates_and_transactions.items()), page_number=page_number, per_page=3
+    paginator = await donate_confirm_service.paginate_all_donates_and_transactions(
+        matrix_build_type=build_type,
+        page_number=page_number,
+        per_page=3,
     )
     buttons = {}
     sizes = (1, 1)
     message = "Все подарки и транзакции\n\n"
-    donates_and_transactions = paginator.get_page()
+    donates = paginator.get_page()
 
     if paginator.has_previous():
         buttons |= {"◀ Пред.": f"all_transactions_{build_type_str}_{page_number - 1}"}
@@ -776,11 +742,10 @@ async def get_all_transactions(
     if len(buttons) == 2:
         sizes = (2, 1)
 
-    if donates_and_transactions:
-        for donate, transactions in paginator.get_page():
-            user = await telegram_user_service.get_telegram_user(
-                id=donate.telegram_user_id
-            )
+    if donates:
+        for donate in donates:
+            user = donate.telegram_user
+            transactions = donate.transactions
             message += (
                 f"<b><u>Подарок на сумму: ${int(donate.quantity)}</u></b>\n"
                 f"ID: {donate.id}\n"
@@ -790,14 +755,11 @@ async def get_all_transactions(
             message += "Транзакции по подарку: \n\n"
             if transactions:
                 for transaction in transactions:
-                    sponsor = await telegram_user_service.get_telegram_user(
-                        id=transaction.sponsor_id
-                    )
                     message += (
                         f"ID: {transaction.id}\n"
                         f"Сумма: ${int(transaction.quantity)}\n"
                         f"От кого: @{user.username}\n"
-                        f"Кому: @{sponsor.username}\n"
+                        f"Кому: @{transaction.sponsor.username}\n"
                     )
                     message += (
                         "Подтверждена: " +
@@ -820,6 +782,98 @@ async def get_all_transactions(
     )
 
 
+async def process_transaction_confirmation(
+        bot: Bot,
+        transaction_id: uuid.UUID,
+        telegram_user_service: TelegramUserService,
+        matrix_service: MatrixService,
+        donate_service: DonateService,
+        donate_confirm_service: DonateConfirmService,
+) -> tuple[Donate | None, DonateTransaction | None, TelegramUser | None]:
+    """
+    Общая часть подтверждения транзакции спонсором и админом.
+    Зачисляет сумму спонсору, после подтверждения всего доната
+    добавляет отправителя в матрицу и уведомляет ожидающих места в ней
+    (уведомления отправляются после commit).
+    Возвращает донат, транзакцию (None - уже подтверждена или отменена) и спонсора.
+    """
+    donate, transaction, is_donate_confirmed = \
+        await donate_confirm_service.confirm_donate_transaction(transaction_id)
+    if not transaction:
+        return donate, None, None
+
+    sponsor = await telegram_user_service.get_telegram_user(id=transaction.sponsor_id)
+    await telegram_user_service.add_to_bill(
+        telegram_user=sponsor,
+        value=transaction.quantity,
+        matrix_build_type=donate.matrix_build_type,
+    )
+
+    if not is_donate_confirmed:
+        return donate, transaction, sponsor
+
+    sender_user = await telegram_user_service.get_telegram_user(
+        id=donate.telegram_user_id
+    )
+    current_matrix = await matrix_service.get_matrix(id=donate.matrix_id)
+
+    sender_matrix_dict = {
+        "owner_id": sender_user.id,
+        "status": current_matrix.status,
+        "build_type": donate.matrix_build_type,
+    }
+    sender_matrix_entity = MatrixEntity(**sender_matrix_dict)
+    sender_matrix = await matrix_service.create_matrix(matrix=sender_matrix_entity)
+
+    await matrix_service.add_to_matrix(current_matrix, sender_matrix, sender_user)
+
+    if check_is_second_status_higher(
+        sender_user.get_status(donate.matrix_build_type),
+        current_matrix.status
+    ):
+        sender_user.set_status(
+            status=current_matrix.status,
+            matrix_build_type=donate.matrix_build_type,
+        )
+
+    try:
+        await bot.send_message(
+            text=f"Ваш подарок успешно подтвержден!\n",
+            chat_id=sender_user.user_id,
+            reply_markup=get_reply_keyboard(sender_user),
+        )
+    except TelegramAPIError:
+        pass
+
+    try:
+        channel_donate_confirm_text = get_donate_confirm_message(
+            donate_sum=donate.quantity,
+            donate_status=current_matrix.status
+        )
+        await bot.send_message(
+            text=channel_donate_confirm_text,
+            chat_id=settings.donates_channel_id,
+        )
+    except TelegramAPIError:
+        pass
+
+    waitlist = await donate_service.pop_matrix_waitlist(matrix_id=current_matrix.id)
+    schedule_matrix_waitlist_notifications(waitlist)
+
+    return donate, transaction, sponsor
+
+
+async def answer_transaction_not_confirmed(
+        callback: CallbackQuery,
+        donate: Donate | None,
+) -> None:
+    if donate and donate.is_canceled:
+        await callback.message.edit_text("Время подтверждения транзакции вышло.")
+        return
+
+    await callback.message.edit_text("Транзакция уже подтверждена")
+
+
 @donate_router.callback_query(F.data.startswith("confirm_transaction_"))
 @inject
 @commit_and_close_session
@@ -829,82 +883,28 @@ async def confirm_transaction(
             Container.telegram_user_service
         ],
         matrix_service: MatrixService = Provide[Container.matrix_service],
+        donate_service: DonateService = Provide[Container.donate_service],
         donate_confirm_service: DonateConfirmService = Provide[
             Container.donate_confirm_service
         ],
 ) -> None:
     transaction_id = uuid.UUID(get_callback_value(callback.data))
 
-    transaction = await donate_confirm_service.get_donate_transaction_by_id(transaction_id)
-
-    donate = await donate_confirm_service.get_donate_by_id(
-        donate_id=transaction.donate_id
+    donate, transaction, _ = await process_transaction_confirmation(
+        bot=callback.bot,
+        transaction_id=transaction_id,
+        telegram_user_service=telegram_user_service,
+        matrix_service=matrix_service,
+        donate_service=donate_service,
+        donate_confirm_service=donate_confirm_service,
     )
-    if donate.is_confirmed:
-        await callback.message.edit_text("Транзакция уже подтверждена")
+    if not transaction:
+        await answer_transaction_not_confirmed(callback, donate)
         return
 
-    transaction = await donate_confirm_service.set_donate_transaction_is_confirmed(
-        donate_transaction_id=transaction_id
-    )
-    sponsor = await telegram_user_service.get_telegram_user(id=transaction.sponsor_id)
-    sponsor.add_to_bill(
-        value=transaction.quantity,
-        matrix_build_type=donate.matrix_build_type,
-    )
-
     sender_user = await telegram_user_service.get_telegram_user(
         id=donate.telegram_user_id
     )
-    donate_confirm = await donate_confirm_service.check_donate_is_confirmed(
-        donate_id=transaction.donate_id
-    )
-
-    if donate_confirm:
-        current_matrix_id = donate.matrix_id
-        current_matrix = await matrix_service.get_matrix(id=current_matrix_id)
-
-        sender_matrix_dict = {
-            "owner_id": sender_user.id,
-            "status": current_matrix.status,
-            "build_type": donate.matrix_build_type,
-        }
-        sender_matrix_entity = MatrixEntity(**sender_matrix_dict)
-        sender_matrix = await matrix_service.create_matrix(matrix=sender_matrix_entity)
-
-        await matrix_service.add_to_matrix(current_matrix, sender_matrix, sender_user)
-
-        if check_is_second_status_higher(
-            sender_user.get_status(donate.matrix_build_type),
-            current_matrix.status
-        ):
-            sender_user.set_status(
-                status=current_matrix.status,
-                matrix_build_type=donate.matrix_build_type,
-            )
-
-        try:
-            await callback.bot.send_message(
-                text=f"Ваш подарок успешно подтвержден!\n",
-                chat_id=sender_user.user_id,
-                reply_markup=get_reply_keyboard(sender_user),
-            )
-        except TelegramAPIError:
-            pass
-
-        try:
-            channel_donate_confirm_text = get_donate_confirm_message(
-                donate_sum=donate.quantity,
-                donate_status=current_matrix.status
-            )
-            await callback.bot.send_message(
-                text=channel_donate_confirm_text,
-                chat_id=settings.donates_channel_id,
-            )
-        except TelegramAPIError:
-            pass
-
-
     message = (f"Транзакция на сумму ${int(transaction.quantity)} "
                f"от пользователя @{sender_user.username} подтверждена.")
     await callback.message.edit_text(
@@ -923,28 +923,25 @@ async def confirm_admin_transaction(
             Container.telegram_user_service
         ],
         matrix_service: MatrixService = Provide[Container.matrix_service],
+        donate_service: DonateService = Provide[Container.donate_service],
         donate_confirm_service: DonateConfirmService = Provide[
             Container.donate_confirm_service
         ],
 ) -> None:
     transaction_id = uuid.UUID(callback.data.split("_")[-1])
-    transaction = await donate_confirm_service.get_donate_transaction_by_id(transaction_id)
 
-    donate = await donate_confirm_service.get_donate_by_id(
-        donate_id=transaction.donate_id
+    donate, transaction, sponsor = await process_transaction_confirmation(
+        bot=callback.bot,
+        transaction_id=transaction_id,
+        telegram_user_service=telegram_user_service,
+        matrix_service=matrix_service,
+        donate_service=donate_service,
+        donate_confirm_service=donate_confirm_service,
     )
-    if donate.is_confirmed:
-        await callback.message.edit_text("Транзакция уже подтверждена")
+    if not transaction:
+        await answer_transaction_not_confirmed(callback, donate)
         return
 
-    transaction = await donate_confirm_service.set_donate_transaction_is_confirmed(
-        donate_transaction_id=transaction_id
-    )
-    sponsor = await telegram_user_service.get_telegram_user(id=transaction.sponsor_id)
-    sponsor.add_to_bill(
-        value=transaction.quantity,
-        matrix_build_type=donate.matrix_build_type,
-    )
     try:
         if not sponsor.is_admin:
             await callback.bot.send_message(
@@ -959,53 +956,6 @@ async def confirm_admin_transaction(
     sender_user = await telegram_user_service.get_telegram_user(
         id=donate.telegram_user_id
     )
-    donate_confirm = await donate_confirm_service.check_donate_is_confirmed(
-        donate_id=transaction.donate_id
-    )
-
-    if donate_confirm:
-        current_matrix_id = donate.matrix_id
-        current_matrix = await matrix_service.get_matrix(id=current_matrix_id)
-
-        sender_matrix_dict = {
-            "owner_id": sender_user.id,
-            "status": current_matrix.status,
-            "build_type": donate.matrix_build_type,
-        }
-        sender_matrix_entity = MatrixEntity(**sender_matrix_dict)
-        sender_matrix = await matrix_service.create_matrix(matrix=sender_matrix_entity)
-
-        await matrix_service.add_to_matrix(current_matrix, sender_matrix, sender_user)
-
-        if check_is_second_status_higher(
-            sender_user.get_status(donate.matrix_build_type),
-            current_matrix.status
-        ):
-            sender_user.set_status(
-                status=current_matrix.status,
-                matrix_build_type=donate.matrix_build_type,
-            )
-
-        try:
-            await callback.bot.send_message(
-                text=f"Ваш подарок успешно подтвержден!\n",
-                chat_id=sender_user.user_id,
-                reply_markup=get_reply_keyboard(sender_user),
-            )
-        except TelegramAPIError:
-            pass
-        try:
-            channel_donate_confirm_text = get_donate_confirm_message(
-                donate_sum=donate.quantity,
-                donate_status=current_matrix.status
-            )
-            await callback.bot.send_message(
-                text=channel_donate_confirm_text,
-                chat_id=settings.donates_channel_id,
-            )
-        except TelegramAPIError:
-            pass
-
     message = (f"Транзакция на сумму ${int(transaction.quantity)} "
                f"от пользователя @{sender_user.username} подтверждена.")
     await callback.message.edit_text(
@@ -11,13 +11,12 @@ from app.keyboards.donate import get_donate_keyboard
 from app.core.config import settings
 from app.services.matrix_service import MatrixService
 from app.utils.sponsor import get_callback_value
-from app.utils.pagination import Paginator
 from app.utils.matrix import get_matrices_length
 from app.utils.matrix import get_active_matrices, get_archived_matrices
 from app.models.telegram_user import status_list, status_emoji_list
 from app.db.commit_decorator import commit_and_close_session
 from app.utils.texts import get_my_team_message, get_matrix_info_message
-from app.models.telegram_user import MatrixBuildType
+from app.models.telegram_user import MatrixBuildType, TelegramUser
 
 info_router = Router()
 
@@ -65,9 +64,7 @@ async def about_handler(
 @inject
 async def team_inline_handler(
         callback: CallbackQuery,
-        telegram_user_service: TelegramUserService = Provide[
-            Container.telegram_user_service
-        ],
+        current_user: TelegramUser,
         matrix_service: MatrixService = Provide[Container.matrix_service],
 ) -> None:
     callback_data_list = callback.data.split("_")
@@ -77,10 +74,6 @@ async def team_inline_handler(
     build_type = MatrixBuildType.BINARY \
         if build_type_str == "b" else MatrixBuildType.TRINARY
 
-
-    current_user = await telegram_user_service.get_telegram_user(
-        user_id=callback.from_user.id
-    )
     matrices = await matrix_service.get_user_matrices(
         owner_id=current_user.id,
         build_type=build_type,
@@ -164,17 +157,13 @@ async def referral_handler(
             Container.telegram_user_service
         ],
 ) -> tuple[str | None, InlineKeyboardMarkup | None]:
-    invited_users = await telegram_user_service.get_invited_users(
-        sponsor_user_id=from_user_id
-    )
-    if not invited_users:
-        return None, None
-
-    paginator = Paginator(
-        invited_users,
+    paginator = await telegram_user_service.paginate_invited_users(
+        sponsor_user_id=from_user_id,
         page_number=page_number,
-        per_page=per_page
+        per_page=per_page,
     )
+    if not paginator.count:
+        return None, None
 
     buttons = {}
     message_text = f"<b>Ваши рефералы (страница {page_number}):</b>\n\n"
@@ -212,20 +201,14 @@ async def referral_handler(
 
 
 @info_router.callback_query(F.data.startswith("send_referrals_"))
-@inject
 async def send_referral_message_handler(
         callback: CallbackQuery,
-        telegram_user_service: TelegramUserService = Provide[
-            Container.telegram_user_service
-        ],
+        current_user: TelegramUser | None,
 ) -> None:
     build_type_str = callback.data.split("_")[-1]
     build_type = MatrixBuildType.BINARY \
         if build_type_str == "b" else MatrixBuildType.TRINARY
 
-    current_user = await telegram_user_service.get_telegram_user(
-        user_id=callback.from_user.id
-    )
     if not current_user:
         return
 
@@ -17,11 +17,12 @@ from app.utils.sponsor import get_callback_value
 from app.utils.pagination import Paginator
 from app.utils.matrix import get_matrices_length
 from app.utils.matrix import get_active_matrices, get_archived_matrices
-from app.models.telegram_user import status_list, status_emoji_list
+from app.models.telegram_user import status_list, status_emoji_list, TelegramUser
 from app.db.commit_decorator import commit_and_close_session
 from app.utils.bot import echo_message_with_media
 from app.keyboards.reply import get_reply_keyboard
-from app.utils.bot import send_assembled_message
+from app.utils.bot import send_assembled_message, serialize_message
+from app.tasks.bot import broadcast_message_task
 
 
 class MessageForm(StatesGroup):
@@ -126,33 +127,29 @@ async def process_button_text_handler(message: Message, state: FSMContext):
     )
 
 
-@inject
 async def answer_created_message(
         message: Message,
         state: FSMContext,
-        from_user_id: int,
-        telegram_user_service: TelegramUserService = Provide[
-            Container.telegram_user_service
-        ],
+        current_user: TelegramUser,
 ):
     data = await state.get_data()
-    current_user = await telegram_user_service.get_telegram_user(
-        user_id=from_user_id
-    )
     await message.answer(
         "Готовый вариант:",
         reply_markup=get_reply_keyboard(current_user)
     )
     complete_message = await send_assembled_message(
         bot=message.bot,
-        chat_id=from_user_id,
+        chat_id=current_user.user_id,
         text=data.get("text"),
         photo_id=data.get("photo"),
         button_text=data.get("button_text"),
         button_link=data.get("button_link"),
     )
 
-    await state.update_data(complete_message=complete_message)
+    # Черновик больше не нужен, в состоянии остается только готовое сообщение
+    await state.set_data(
+        {"complete_message": serialize_message(complete_message, compact=True)}
+    )
     await state.set_state(MessageForm.confirm_referrals_send)
 
     await message.answer(
@@ -166,6 +163,7 @@ async def answer_created_message(
 async def process_button_link_handler(
         message: Message,
         state: FSMContext,
+        current_user: TelegramUser,
 ):
     if not message.text.startswith(("http://", "https://")):
         await message.answer(
@@ -178,12 +176,16 @@ async def process_button_link_handler(
     await answer_created_message(
         message,
         state,
-        from_user_id=message.from_user.id
+        current_user=current_user,
     )
 
 
 @referral_router.callback_query(F.data == "skip_referrals_msg_state")
-async def skip_step(callback: CallbackQuery, state: FSMContext):
+async def skip_step(
+        callback: CallbackQuery,
+        state: FSMContext,
+        current_user: TelegramUser,
+):
     await callback.message.delete()
     current_state = await state.get_state()
 
@@ -197,7 +199,7 @@ async def skip_step(callback: CallbackQuery, state: FSMContext):
         await answer_created_message(
             callback.message,
             state,
-            from_user_id=callback.from_user.id
+            current_user=current_user,
         )
 
 
@@ -217,18 +219,14 @@ async def send_complete_message_callback_handler(
 
 
 @referral_router.message(MessageForm.complete_message)
-@inject
 async def process_complete_message_handler(
         message: Message,
+        current_user: TelegramUser,
         state: FSMContext,
-        telegram_user_service: TelegramUserService = Provide[
-            Container.telegram_user_service
-        ],
 ):
-    current_user = await telegram_user_service.get_telegram_user(
-        user_id=message.from_user.id
+    await state.set_data(
+        {"complete_message": serialize_message(message, compact=True)}
     )
-    await state.update_data(complete_message=message)
     await state.set_state(MessageForm.confirm_referrals_send)
     await message.answer(
         "Готовый вариант:",
@@ -261,23 +259,16 @@ async def confirm_referrals_send_message_handler(
         sponsor_user_id=callback.from_user.id
     )
     state_data = await state.get_data()
+    await state.clear()
 
     await callback.message.edit_text(
-        "Рассылка отправлена ✅",
+        "Рассылка запущена ⏳",
         reply_markup=None,
     )
-    await state.clear()
-
-    for user in invited_users:
-        try:
-            message = await callback.bot.send_message(
-                chat_id=user.user_id,
-                text="Вам сообщение от вашего спонсора:"
-            )
-            await echo_message_with_media(
-                chat_id=user.user_id,
-                original_message=state_data["complete_message"],
-                reply_to_message_id=message.message_id,
-            )
-        except TelegramAPIError:
-            continue
+    broadcast_message_task.delay(
+        chat_ids=[user.user_id for user in invited_users],
+        serialized_message=state_data["complete_message"],
+        header_text="Вам сообщение от вашего спонсора:",
+        status_chat_id=callback.message.chat.id,
+        status_message_id=callback.message.message_id,
+    )
@@ -20,7 +20,7 @@ from app.models.telegram_user import status_list
 from app.services.matrix_service import MatrixService
 from app.utils.sponsor import get_callback_value
 from app.services.donate_service import DonateService
-from app.models.telegram_user import DonateStatus, MatrixBuildType
+from app.models.telegram_user import DonateStatus, MatrixBuildType, TelegramUser
 from app.db.commit_decorator import commit_and_close_session
 from app.keyboards.reply import get_reply_keyboard
 from app.utils.matrix import get_matrices_length
@@ -88,18 +88,11 @@ async def delete_msg_handler(
 
 
 @start_router.message(F.text.lower() == "отмена ❌")
-@inject
 async def cancel_handler(
         message: Message,
+        current_user: TelegramUser,
         state: FSMContext,
-        telegram_user_service: TelegramUserService = Provide[
-            Container.telegram_user_service
-        ],
 ):
-    current_user = await telegram_user_service.get_telegram_user(
-        user_id=message.from_user.id
-    )
-
     await message.answer(
         text="Действие отменено",
         reply_markup=get_reply_keyboard(current_user)
@@ -2,6 +2,7 @@ import loguru
 from aiogram.utils.keyboard import InlineKeyboardBuilder, InlineKeyboardButton
 
 from app.models.telegram_user import DonateStatus, MatrixBuildType, TelegramUser
+from app.models.tiers import DONATE_VALUES, get_next_status, is_status_higher
 
 
 def get_donate_keyboard(*, buttons: dict[str, str], sizes: tuple = (1, 1)):
@@ -18,55 +19,24 @@ def get_donations_keyboard(
         status_list: list[DonateStatus],
         matrix_build_type: MatrixBuildType,
 ) -> dict:
+    """
+    Кнопки донатов: доступны (🟢) статусы ниже текущего и следующий статус,
+    для BRILLIANT - все статусы
+    """
     build_type_str = "t" if matrix_build_type == MatrixBuildType.TRINARY else "b"
-    buttons = {}
-    if current_status.value == DonateStatus.NOT_ACTIVE.value:
-        first_status = status_list[0]
-        first_donate_sum = first_status.get_status_donate_value(matrix_build_type)
-        first_button_text = f"🟢{first_status.value} - ${first_donate_sum}🟢"
-
-        buttons[first_button_text] = f"confirm_donate_🟢_{build_type_str}_{first_donate_sum}"
-        for status in status_list[1:]:
-            donate_sum = status.get_status_donate_value(matrix_build_type)
-            buttons[f"🔴{status.value} - ${donate_sum}🔴"] = \
-                f"confirm_donate_🔴_{build_type_str}_{donate_sum}"
-
-
-        return buttons
-
-    if current_status.value == DonateStatus.BRILLIANT.value:
-        for status in status_list:
-            donate_sum = status.get_status_donate_value(matrix_build_type)
-            buttons[f"🟢{status.value} - ${donate_sum}🟢"] = \
-                f"confirm_donate_🟢_{build_type_str}_{donate_sum}"
+    donate_values = DONATE_VALUES[matrix_build_type]
+    next_status = get_next_status(current_status)
 
-        return buttons
-
-    count = 0
+    buttons = {}
     for status in status_list:
-        if current_status.value == status.value:
-            for i in status_list[: status_list.index(status)]:
-                buttons[f"🟢{i.value} - ${i.get_status_donate_value(matrix_build_type)}🟢"] = \
-                    f"confirm_donate_🟢_{build_type_str}_{i.get_status_donate_value(matrix_build_type)}"
-                count += 1
-
-            buttons[f"🔴{status.value} - ${status.get_status_donate_value(matrix_build_type)}🔴"] = \
-                f"confirm_donate_🔴_{build_type_str}_{status.get_status_donate_value(matrix_build_type)}"
-
-            buttons[(
-                f"🟢{status_list[count + 1].value} - "
-                f"${status_list[count + 1].get_status_donate_value(matrix_build_type)}🟢"
-            )] = (
-                f"confirm_donate_🟢_{build_type_str}_"
-                f"{status_list[count + 1].get_status_donate_value(matrix_build_type)}"
-            )
-
-            for i in status_list[status_list.index(status) + 2 :]:
-                buttons[f"🔴{i.value} - ${i.get_status_donate_value(matrix_build_type)}🔴"] = (
-                    f"confirm_donate_🔴_{build_type_str}_"
-                    f"{i.get_status_donate_value(matrix_build_type)}"
-                )
-        else:
-            continue
+        is_available = (
+            current_status == DonateStatus.BRILLIANT
+            or status == next_status
+            or is_status_higher(current_status, status)
+        )
+        color = "🟢" if is_available else "🔴"
+        donate_sum = donate_values[status]
+        buttons[f"{color}{status.value} - ${donate_sum}{color}"] = \
+            f"confirm_donate_{color}_{build_type_str}_{donate_sum}"
 
     return buttons
@@ -1,8 +1,16 @@
 from aiogram import Bot, Dispatcher
 from aiogram.enums import ParseMode
 from aiogram.client.default import DefaultBotProperties
+from aiogram.fsm.storage.redis import RedisStorage
 
 from app.core.config import settings
 
 bot = Bot(settings.bot_token, default=DefaultBotProperties(parse_mode="HTML"))
-dp = Dispatcher()
+dp = Dispatcher(
+    storage=RedisStorage.from_url(
+        settings.redis_url,
+        # Состояния брошенных форм удаляются сами
+        state_ttl=settings.fsm_ttl_seconds,
+        data_ttl=settings.fsm_ttl_seconds,
+    )
+)
@@ -1,39 +1,75 @@
 import asyncio
 
+from aiogram import Dispatcher
 from loguru import logger
 
 from app.handlers.routing import get_all_routers
 
 from app.middlewares.throttling import (
     private_chat_only_middleware,
-    rate_limit_middleware,
+    ThrottlingMiddleware,
 )
 from app.middlewares.ban_user import (
     ban_user_middleware,
 )
+from app.middlewares.current_user import current_user_middleware
 from app.middlewares.session_middleware import SQLAlchemySessionMiddleware
 
+from app.core.config import settings
 from app.core.container import Container
 from app import handlers
 from app.middlewares.subscriptions import subscription_checker_middleware
 
+from app.utils.throttling import ThrottlingRate
 from loader import dp, bot
 
 
+def setup_dispatcher(dp: Dispatcher, container: Container) -> None:
+    """Регистрация routers и middlewares"""
+    session = container.session()
+
+    all_routers = get_all_routers()
+    dp.include_routers(all_routers)
+    dp.update.outer_middleware(SQLAlchemySessionMiddleware(session=session))
+    dp.message.middleware(private_chat_only_middleware)
+    throttling_backend = container.throttling_backend()
+    dp.message.middleware(
+        ThrottlingMiddleware(
+            backend=throttling_backend,
+            key="message",
+            default_rate=ThrottlingRate(
+                limit=1, window_seconds=1 / settings.message_per_second
+            ),
+        )
+    )
+    dp.message.middleware(ban_user_middleware)
+    dp.message.middleware(current_user_middleware)
+    dp.message.middleware(subscription_checker_middleware)
+    dp.callback_query.middleware(
+        ThrottlingMiddleware(
+            backend=throttling_backend,
+            key="callback",
+            default_rate=ThrottlingRate(
+                limit=settings.callback_rate_limit,
+                window_seconds=settings.callback_rate_window_seconds,
+            ),
+            rates={
+                "donate": ThrottlingRate(
+                    limit=settings.donate_rate_limit,
+                    window_seconds=settings.donate_rate_window_seconds,
+                ),
+            },
+        )
+    )
+    dp.callback_query.middleware(ban_user_middleware)
+    dp.callback_query.middleware(current_user_middleware)
+
+
 async def main(container: Container):
     """Запуск бота."""
     try:
-        sync_session = container.session()
-
-        all_routers = get_all_routers()
-        dp.include_routers(all_routers)
-        dp.message.middleware(private_chat_only_middleware)
-        dp.message.middleware(rate_limit_middleware)
-        dp.message.middleware(SQLAlchemySessionMiddleware(sync_session=sync_session))
-        dp.message.middleware(ban_user_middleware)
-        dp.message.middleware(subscription_checker_middleware)
-        dp.callback_query.middleware(ban_user_middleware)
-
+        setup_dispatcher(dp, container)
+        await bot.delete_webhook()
         await dp.start_polling(bot)
     finally:
         await bot.session.close()
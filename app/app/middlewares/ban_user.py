@@ -19,13 +19,23 @@ async def ban_user_middleware(
 ):
     """
     Middleware, для обработки действий от забаненного пользователя.
+    Флаг блокировки берется из кэша, при промахе пользователь загружается
+    из БД и сохраняется в data для следующих middleware и обработчика.
     """
-    current_user = await telegram_user_service.get_telegram_user(
-        user_id=event.from_user.id
-    )
-    if not current_user:
-        return await handler(event, data)
-    if current_user.is_banned:
+    is_banned = await telegram_user_service.get_cached_is_banned(event.from_user.id)
+
+    if is_banned is None:
+        current_user = await telegram_user_service.get_telegram_user(
+            user_id=event.from_user.id
+        )
+        data["current_user"] = current_user
+        if not current_user:
+            return await handler(event, data)
+
+        await telegram_user_service.cache_is_banned(current_user)
+        is_banned = current_user.is_banned
+
+    if is_banned:
         await event.bot.send_message(
             chat_id=event.from_user.id,
             text=(
@@ -0,0 +1,26 @@
+from aiogram.types import Message, CallbackQuery
+from dependency_injector.wiring import inject, Provide
+
+from app.core.container import Container
+from app.services.telegram_user_service import TelegramUserService
+
+
+@inject
+async def current_user_middleware(
+        handler,
+        event: Message | CallbackQuery,
+        data: dict,
+        telegram_user_service: TelegramUserService = Provide[
+            Container.telegram_user_service
+        ],
+):
+    """
+    Middleware, загружающее текущего пользователя один раз на апдейт.
+    Пользователь передается в обработчики через аргумент current_user.
+    """
+    if "current_user" not in data:
+        data["current_user"] = await telegram_user_service.get_telegram_user(
+            user_id=event.from_user.id
+        )
+
+    return await handler(event, data)
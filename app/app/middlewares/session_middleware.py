@@ -1,13 +1,15 @@
 from contextlib import asynccontextmanager
 from aiogram import BaseMiddleware
 
+from app.db.commit_decorator import run_after_commit_callbacks, discard_after_commit_callbacks
+
 
 class SQLAlchemySessionMiddleware(BaseMiddleware):
     """Middleware для commit & close  session"""
 
-    def __init__(self, sync_session):
+    def __init__(self, session):
         super().__init__()
-        self._sync_session = sync_session
+        self._session = session
 
     async def __call__(self, handler, event, data):
         async with self.db_session_maker() as session:
@@ -17,10 +19,12 @@ class SQLAlchemySessionMiddleware(BaseMiddleware):
     @asynccontextmanager
     async def db_session_maker(self):
         try:
-            yield self._sync_session
-            self._sync_session.commit()
+            yield self._session
+            await self._session.commit()
+            run_after_commit_callbacks(self._session)
         except Exception as e:
-            self._sync_session.rollback()
+            await self._session.rollback()
             raise e
         finally:
-            self._sync_session.close()
+            discard_after_commit_callbacks(self._session)
+            await self._session.remove()
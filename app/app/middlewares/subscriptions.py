@@ -1,10 +1,8 @@
-from aiogram.enums import ChatMemberStatus
 from aiogram.types import Message, CallbackQuery
 from dependency_injector.wiring import inject, Provide
 
-from app.services import telegram_user_service
 from app.core.container import Container
-from app.services.telegram_user_service import TelegramUserService
+from app.services.subscription_service import SubscriptionService
 from app.db.commit_decorator import commit_and_close_session
 from app.core.config import settings
 from app.keyboards.donate import get_donate_keyboard
@@ -15,23 +13,23 @@ async def subscription_checker_middleware(
         handler,
         event: Message,
         data: dict,
-        telegram_user_service: TelegramUserService = Provide[
-            Container.telegram_user_service
+        subscription_service: SubscriptionService = Provide[
+            Container.subscription_service
         ],
 ):
     """
     Middleware, для обработки проверки подписки на каналы.
+    Пользователь берется из data (см. current_user_middleware),
+    статус подписки - из кэша SubscriptionService.
     """
-    current_user = await telegram_user_service.get_telegram_user(
-        user_id=event.from_user.id
-    )
+    current_user = data.get("current_user")
     if not current_user:
         return await handler(event, data)
-    result = await event.bot.get_chat_member(
-        chat_id=settings.chat_id, user_id=event.from_user.id
-    )
 
-    if result.status in (ChatMemberStatus.LEFT, ChatMemberStatus.KICKED):
+    is_subscribed = await subscription_service.is_subscribed(
+        bot=event.bot, user_id=event.from_user.id
+    )
+    if not is_subscribed:
         await event.answer(
             f"Присоединитесь к чату нашего сообщества\n\n {settings.chat_link}",
             reply_markup=get_donate_keyboard(
@@ -1,10 +1,8 @@
-import time
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.flags import get_flag
+from aiogram.types import Message, CallbackQuery
 
-from aiogram.types import Message
-
-from app.core.config import settings
-
-from loguru import logger
+from app.utils.throttling import BaseThrottlingBackend, ThrottlingRate
 
 
 async def private_chat_only_middleware(handler, event: Message, data: dict):
@@ -18,20 +16,37 @@ async def private_chat_only_middleware(handler, event: Message, data: dict):
     return await handler(event, data)
 
 
-async def rate_limit_middleware(handler, event: Message, data: dict):
-    """Middleware для ограничения отправки сообщений пользователем боту."""
-
-    user_id = event.from_user.id
-    current_time = time.time()
-
-    if not hasattr(rate_limit_middleware, "users"):
-        rate_limit_middleware.users = {}
+class ThrottlingMiddleware(BaseMiddleware):
+    """
+    Middleware для ограничения частоты сообщений и нажатий кнопок пользователем.
+    Лимит обработчика задается флагом throttling с названием лимита из rates,
+    например: @router.callback_query(..., flags={"throttling": "donate"}).
+    """
 
-    if user_id in rate_limit_middleware.users:
-        last_message_time = rate_limit_middleware.users[user_id]
+    def __init__(
+            self,
+            backend: BaseThrottlingBackend,
+            key: str,
+            default_rate: ThrottlingRate,
+            rates: dict[str, ThrottlingRate] | None = None,
+    ):
+        super().__init__()
+        self._backend = backend
+        self._key = key
+        self._default_rate = default_rate
+        self._rates = rates or {}
+
+    async def __call__(self, handler, event: Message | CallbackQuery, data: dict):
+        rate_name = get_flag(data, "throttling", default="default")
+        rate = self._rates.get(rate_name, self._default_rate)
+
+        is_allowed = await self._backend.hit(
+            f"{self._key}:{rate_name}:{event.from_user.id}", rate
+        )
+        if not is_allowed:
+            if isinstance(event, CallbackQuery):
+                return await event.answer("Слишком много запросов! Попробуйте позже.")
 
-        if current_time - last_message_time < settings.message_per_second:
             return await event.answer("Слишком много сообщений! Попробуйте позже.")
 
-    rate_limit_middleware.users[user_id] = current_time
-    return await handler(event, data)
+        return await handler(event, data)
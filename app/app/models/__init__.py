@@ -1,5 +1,5 @@
 from app.models.admin_user import AdminUser
-from app.models.telegram_user import TelegramUser
-from app.models.matrix import Matrix
+from app.models.telegram_user import TelegramUser, TelegramUserAncestor
+from app.models.matrix import Matrix, MatrixEdge, MatrixWaitlist, AdminMatrixPool
 from app.models.transaction import Transaction
 from app.models.donate import Donate, DonateTransaction
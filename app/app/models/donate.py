@@ -54,6 +54,12 @@ class Donate(UUIDMixin, TimestampedMixin, Base):
         index=True
     )
 
+    telegram_user = relationship("TelegramUser")
+    transactions = relationship(
+        "DonateTransaction",
+        back_populates="donate",
+        order_by="[DonateTransaction.created_at, DonateTransaction.position]",
+    )
 
     __table_args__ = {"extend_existing": True}
 
@@ -87,5 +93,11 @@ class DonateTransaction(UUIDMixin, TimestampedMixin, Base):
         Boolean,
         default=False
     )
+    # Порядок транзакции в донате: транзакции доната создаются
+    # одним INSERT и получают одинаковый created_at
+    position = Column(Integer, nullable=False, default=0, server_default="0")
+
+    sponsor = relationship("TelegramUser")
+    donate = relationship("Donate", back_populates="transactions")
 
     __table_args__ = {"extend_existing": True}
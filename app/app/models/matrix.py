@@ -1,7 +1,8 @@
 import uuid
 import enum
+from datetime import datetime
 
-from sqlalchemy import Column, UUID, ForeignKey, Enum
+from sqlalchemy import Column, UUID, ForeignKey, Enum, Integer, Boolean, Index, UniqueConstraint, false, BigInteger
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.mutable import MutableDict, MutableList
 from sqlalchemy.orm import relationship
@@ -12,6 +13,58 @@ from app.db.base import Base
 from app.models.telegram_user import DonateStatus, MatrixBuildType
 
 
+class MatrixSlot:
+    """
+    Занятое место матрицы.
+    Места первого уровня нумеруются в порядке заполнения (0, 1, ...),
+    места второго уровня - position = позиция места первого уровня * level_length + номер под ним.
+    В БД место хранится списком [level, position, matrix_id, user_id, username, joined_at].
+    """
+
+    __slots__ = ("level", "position", "matrix_id", "user_id", "username", "joined_at")
+
+    def __init__(
+            self,
+            level: int,
+            position: int,
+            matrix_id: uuid.UUID,
+            user_id: int | None,
+            username: str | None,
+            joined_at: datetime,
+    ):
+        self.level = level
+        self.position = position
+        self.matrix_id = matrix_id
+        self.user_id = user_id
+        self.username = username
+        self.joined_at = joined_at
+
+    def __repr__(self) -> str:
+        return f"MatrixSlot(level={self.level}, position={self.position}, matrix_id={self.matrix_id})"
+
+    @classmethod
+    def from_row(cls, row: list) -> "MatrixSlot":
+        level, position, matrix_id, user_id, username, joined_at = row
+        return cls(
+            level=level,
+            position=position,
+            matrix_id=uuid.UUID(matrix_id),
+            user_id=user_id,
+            username=username,
+            joined_at=datetime.fromisoformat(joined_at),
+        )
+
+    def to_row(self) -> list:
+        return [
+            self.level,
+            self.position,
+            str(self.matrix_id),
+            self.user_id,
+            self.username,
+            self.joined_at.isoformat(),
+        ]
+
+
 class Matrix(UUIDMixin, TimestampedMixin, Base):
     __tablename__ = "matrices"
 
@@ -23,12 +76,193 @@ class Matrix(UUIDMixin, TimestampedMixin, Base):
     )
     status = Column(Enum(DonateStatus), default=DonateStatus.NOT_ACTIVE, index=True)
     build_type = Column(Enum(MatrixBuildType), default=MatrixBuildType.TRINARY, index=True)
-    matrices = Column(mutable_json_type(dbtype=JSONB, nested=True), index=True, default={})
-    matrix_telegram_usernames = Column(
-        mutable_json_type(dbtype=JSONB, nested=True), index=True, default={}
-    )
+    matrices = Column(mutable_json_type(dbtype=JSONB, nested=True), default={})
+    slots = Column(MutableList.as_mutable(JSONB), nullable=False, default=list, server_default="[]")
     telegram_users = Column(MutableList.as_mutable(JSONB), index=True, default=[])
+    first_level_count = Column(Integer, nullable=False, default=0, server_default="0")
+    second_level_count = Column(Integer, nullable=False, default=0, server_default="0")
+    is_full = Column(Boolean, nullable=False, default=False, server_default=false())
+
+    __table_args__ = (
+        Index("ix_matrices_owner_id_status_build_type_is_full", "owner_id", "status", "build_type", "is_full", "id"),
+        {"extend_existing": True},
+    )
+
+    @property
+    def level_length(self) -> int:
+        return 2 if self.build_type == MatrixBuildType.BINARY else 3
+
+    def increase_level_count(self, level: int) -> None:
+        """Увеличение счетчика заполненных мест уровня и обновление is_full"""
+        if level == 1:
+            self.first_level_count = self.first_level_count + 1
+        else:
+            self.second_level_count = self.second_level_count + 1
+
+        self.is_full = (
+            self.first_level_count == self.level_length
+            and self.second_level_count == self.level_length * self.level_length
+        )
+
+    def get_level_slots(self, level: int) -> list[MatrixSlot]:
+        """Занятые места уровня в порядке position"""
+        return sorted(
+            (MatrixSlot.from_row(row) for row in self.slots if row[0] == level),
+            key=lambda slot: slot.position,
+        )
+
+    def get_slot(self, matrix_id: uuid.UUID) -> MatrixSlot | None:
+        for row in self.slots:
+            if row[2] == str(matrix_id):
+                return MatrixSlot.from_row(row)
+
+        return None
+
+    def get_children_slots(self, slot: MatrixSlot) -> list[MatrixSlot]:
+        """Места второго уровня под местом первого уровня"""
+        return [
+            child_slot for child_slot in self.get_level_slots(level=2)
+            if child_slot.position // self.level_length == slot.position
+        ]
+
+    def add_first_level_slot(
+            self,
+            matrix_id: uuid.UUID,
+            user_id: int | None,
+            username: str | None,
+            joined_at: datetime,
+    ) -> MatrixSlot:
+        """Занятие следующего свободного места первого уровня"""
+        return self._append_slot(
+            level=1,
+            position=len(self.get_level_slots(level=1)),
+            matrix_id=matrix_id,
+            user_id=user_id,
+            username=username,
+            joined_at=joined_at,
+        )
+
+    def add_second_level_slot(
+            self,
+            parent_matrix_id: uuid.UUID,
+            matrix_id: uuid.UUID,
+            user_id: int | None,
+            username: str | None,
+            joined_at: datetime,
+    ) -> MatrixSlot:
+        """Занятие места второго уровня под местом первого уровня матрицы parent_matrix_id"""
+        parent_slot = self.get_slot(parent_matrix_id)
+        if parent_slot is None or parent_slot.level != 1:
+            raise ValueError(
+                f"Матрица {parent_matrix_id} не занимает место первого уровня матрицы {self.id}"
+            )
+
+        return self._append_slot(
+            level=2,
+            position=(
+                parent_slot.position * self.level_length
+                + len(self.get_children_slots(parent_slot))
+            ),
+            matrix_id=matrix_id,
+            user_id=user_id,
+            username=username,
+            joined_at=joined_at,
+        )
+
+    def _append_slot(self, **slot_data) -> MatrixSlot:
+        slot = MatrixSlot(**slot_data)
+        self.slots.append(slot.to_row())
+
+        return slot
+
+
+class MatrixEdge(UUIDMixin, TimestampedMixin, Base):
+    """
+    Связь матрицы с дочерней матрицей первого или второго уровня.
+    Дублирует структуру Matrix.matrices для поиска по индексам.
+    """
+
+    __tablename__ = "matrix_edges"
+
+    parent_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("matrices.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    child_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("matrices.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    level = Column(Integer, nullable=False)
+    position = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("parent_id", "child_id", name="unique_matrix_edge"),
+        UniqueConstraint("parent_id", "level", "position", name="unique_matrix_edge_position"),
+        Index("ix_matrix_edges_child_id_level", "child_id", "level"),
+        Index("ix_matrix_edges_parent_id_level", "parent_id", "level"),
+        {"extend_existing": True},
+    )
+
+
+class MatrixWaitlist(UUIDMixin, TimestampedMixin, Base):
+    """
+    Пользователь, ожидающий освобождения места в матрице
+    (все места заняты неподтвержденными донатами).
+    Пользователь ожидает не больше одной матрицы каждого типа построения.
+    """
+
+    __tablename__ = "matrix_waitlist"
+
+    matrix_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("matrices.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    telegram_user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("telegram_users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    user_id = Column(BigInteger, nullable=False)
+    build_type = Column(Enum(MatrixBuildType), nullable=False)
+    donate_sum = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "telegram_user_id", "build_type", name="unique_matrix_waitlist_user_build_type"
+        ),
+        {"extend_existing": True},
+    )
 
-    __table_args__ = {"extend_existing": True}
 
+class AdminMatrixPool(UUIDMixin, TimestampedMixin, Base):
+    """
+    Курсор матриц администратора одного статуса и типа построения:
+    первая незаполненная матрица, в которую отправляются донаты без спонсора,
+    и следующая матрица, созданная заранее к моменту заполнения текущей.
+    """
 
+    __tablename__ = "admin_matrix_pools"
+
+    status = Column(Enum(DonateStatus), nullable=False)
+    build_type = Column(Enum(MatrixBuildType), nullable=False)
+    matrix_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("matrices.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    next_matrix_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("matrices.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    __table_args__ = (
+        UniqueConstraint("status", "build_type", name="unique_admin_matrix_pool_status_build_type"),
+        {"extend_existing": True},
+    )
@@ -21,6 +21,10 @@ class TimestampedMixin:
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
+    # Значения func.now() возвращаются через RETURNING сразу после INSERT/UPDATE,
+    # иначе обращение к ним в асинхронной сессии вызвало бы ленивую загрузку.
+    __mapper_args__ = {"eager_defaults": True}
+
 
 class AbstractTelegramUser:
     """Базовый пользователь телеграм"""
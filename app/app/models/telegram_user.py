@@ -11,6 +11,7 @@ from sqlalchemy import (
     BigInteger,
     UniqueConstraint,
     String,
+    Index,
 )
 from sqlalchemy.orm import relationship
 
@@ -38,23 +39,21 @@ class DonateStatus(enum.Enum):
             matrix_build_type: MatrixBuildType = MatrixBuildType.TRINARY
     ) -> int:
         """Получение суммы доната"""
-        donate_status_data = self.get_donate_status_data(matrix_build_type)
+        from app.models.tiers import get_donate_value
 
-        return donate_status_data.get(self)
+        return get_donate_value(self, matrix_build_type)
 
     @classmethod
     def get_donate_status_data(
             cls,
             matrix_build_type: MatrixBuildType = MatrixBuildType.TRINARY
     ) -> dict:
-        if matrix_build_type == MatrixBuildType.TRINARY:
-            donate_status_data = cls.get_trinary_donations_data()
-        elif matrix_build_type == MatrixBuildType.BINARY:
-            donate_status_data = cls.get_binary_donations_data()
-        else:
+        from app.models.tiers import DONATE_VALUES
+
+        if not isinstance(matrix_build_type, MatrixBuildType):
             raise TypeError("Неверный объект типа \"MatrixBuildType\"")
 
-        return donate_status_data
+        return dict(DONATE_VALUES[matrix_build_type])
 
     @classmethod
     def get_status_list(cls) -> list:
@@ -70,27 +69,11 @@ class DonateStatus(enum.Enum):
 
     @classmethod
     def get_binary_donations_data(cls) -> dict:
-        return {
-            cls.BASE: 10,
-            cls.BRONZE: 20,
-            cls.SILVER: 40,
-            cls.GOLD: 80,
-            cls.PLATINUM: 160,
-            cls.DIAMOND: 320,
-            cls.BRILLIANT: 640,
-        }
+        return cls.get_donate_status_data(MatrixBuildType.BINARY)
 
     @classmethod
     def get_trinary_donations_data(cls) -> dict:
-        return {
-            cls.BASE: 10,
-            cls.BRONZE: 30,
-            cls.SILVER: 100,
-            cls.GOLD: 300,
-            cls.PLATINUM: 1000,
-            cls.DIAMOND: 3000,
-            cls.BRILLIANT: 10000,
-        }
+        return cls.get_donate_status_data(MatrixBuildType.TRINARY)
 
 status_list = DonateStatus.get_status_list()
 status_emoji_list = [
@@ -181,12 +164,33 @@ class TelegramUser(UUIDMixin, TimestampedMixin, AbstractTelegramUser, Base):
 
         return None
 
-    def add_to_bill(
-            self,
-            value: int,
-            matrix_build_type: MatrixBuildType
-    ):
-        if matrix_build_type == MatrixBuildType.TRINARY:
-            self.trinary_bill += value
-        if matrix_build_type == MatrixBuildType.BINARY:
-            self.binary_bill += value
+
+class TelegramUserAncestor(UUIDMixin, TimestampedMixin, Base):
+    """
+    Таблица замыкания цепочки спонсоров: пользователь и каждый его спонсор
+    любого уровня с расстоянием до него (depth = 0 - сам пользователь,
+    1 - спонсор, 2 - спонсор спонсора и т. д.).
+    Заполняется при регистрации, спонсор пользователя не меняется
+    (в админке TelegramUserView спонсор не редактируется).
+    """
+
+    __tablename__ = "telegram_user_ancestors"
+
+    user_id = Column(
+        BigInteger,
+        ForeignKey("telegram_users.user_id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    ancestor_user_id = Column(
+        BigInteger,
+        ForeignKey("telegram_users.user_id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    depth = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "ancestor_user_id", name="unique_telegram_user_ancestor"),
+        Index("ix_telegram_user_ancestors_user_id_depth", "user_id", "depth"),
+        Index("ix_telegram_user_ancestors_ancestor_user_id_depth", "ancestor_user_id", "depth"),
+        {"extend_existing": True},
+    )
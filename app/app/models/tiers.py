@@ -0,0 +1,87 @@
+"""
+Таблицы статусов (тиров) доната.
+Строятся один раз при импорте и не изменяются: суммы донатов
+по типам построения, обратные таблицы сумма -> статус и порядковые номера статусов.
+"""
+from types import MappingProxyType
+from typing import Mapping
+
+from app.models.telegram_user import DonateStatus, MatrixBuildType
+
+
+# Статусы по возрастанию, без NOT_ACTIVE
+STATUSES: tuple[DonateStatus, ...] = tuple(
+    status for status in DonateStatus if status != DonateStatus.NOT_ACTIVE
+)
+
+# Порядковый номер статуса, у NOT_ACTIVE -1
+STATUS_RANKS: Mapping[DonateStatus, int] = MappingProxyType(
+    {DonateStatus.NOT_ACTIVE: -1}
+    | {status: rank for rank, status in enumerate(STATUSES)}
+)
+
+DONATE_VALUES: Mapping[MatrixBuildType, Mapping[DonateStatus, int]] = MappingProxyType({
+    MatrixBuildType.BINARY: MappingProxyType(
+        dict(zip(STATUSES, (10, 20, 40, 80, 160, 320, 640)))
+    ),
+    MatrixBuildType.TRINARY: MappingProxyType(
+        dict(zip(STATUSES, (10, 30, 100, 300, 1000, 3000, 10000)))
+    ),
+})
+
+DONATE_VALUE_STATUSES: Mapping[MatrixBuildType, Mapping[int, DonateStatus]] = MappingProxyType({
+    build_type: MappingProxyType({value: status for status, value in values.items()})
+    for build_type, values in DONATE_VALUES.items()
+})
+
+# Суммы обоих типов построения (совпадает только сумма стартового статуса)
+_ALL_DONATE_VALUE_STATUSES: Mapping[int, DonateStatus] = MappingProxyType({
+    value: status
+    for value_statuses in DONATE_VALUE_STATUSES.values()
+    for value, status in value_statuses.items()
+})
+
+
+def get_donate_value(
+        status: DonateStatus,
+        matrix_build_type: MatrixBuildType = MatrixBuildType.TRINARY,
+) -> int | None:
+    """Сумма доната статуса, для NOT_ACTIVE None"""
+    return DONATE_VALUES[matrix_build_type].get(status)
+
+
+def get_status_by_donate_value(
+        donate_value: int,
+        matrix_build_type: MatrixBuildType | None = None,
+) -> DonateStatus | None:
+    """Статус по сумме доната, без matrix_build_type - по суммам обоих типов построения"""
+    if matrix_build_type is None:
+        return _ALL_DONATE_VALUE_STATUSES.get(donate_value)
+
+    return DONATE_VALUE_STATUSES[matrix_build_type].get(donate_value)
+
+
+def get_rank(status: DonateStatus) -> int:
+    return STATUS_RANKS[status]
+
+
+def get_next_status(status: DonateStatus) -> DonateStatus | None:
+    """Следующий статус, для BRILLIANT None"""
+    rank = STATUS_RANKS[status] + 1
+    return STATUSES[rank] if rank < len(STATUSES) else None
+
+
+def get_previous_status(status: DonateStatus) -> DonateStatus | None:
+    """Предыдущий статус, для BASE и NOT_ACTIVE None"""
+    rank = STATUS_RANKS[status] - 1
+    return STATUSES[rank] if rank >= 0 else None
+
+
+def get_statuses_from(status: DonateStatus) -> tuple[DonateStatus, ...]:
+    """Статусы не ниже status"""
+    return STATUSES[max(STATUS_RANKS[status], 0):]
+
+
+def is_status_higher(status: DonateStatus, other_status: DonateStatus) -> bool:
+    """Выше ли status, чем other_status"""
+    return STATUS_RANKS[status] > STATUS_RANKS[other_status]
@@ -4,6 +4,8 @@ from typing import Generic, Optional, Type, TypeVar
 from sqlalchemy.exc import NoResultFound, MultipleResultsFound
 from sqlalchemy import select, update, delete
 
+from app.utils.pagination import QueryPaginator
+
 
 ModelType = TypeVar("ModelType")
 
@@ -15,16 +17,16 @@ class RepositoryBase(Generic[ModelType,]):
         self._model = model
         self._session = session
 
-    def create(self, obj_in) -> ModelType:
+    async def create(self, obj_in) -> ModelType:
         obj_in_data = dict(obj_in)
         db_obj = self._model(**obj_in_data)
 
         self._session.add(db_obj)
-        self._session.flush()
+        await self._session.flush()
 
         return db_obj
 
-    def get(
+    async def get(
         self,
         *args,
         **kwargs,
@@ -35,13 +37,28 @@ class RepositoryBase(Generic[ModelType,]):
             .filter_by(**kwargs)
             .order_by(self._model.created_at)
         )
-        return self._session.execute(statement).scalars().first()
+        return (await self._session.execute(statement)).scalars().first()
+
+    async def paginate(
+        self,
+        statement,
+        page_number: int = 1,
+        per_page: int = 1,
+        cursor=None,
+    ) -> QueryPaginator:
+        paginator = QueryPaginator(
+            statement,
+            page_number=page_number,
+            per_page=per_page,
+            cursor=cursor,
+        )
+        return await paginator.paginate(self._session)
 
-    def list(self, *args, **kwargs):
+    async def list(self, *args, **kwargs):
         statement = select(self._model).filter(*args).filter_by(**kwargs)
-        return self._session.execute(statement).scalars().all()
+        return (await self._session.execute(statement)).scalars().all()
 
-    def update(self, *, obj_id: UUID, obj_in) -> ModelType:
+    async def update(self, *, obj_id: UUID, obj_in) -> ModelType:
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
@@ -50,18 +67,18 @@ class RepositoryBase(Generic[ModelType,]):
         statement = (
             update(self._model).where(self._model.id == obj_id).values(**update_data)
         )
-        self._session.execute(statement)
+        await self._session.execute(statement)
 
-        return self._session.get(self._model, obj_id)
+        return await self._session.get(self._model, obj_id)
 
-    def delete(self, *args, obj_id: UUID, **kwargs) -> None:
+    async def delete(self, *args, obj_id: UUID, **kwargs) -> None:
         statement = delete(self._model).where(self._model.id == obj_id)
-        self._session.execute(statement)
+        await self._session.execute(statement)
 
-    def exists(self, *args, **kwargs) -> bool:
+    async def exists(self, *args, **kwargs) -> bool:
         try:
             statement = select(self._model).filter(*args).filter_by(**kwargs)
-            self._session.execute(statement).one()
+            (await self._session.execute(statement)).one()
             return True
         except NoResultFound:
             return False
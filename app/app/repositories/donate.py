@@ -1,18 +1,20 @@
 import uuid
+from datetime import timedelta
 from typing import List
 
-from sqlalchemy import select, delete, update, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, insert, delete, update, func
+from sqlalchemy.orm import selectinload, joinedload
 
 from app.models.telegram_user import TelegramUser, DonateStatus,  MatrixBuildType
 from .base import RepositoryBase
+from app.utils.pagination import QueryPaginator
 from app.models.donate import Donate, DonateTransaction
 
 
 class RepositoryDonate(RepositoryBase[Donate]):
     """Репозиторий доната"""
 
-    def get_donates_list(self, *args, **kwargs):
+    async def get_donates_list(self, *args, **kwargs):
         statement = (
             select(Donate)
             .filter(*args)
@@ -20,9 +22,30 @@ class RepositoryDonate(RepositoryBase[Donate]):
             .order_by(Donate.created_at.desc())
         )
 
-        return self._session.execute(statement).scalars().all()
+        return (await self._session.execute(statement)).scalars().all()
 
-    def get_donate_by_telegram_user_id(
+    async def paginate_donates_with_transactions(
+            self,
+            *args,
+            page_number: int = 1,
+            per_page: int = 1,
+            **kwargs,
+    ) -> QueryPaginator:
+        """Страница донатов вместе с отправителем, транзакциями и спонсорами транзакций"""
+        statement = (
+            select(Donate)
+            .options(
+                joinedload(Donate.telegram_user),
+                selectinload(Donate.transactions).joinedload(DonateTransaction.sponsor),
+            )
+            .filter(*args)
+            .filter_by(**kwargs)
+            .order_by(Donate.created_at.desc())
+        )
+
+        return await self.paginate(statement, page_number=page_number, per_page=per_page)
+
+    async def get_donate_by_telegram_user_id(
             self,
             telegram_user_id: uuid.UUID,
             matrix_build_type: MatrixBuildType,
@@ -37,9 +60,9 @@ class RepositoryDonate(RepositoryBase[Donate]):
             )
         ).order_by(Donate.created_at.desc())
 
-        return self._session.execute(statement).scalars().all()
+        return (await self._session.execute(statement)).scalars().all()
 
-    def delete_donate_with_transactions(self, donate_id: uuid.UUID):
+    async def delete_donate_with_transactions(self, donate_id: uuid.UUID):
         delete_transactions_statement = (
             delete(DonateTransaction)
             .where(DonateTransaction.donate_id == donate_id)
@@ -50,10 +73,10 @@ class RepositoryDonate(RepositoryBase[Donate]):
             .where(Donate.id == donate_id)
         )
 
-        self._session.execute(delete_transactions_statement)
-        self._session.execute(delete_donate_statement)
+        await self._session.execute(delete_transactions_statement)
+        await self._session.execute(delete_donate_statement)
 
-    def cancel_donate_with_transactions(self, donate_id: uuid.UUID):
+    async def cancel_donate_with_transactions(self, donate_id: uuid.UUID):
         cancel_transactions_statement = (
             update(DonateTransaction)
             .where(DonateTransaction.donate_id == donate_id)
@@ -66,19 +89,118 @@ class RepositoryDonate(RepositoryBase[Donate]):
             .values(is_canceled=True)
         )
 
-        self._session.execute(cancel_transactions_statement)
-        self._session.execute(cancel_donate_statement)
+        await self._session.execute(cancel_transactions_statement)
+        await self._session.execute(cancel_donate_statement)
+
+    async def lock_donate_by_transaction_id(
+            self,
+            donate_transaction_id: uuid.UUID,
+    ) -> Donate | None:
+        """
+        Блокировка доната транзакции до конца транзакции БД (SELECT ... FOR UPDATE).
+        Подтверждения транзакций одного доната выполняются по очереди,
+        поэтому подтверждение последней транзакции видит все предыдущие.
+        """
+        statement = (
+            select(Donate)
+            .join(DonateTransaction, DonateTransaction.donate_id == Donate.id)
+            .where(DonateTransaction.id == donate_transaction_id)
+            .with_for_update(of=Donate)
+            .execution_options(populate_existing=True)
+        )
+
+        return (await self._session.execute(statement)).scalars().first()
+
+    async def confirm_if_transactions_confirmed(self, donate_id: uuid.UUID) -> bool:
+        """
+        Подтверждение доната, если подтверждены все его транзакции.
+        True - донат подтвержден этим вызовом.
+        """
+        has_unconfirmed_transactions = (
+            select(DonateTransaction.id)
+            .where(
+                (DonateTransaction.donate_id == donate_id)
+                & DonateTransaction.is_confirmed.is_(False)
+            )
+            .exists()
+        )
+        statement = (
+            update(Donate)
+            .where(
+                (Donate.id == donate_id)
+                & Donate.is_confirmed.is_(False)
+                & ~has_unconfirmed_transactions
+            )
+            .values(is_confirmed=True)
+            .returning(Donate.id)
+        )
+
+        return (await self._session.execute(statement)).scalar() is not None
+
+    async def cancel_expired_donates(
+            self,
+            confirmation_time: timedelta,
+            donate_id: uuid.UUID | None = None,
+    ) -> list[tuple[uuid.UUID, uuid.UUID, int]]:
+        """
+        Отмена всех неподтвержденных донатов (или только donate_id),
+        созданных раньше чем confirmation_time назад,
+        вместе с транзакциями - одним запросом (UPDATE ... RETURNING).
+        Возвращает (id доната, id матрицы, user_id отправителя) отмененных донатов.
+        """
+        has_unconfirmed_transactions = (
+            select(DonateTransaction.id)
+            .where(
+                (DonateTransaction.donate_id == Donate.id)
+                & DonateTransaction.is_confirmed.is_(False)
+            )
+            .exists()
+        )
+        expired_donates_filter = (
+            Donate.is_confirmed.is_(False)
+            & Donate.is_canceled.is_(False)
+            & (Donate.created_at < func.now() - confirmation_time)
+            & has_unconfirmed_transactions
+        )
+        if donate_id is not None:
+            expired_donates_filter &= Donate.id == donate_id
+
+        expired_donates = (
+            update(Donate)
+            .where(expired_donates_filter)
+            .values(is_canceled=True)
+            .returning(Donate.id, Donate.matrix_id, Donate.telegram_user_id)
+            .cte("expired_donates")
+        )
+        canceled_transactions = (
+            update(DonateTransaction)
+            .where(DonateTransaction.donate_id.in_(select(expired_donates.c.id)))
+            .values(is_canceled=True)
+            .returning(DonateTransaction.id)
+            .cte("canceled_transactions")
+        )
+        statement = (
+            select(
+                expired_donates.c.id,
+                expired_donates.c.matrix_id,
+                TelegramUser.user_id,
+            )
+            .join(TelegramUser, TelegramUser.id == expired_donates.c.telegram_user_id)
+            .add_cte(canceled_transactions)
+        )
+
+        return (await self._session.execute(statement)).tuples().all()
 
-    def get_count(self, *args, **kwargs) -> int:
+    async def get_count(self, *args, **kwargs) -> int:
         statement = (
             select(func.count(Donate.id))
             .filter(*args)
             .filter_by(**kwargs)
         )
 
-        return self._session.execute(statement).scalar()
+        return (await self._session.execute(statement)).scalar()
 
-    def get_donates_by_matrices_ids(
+    async def get_donates_by_matrices_ids(
             self,
             matrices_ids: List[uuid.UUID | str],
             **kwargs,
@@ -90,29 +212,81 @@ class RepositoryDonate(RepositoryBase[Donate]):
             .order_by(Donate.created_at.desc())
         )
 
-        return self._session.execute(statement).scalars().all()
+        return (await self._session.execute(statement)).scalars().all()
+
+    async def count_pending_by_matrix_ids(
+            self,
+            matrices_ids: List[uuid.UUID],
+    ) -> dict[uuid.UUID, int]:
+        """Количество неподтвержденных и неотмененных донатов по каждой матрице"""
+        if not matrices_ids:
+            return {}
+
+        statement = (
+            select(Donate.matrix_id, func.count(Donate.id))
+            .filter(
+                Donate.matrix_id.in_(matrices_ids),
+                Donate.is_confirmed.is_(False),
+                Donate.is_canceled.is_(False),
+            )
+            .group_by(Donate.matrix_id)
+        )
+        result = (await self._session.execute(statement)).tuples().all()
+
+        return dict(result)
 
 
 class RepositoryDonateTransaction(RepositoryBase[DonateTransaction]):
     """Репозиторий доната"""
 
-    def get_transactions_list(self):
+    async def bulk_create(self, objs_in: list[dict]) -> list[DonateTransaction]:
+        """Создание транзакций одним INSERT ... RETURNING, порядок как в objs_in"""
+        if not objs_in:
+            return []
+
+        statement = insert(DonateTransaction).returning(
+            DonateTransaction, sort_by_parameter_order=True
+        )
+
+        return (await self._session.scalars(statement, objs_in)).all()
+
+    async def confirm(self, donate_transaction_id: uuid.UUID) -> DonateTransaction | None:
+        """
+        Подтверждение неподтвержденной и неотмененной транзакции (UPDATE ... RETURNING).
+        None - транзакция уже подтверждена или отменена.
+        """
+        statement = (
+            update(DonateTransaction)
+            .where(
+                (DonateTransaction.id == donate_transaction_id)
+                & DonateTransaction.is_confirmed.is_(False)
+                & DonateTransaction.is_canceled.is_(False)
+            )
+            .values(is_confirmed=True)
+            .returning(DonateTransaction)
+            .execution_options(populate_existing=True)
+        )
+
+        return (await self._session.execute(statement)).scalars().first()
+
+    async def get_transactions_list(self):
         statement = select(DonateTransaction).order_by(
-            DonateTransaction.created_at.desc()
+            DonateTransaction.created_at.desc(),
+            DonateTransaction.position.desc(),
         )
 
-        return self._session.execute(statement).scalars().all()
+        return (await self._session.execute(statement)).scalars().all()
 
-    def get_donate_transaction_by_sponsor_id(self, sponsor_id: uuid.UUID):
+    async def get_donate_transaction_by_sponsor_id(self, sponsor_id: uuid.UUID):
         statement = (
             select(DonateTransaction)
             .filter_by(sponsor_id=sponsor_id)
-            .order_by(DonateTransaction.created_at.desc())
+            .order_by(DonateTransaction.created_at.desc(), DonateTransaction.position.desc())
         )
 
-        return self._session.execute(statement).scalars().all()
+        return (await self._session.execute(statement)).scalars().all()
 
-    def get_donate_transaction_by_sponsor_id_and_matrix_build_type(
+    async def get_donate_transaction_by_sponsor_id_and_matrix_build_type(
             self,
             sponsor_id: uuid.UUID,
             matrix_build_type: MatrixBuildType,
@@ -121,7 +295,25 @@ class RepositoryDonateTransaction(RepositoryBase[DonateTransaction]):
             select(DonateTransaction)
             .join(Donate).filter(Donate.matrix_build_type == matrix_build_type)
             .filter(DonateTransaction.sponsor_id == sponsor_id)
-            .order_by(DonateTransaction.created_at.desc())
+            .order_by(DonateTransaction.created_at.desc(), DonateTransaction.position.desc())
+        )
+
+        return (await self._session.execute(statement)).scalars().all()
+
+    async def paginate_donate_transactions_by_sponsor_id_and_matrix_build_type(
+            self,
+            sponsor_id: uuid.UUID,
+            matrix_build_type: MatrixBuildType,
+            page_number: int = 1,
+            per_page: int = 1,
+    ) -> QueryPaginator:
+        """Страница транзакций спонсора вместе с донатом и отправителем"""
+        statement = (
+            select(DonateTransaction)
+            .join(Donate).filter(Donate.matrix_build_type == matrix_build_type)
+            .options(joinedload(DonateTransaction.donate).joinedload(Donate.telegram_user))
+            .filter(DonateTransaction.sponsor_id == sponsor_id)
+            .order_by(DonateTransaction.created_at.desc(), DonateTransaction.position.desc())
         )
 
-        return self._session.execute(statement).scalars().all()
+        return await self.paginate(statement, page_number=page_number, per_page=per_page)
@@ -1,11 +1,13 @@
 import uuid
 
-from sqlalchemy import select, cast, func, BigInteger, any_
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import select, insert, delete, cast, func, literal, BigInteger, any_, union
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
+from sqlalchemy.orm import aliased
 
-from app.models.telegram_user import TelegramUser, DonateStatus
+from app.models.telegram_user import TelegramUser, TelegramUserAncestor, DonateStatus
+from app.models.tiers import get_statuses_from
 from .base import RepositoryBase
-from app.models.matrix import Matrix
+from app.models.matrix import Matrix, MatrixEdge, MatrixWaitlist, AdminMatrixPool
 
 from ..models.telegram_user import MatrixBuildType
 
@@ -13,29 +15,32 @@ from ..models.telegram_user import MatrixBuildType
 class RepositoryMatrix(RepositoryBase[Matrix]):
     """Репозиторий матрицы"""
 
-    def get_parent_matrix(
+    async def get_parent_matrix(
             self, matrix_id: Matrix.id, status: DonateStatus, return_all: bool = False
     ) -> Matrix | list[Matrix]:
         statement = (
             select(Matrix)
+            .join(MatrixEdge, MatrixEdge.parent_id == Matrix.id)
             .where(
-                (Matrix.status == status)
-                & (Matrix.matrices.has_key(str(matrix_id)))
+                (MatrixEdge.child_id == matrix_id)
+                & (MatrixEdge.level == 1)
+                & (Matrix.status == status)
             )
             .order_by(Matrix.created_at)
         )
         if return_all:
-            result = self._session.execute(statement).scalars().all()
+            result = (await self._session.execute(statement)).scalars().all()
         else:
-            result = self._session.execute(statement).scalars().first()
+            result = (await self._session.execute(statement)).scalars().first()
 
         return result
 
-    def get_user_matrices(
+    async def get_user_matrices(
             self,
             owner_id: uuid.UUID,
             status: DonateStatus | None = None,
             build_type: MatrixBuildType | None = None,
+            is_full: bool | None = None,
     ) -> list[Matrix]:
         statement_filter_by_kwargs = {"owner_id": owner_id}
 
@@ -43,6 +48,8 @@ class RepositoryMatrix(RepositoryBase[Matrix]):
             statement_filter_by_kwargs["status"] = status
         if build_type:
             statement_filter_by_kwargs["build_type"] = build_type
+        if is_full is not None:
+            statement_filter_by_kwargs["is_full"] = is_full
 
         statement = (
             select(Matrix)
@@ -50,13 +57,295 @@ class RepositoryMatrix(RepositoryBase[Matrix]):
             .order_by(Matrix.created_at)
         )
 
-        return self._session.execute(statement).scalars().all()
+        return (await self._session.execute(statement)).scalars().all()
 
-    def get_matrices_by_ids_list(self, matrices_ids: list[Matrix.id]) -> list[Matrix]:
+    async def get_first_not_full_matrix(
+            self,
+            owner_id: uuid.UUID,
+            status: DonateStatus,
+            build_type: MatrixBuildType,
+            exclude_ids: list[uuid.UUID],
+    ) -> Matrix | None:
+        """
+        Первая по id незаполненная матрица пользователя, кроме exclude_ids.
+        Одно чтение по индексу ix_matrices_owner_id_status_build_type_is_full.
+        """
+        statement = (
+            select(Matrix)
+            .filter_by(owner_id=owner_id, status=status, build_type=build_type, is_full=False)
+            .filter(Matrix.id.not_in(exclude_ids))
+            .order_by(Matrix.id)
+            .limit(1)
+        )
+
+        return (await self._session.execute(statement)).scalars().first()
+
+    async def get_matrices_by_ids_list(self, matrices_ids: list[Matrix.id]) -> list[Matrix]:
         statement = select(Matrix).filter(Matrix.id.in_(matrices_ids))
 
-        return self._session.execute(statement).scalars().all()
+        return (await self._session.execute(statement)).scalars().all()
+
+    async def get_parent_matrices_by_children_ids(
+            self,
+            matrices_ids: list[uuid.UUID],
+            status: DonateStatus,
+    ) -> dict[uuid.UUID, Matrix]:
+        """Родительские матрицы (по get_parent_matrix) для списка матриц первого уровня"""
+        if not matrices_ids:
+            return {}
 
+        statement = (
+            select(MatrixEdge.child_id, Matrix)
+            .join(MatrixEdge, MatrixEdge.parent_id == Matrix.id)
+            .where(
+                (MatrixEdge.child_id.in_(matrices_ids))
+                & (MatrixEdge.level == 1)
+                & (Matrix.status == status)
+            )
+            .distinct(MatrixEdge.child_id)
+            .order_by(MatrixEdge.child_id, Matrix.created_at)
+        )
+
+        return dict((await self._session.execute(statement)).tuples().all())
+
+    async def get_first_level_matrices_by_parents_ids(
+            self,
+            parents_ids: list[uuid.UUID],
+    ) -> dict[uuid.UUID, list[Matrix]]:
+        """Матрицы первого уровня, отсортированные по created_at, для списка матриц"""
+        first_level_matrices = {parent_id: [] for parent_id in parents_ids}
+        if not parents_ids:
+            return first_level_matrices
+
+        statement = (
+            select(MatrixEdge.parent_id, Matrix)
+            .join(MatrixEdge, MatrixEdge.child_id == Matrix.id)
+            .where(
+                (MatrixEdge.parent_id.in_(parents_ids))
+                & (MatrixEdge.level == 1)
+            )
+            .order_by(Matrix.created_at)
+        )
+        for parent_id, matrix in (await self._session.execute(statement)).tuples():
+            first_level_matrices[parent_id].append(matrix)
+
+        return first_level_matrices
+
+    async def add_matrix_edge(
+            self,
+            parent_id: uuid.UUID,
+            child_id: uuid.UUID,
+            level: int,
+    ) -> None:
+        """
+        Добавление дочерней матрицы в конец уровня родительской матрицы.
+        Позиция считается по уже добавленным связям, поэтому вызывается
+        под блокировкой строки родительской матрицы (lock_matrices),
+        одинаковую позицию конкурентных вставок отклоняет unique_matrix_edge_position.
+        """
+        position = (
+            select(func.count(MatrixEdge.id))
+            .filter_by(parent_id=parent_id, level=level)
+            .scalar_subquery()
+        )
+        statement = insert(MatrixEdge).values(
+            parent_id=parent_id,
+            child_id=child_id,
+            level=level,
+            position=position,
+        )
+
+        await self._session.execute(statement)
+
+    async def get_sponsors_chain_free_matrices(
+            self,
+            sponsor_user_id: int,
+            status: DonateStatus,
+            build_type: MatrixBuildType,
+    ) -> list[Matrix]:
+        """
+        Поиск матриц со свободными местами у ближайшего подходящего спонсора
+        по цепочке спонсоров (первый спонсор подходит всегда, следующие -
+        если их статус не ниже статуса матрицы).
+        Цепочка берется из таблицы замыкания telegram_user_ancestors одним индексным запросом.
+        """
+        status_field = TelegramUser.binary_status \
+            if build_type == MatrixBuildType.BINARY else TelegramUser.trinary_status
+        eligible_statuses = get_statuses_from(status)
+
+        sponsors_chain = (
+            select(
+                TelegramUser.id,
+                TelegramUserAncestor.depth,
+                (
+                    (TelegramUserAncestor.depth == 0) | status_field.in_(eligible_statuses)
+                ).label("is_eligible"),
+            )
+            .join(TelegramUser, TelegramUser.user_id == TelegramUserAncestor.ancestor_user_id)
+            .filter(TelegramUserAncestor.user_id == sponsor_user_id)
+            .cte("sponsors_chain")
+        )
+
+        free_matrices_filter = (
+            (Matrix.status == status)
+            & (Matrix.build_type == build_type)
+            & (Matrix.is_full.is_(False))
+        )
+        sponsor_depth = (
+            select(func.min(sponsors_chain.c.depth))
+            .join(Matrix, Matrix.owner_id == sponsors_chain.c.id)
+            .filter(sponsors_chain.c.is_eligible, free_matrices_filter)
+            .scalar_subquery()
+        )
+        statement = (
+            select(Matrix)
+            .join(sponsors_chain, Matrix.owner_id == sponsors_chain.c.id)
+            .filter((sponsors_chain.c.depth == sponsor_depth) & free_matrices_filter)
+            .order_by(Matrix.created_at)
+        )
 
+        return (await self._session.execute(statement)).scalars().all()
 
+    async def lock_matrices(self, matrices_ids: list[uuid.UUID]) -> list[Matrix]:
+        """
+        Блокировка матриц до конца транзакции (SELECT ... FOR NO KEY UPDATE).
+        Строки блокируются в порядке id, чтобы конкурентные транзакции
+        не блокировали друг друга взаимно, и перечитываются,
+        так как до получения блокировки их могла изменить другая транзакция.
+        """
+        if not matrices_ids:
+            return []
+
+        statement = (
+            select(Matrix)
+            .filter(Matrix.id.in_(set(matrices_ids)))
+            .order_by(Matrix.id)
+            .with_for_update(key_share=True)
+            .execution_options(populate_existing=True)
+        )
+
+        return (await self._session.execute(statement)).scalars().all()
+
+
+class RepositoryMatrixWaitlist(RepositoryBase[MatrixWaitlist]):
+    """Репозиторий листа ожидания матриц"""
+
+    async def add(
+            self,
+            matrix_id: uuid.UUID,
+            telegram_user_id: uuid.UUID,
+            user_id: int,
+            build_type: MatrixBuildType,
+            donate_sum: int,
+    ) -> None:
+        """Добавление в лист ожидания, повторное ожидание заменяет предыдущее"""
+        statement = pg_insert(MatrixWaitlist).values(
+            id=uuid.uuid4(),
+            matrix_id=matrix_id,
+            telegram_user_id=telegram_user_id,
+            user_id=user_id,
+            build_type=build_type,
+            donate_sum=donate_sum,
+        )
+        statement = statement.on_conflict_do_update(
+            constraint="unique_matrix_waitlist_user_build_type",
+            set_={
+                "matrix_id": statement.excluded.matrix_id,
+                "donate_sum": statement.excluded.donate_sum,
+                "updated_at": func.now(),
+            },
+        )
+
+        await self._session.execute(statement)
+
+    async def get_by_affected_matrix_id(
+            self,
+            matrix_id: uuid.UUID,
+    ) -> list[MatrixWaitlist]:
+        """
+        Ожидающие матриц, на свободные места которых влияют донаты в матрицу matrix_id:
+        сама матрица, ее родитель, ее матрицы первого уровня и матрицы первого уровня родителя.
+        """
+        sibling_edge = aliased(MatrixEdge)
+        affected_matrices_ids = union(
+            select(literal(matrix_id, type_=MatrixEdge.child_id.type)),
+            select(MatrixEdge.parent_id).filter_by(child_id=matrix_id, level=1),
+            select(MatrixEdge.child_id).filter_by(parent_id=matrix_id, level=1),
+            select(sibling_edge.child_id)
+            .join(MatrixEdge, MatrixEdge.parent_id == sibling_edge.parent_id)
+            .where(
+                (MatrixEdge.child_id == matrix_id)
+                & (MatrixEdge.level == 1)
+                & (sibling_edge.level == 1)
+            ),
+        )
+        statement = (
+            select(MatrixWaitlist)
+            .filter(MatrixWaitlist.matrix_id.in_(affected_matrices_ids))
+            .order_by(MatrixWaitlist.created_at)
+        )
+
+        return (await self._session.execute(statement)).scalars().all()
+
+    async def delete_by_ids(self, ids: list[uuid.UUID]) -> list[MatrixWaitlist]:
+        """
+        Удаление записей с возвратом удаленных (DELETE ... RETURNING).
+        Запись, уже удаленная конкурентной транзакцией, не возвращается,
+        поэтому каждый ожидающий получает уведомление один раз.
+        """
+        if not ids:
+            return []
+
+        statement = (
+            delete(MatrixWaitlist)
+            .where(MatrixWaitlist.id.in_(ids))
+            .returning(MatrixWaitlist)
+        )
+
+        return (await self._session.execute(statement)).scalars().all()
+
+    async def delete_by_telegram_user_id(
+            self,
+            telegram_user_id: uuid.UUID,
+            build_type: MatrixBuildType,
+    ) -> None:
+        statement = delete(MatrixWaitlist).filter_by(
+            telegram_user_id=telegram_user_id, build_type=build_type
+        )
+
+        await self._session.execute(statement)
+
+
+class RepositoryAdminMatrixPool(RepositoryBase[AdminMatrixPool]):
+    """Репозиторий курсоров матриц администратора"""
+
+    async def lock_pool_key(
+            self,
+            status: DonateStatus,
+            build_type: MatrixBuildType,
+    ) -> None:
+        """
+        Блокировка курсора статуса и типа построения до конца транзакции
+        (pg_advisory_xact_lock), в том числе еще не созданного.
+        """
+        statement = select(
+            func.pg_advisory_xact_lock(
+                func.hashtext(f"{AdminMatrixPool.__tablename__}:{status.name}:{build_type.name}")
+            )
+        )
+
+        await self._session.execute(statement)
+
+    async def lock_by_matrix_id(self, matrix_id: uuid.UUID) -> AdminMatrixPool | None:
+        """Блокировка курсора, текущая или следующая матрица которого - matrix_id"""
+        statement = (
+            select(AdminMatrixPool)
+            .where(
+                (AdminMatrixPool.matrix_id == matrix_id)
+                | (AdminMatrixPool.next_matrix_id == matrix_id)
+            )
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
 
+        return (await self._session.execute(statement)).scalars().first()
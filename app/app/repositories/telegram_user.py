@@ -1,8 +1,11 @@
-from sqlalchemy import select, text, func
-from sqlalchemy.orm import joinedload
+from uuid import UUID
+
+from sqlalchemy import select, insert, update, func, literal, union_all, BigInteger
+from sqlalchemy.orm import joinedload, aliased
 
 from .base import RepositoryBase
-from app.models.telegram_user import TelegramUser
+from app.utils.pagination import QueryPaginator
+from app.models.telegram_user import TelegramUser, TelegramUserAncestor
 
 from ..models.telegram_user import MatrixBuildType
 
@@ -10,7 +13,7 @@ from ..models.telegram_user import MatrixBuildType
 class RepositoryTelegramUser(RepositoryBase[TelegramUser]):
     """Репозиторий телеграм пользователя"""
 
-    def get_list(
+    async def get_list(
             self,
             *args,
             join_sponsor: bool = False,
@@ -28,9 +31,40 @@ class RepositoryTelegramUser(RepositoryBase[TelegramUser]):
             .filter_by(**kwargs)
             .order_by(TelegramUser.created_at)
         )
-        return self._session.execute(statement).scalars().all()
+        return (await self._session.execute(statement)).scalars().all()
+
+    async def stream_users_with_sponsors(self, yield_per: int = 1000):
+        """
+        Построчная выгрузка пользователей вместе с данными спонсора.
+        Строки читаются из курсора на стороне сервера пачками по yield_per.
+        """
+        sponsor = aliased(TelegramUser)
+        statement = (
+            select(
+                TelegramUser.depth_level,
+                TelegramUser.username,
+                TelegramUser.first_name,
+                TelegramUser.last_name,
+                sponsor.username.label("sponsor_username"),
+                sponsor.user_id.label("sponsor_user_id"),
+                TelegramUser.trinary_status,
+                TelegramUser.binary_status,
+                TelegramUser.invites_count,
+                TelegramUser.trinary_bill,
+                TelegramUser.binary_bill,
+                TelegramUser.user_id,
+                TelegramUser.created_at,
+            )
+            .outerjoin(sponsor, TelegramUser.sponsor_user_id == sponsor.user_id)
+            .order_by(TelegramUser.created_at)
+            .execution_options(yield_per=yield_per)
+        )
+
+        result = await self._session.stream(statement)
+        async for rows in result.partitions():
+            yield rows
 
-    def get_count(
+    async def get_count(
             self,
             *args,
             **kwargs
@@ -40,9 +74,9 @@ class RepositoryTelegramUser(RepositoryBase[TelegramUser]):
             .filter(*args)
             .filter_by(**kwargs)
         )
-        return self._session.execute(statement).scalar()
+        return (await self._session.execute(statement)).scalar()
 
-    def get_bills(
+    async def get_bills(
             self,
             build_type: MatrixBuildType,
             *args,
@@ -57,9 +91,58 @@ class RepositoryTelegramUser(RepositoryBase[TelegramUser]):
             .filter(*args)
             .filter_by(**kwargs)
         )
-        return self._session.execute(statement).scalars().all()
+        return (await self._session.execute(statement)).scalars().all()
+
+    async def add_to_bill(
+            self,
+            obj_id: UUID,
+            value: int,
+            build_type: MatrixBuildType,
+    ) -> TelegramUser:
+        """Атомарное зачисление на счет (UPDATE ... SET bill = bill + value)"""
+        bill_field = TelegramUser.binary_bill if build_type == MatrixBuildType.BINARY \
+            else TelegramUser.trinary_bill
+
+        return await self._increment(obj_id, bill_field, value)
+
+    async def increase_invites_count(self, obj_id: UUID) -> TelegramUser:
+        """Атомарное увеличение счетчика приглашенных"""
+        return await self._increment(obj_id, TelegramUser.invites_count, 1)
+
+    async def _increment(self, obj_id: UUID, field, value: int) -> TelegramUser:
+        """
+        Увеличение поля одним UPDATE без чтения значения в Python,
+        конкурентные увеличения одного пользователя не теряются.
+        Загруженный в сессию пользователь обновляется из RETURNING.
+        """
+        statement = (
+            update(TelegramUser)
+            .where(TelegramUser.id == obj_id)
+            .values({field: field + value})
+            .returning(TelegramUser)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+
+        return (await self._session.execute(statement)).scalars().first()
+
+    async def get_statuses_statistic(self) -> list[tuple]:
+        """
+        Кол-во пользователей и суммы счетов по парам статусов
+        (тринарный статус, бинарный статус) одним запросом.
+        """
+        statement = (
+            select(
+                TelegramUser.trinary_status,
+                TelegramUser.binary_status,
+                func.count(TelegramUser.id),
+                func.sum(TelegramUser.trinary_bill),
+                func.sum(TelegramUser.binary_bill),
+            )
+            .group_by(TelegramUser.trinary_status, TelegramUser.binary_status)
+        )
+        return (await self._session.execute(statement)).tuples().all()
 
-    def get_invited_users(
+    async def get_invited_users(
             self,
             sponsor_user_id: int
     ):
@@ -70,60 +153,118 @@ class RepositoryTelegramUser(RepositoryBase[TelegramUser]):
             .order_by(TelegramUser.created_at)
         )
 
-        return self._session.execute(statement).scalars().all()
+        return (await self._session.execute(statement)).scalars().all()
 
-    def get_telegram_user_sponsors(
-        self, user_id: int
-    ) -> tuple[TelegramUser, TelegramUser, TelegramUser]:
-        current_user = (
-            self._session.query(TelegramUser).filter_by(user_id=user_id).first()
+    async def paginate_invited_users(
+            self,
+            sponsor_user_id: int,
+            page_number: int = 1,
+            per_page: int = 1,
+    ) -> QueryPaginator:
+        """Страница приглашенных пользователей"""
+        statement = (
+            select(TelegramUser)
+            .filter_by(sponsor_user_id=sponsor_user_id)
+            .order_by(TelegramUser.created_at)
         )
 
-        first_sponsor = (
-            self._session.query(TelegramUser)
-            .join(TelegramUser, TelegramUser.user_id == current_user.sponsor_user_id)
-            .first()
+        return await self.paginate(statement, page_number=page_number, per_page=per_page)
+
+    async def paginate_list(
+            self,
+            *args,
+            page_number: int = 1,
+            per_page: int = 1,
+            **kwargs
+    ) -> QueryPaginator:
+        statement = (
+            select(TelegramUser)
+            .filter(*args)
+            .filter_by(**kwargs)
+            .order_by(TelegramUser.created_at)
         )
 
-        second_sponsor = (
-            self._session.query(TelegramUser)
-            .join(TelegramUser, TelegramUser.user_id == first_sponsor.sponsor_user_id)
-            .first()
+        return await self.paginate(statement, page_number=page_number, per_page=per_page)
+
+    async def add_ancestors(self, user_id: int, sponsor_user_id: int | None) -> None:
+        """
+        Строки таблицы замыкания нового пользователя: сам пользователь
+        и спонсоры sponsor_user_id на один уровень дальше.
+        """
+        rows = select(
+            func.gen_random_uuid(),
+            literal(user_id, BigInteger),
+            literal(user_id, BigInteger),
+            literal(0),
         )
+        if sponsor_user_id is not None:
+            rows = union_all(
+                rows,
+                select(
+                    func.gen_random_uuid(),
+                    literal(user_id, BigInteger),
+                    TelegramUserAncestor.ancestor_user_id,
+                    TelegramUserAncestor.depth + 1,
+                ).filter(TelegramUserAncestor.user_id == sponsor_user_id),
+            )
+        statement = insert(TelegramUserAncestor).from_select(
+            ["id", "user_id", "ancestor_user_id", "depth"], select(rows.subquery())
+        )
+
+        await self._session.execute(statement)
 
-        return current_user, first_sponsor, second_sponsor
-
-    def get_sponsors_for_separating_donate(self, user_id: int):
-        sponsors = []
-        user = self.get(user_id=user_id)
-        while user.sponsor_user_id:
-            sponsor = self.get(user_id=user.sponsor_user_id)
-            sponsors.append(sponsor)
-        return sponsors
-
-    def get_sponsors_chain(self, user_id):
-        recursive_query = text(
-            """
-            WITH RECURSIVE sponsor_chain AS (
-            SELECT user_id, sponsor_user_id, username, first_name FROM telegram_users WHERE user_id = :user_id
-            UNION
-            SELECT tu.user_id, tu.sponsor_user_id, tu.username, tu.first_name FROM telegram_users tu 
-            JOIN sponsor_chain sc ON tu.user_id = sc.sponsor_user_id
+    def _get_ancestors_statement(self, user_id: int, *args):
+        """Пользователь и его спонсоры с расстоянием до них, от ближайшего"""
+        return (
+            select(TelegramUserAncestor.depth, TelegramUser)
+            .join(TelegramUser, TelegramUser.user_id == TelegramUserAncestor.ancestor_user_id)
+            .filter(TelegramUserAncestor.user_id == user_id, *args)
+            .order_by(TelegramUserAncestor.depth)
+        )
+
+    async def get_depth_level(self, user_id: int) -> int | None:
+        """Расстояние от пользователя до администратора по цепочке спонсоров"""
+        statement = (
+            select(TelegramUserAncestor.depth)
+            .join(TelegramUser, TelegramUser.user_id == TelegramUserAncestor.ancestor_user_id)
+            .filter(TelegramUserAncestor.user_id == user_id, TelegramUser.is_admin)
+        )
+
+        return (await self._session.execute(statement)).scalars().first()
+
+    async def get_telegram_user_sponsors(
+        self, user_id: int
+    ) -> tuple[TelegramUser, TelegramUser, TelegramUser]:
+        statement = self._get_ancestors_statement(user_id, TelegramUserAncestor.depth <= 2)
+        users = dict((await self._session.execute(statement)).tuples().all())
+
+        return users.get(0), users.get(1), users.get(2)
+
+    async def get_sponsors_for_separating_donate(self, user_id: int):
+        statement = self._get_ancestors_statement(user_id, TelegramUserAncestor.depth > 0)
+
+        return [sponsor for _, sponsor in (await self._session.execute(statement)).tuples()]
+
+    async def get_sponsors_chain(self, user_id):
+        statement = (
+            select(
+                TelegramUser.user_id.label("sponsor_user_id"),
+                TelegramUser.sponsor_user_id.label("sponsor_of_sponsor_user_id"),
+                TelegramUser.username.label("sponsor_username"),
+                TelegramUser.first_name.label("sponsor_first_name"),
             )
-            SELECT sponsor_chain.user_id AS sponsor_user_id, sponsor_chain.sponsor_user_id AS sponsor_of_sponsor_user_id,
-            sponsor_chain.username AS sponsor_username, sponsor_chain.first_name AS sponsor_first_name
-            FROM sponsor_chain;
-            """
+            .join(TelegramUserAncestor, TelegramUser.user_id == TelegramUserAncestor.ancestor_user_id)
+            .filter(TelegramUserAncestor.user_id == user_id)
+            .order_by(TelegramUserAncestor.depth)
         )
 
-        result = self._session.execute(recursive_query, {"user_id": user_id})
-        return result.fetchall()
+        return (await self._session.execute(statement)).all()
 
-    def get_telegram_users_by_user_ids_list(
+    async def get_telegram_users_by_user_ids_list(
             self,
             telegram_users_ids: list[TelegramUser.user_id]
     ) -> list[TelegramUser]:
         statement = select(TelegramUser).filter(
             TelegramUser.id.in_(telegram_users_ids)
         )
-        return self._session.execute(statement).scalars().all()
+        return (await self._session.execute(statement)).scalars().all()
@@ -0,0 +1,27 @@
+from pydantic import BaseModel, Field
+
+from app.models.telegram_user import DonateStatus, MatrixBuildType
+
+
+class UsersStatisticEntity(BaseModel):
+    """Статистика пользователей для админ-панели"""
+
+    users_count: int = Field(title="Кол-во пользователей", default=0)
+    trinary_statuses: dict[DonateStatus, int] = Field(
+        title="Кол-во пользователей по тринарным статусам", default_factory=dict
+    )
+    binary_statuses: dict[DonateStatus, int] = Field(
+        title="Кол-во пользователей по бинарным статусам", default_factory=dict
+    )
+    trinary_bills_sum: float = Field(title="Сумма тринарных счетов", default=0)
+    binary_bills_sum: float = Field(title="Сумма бинарных счетов", default=0)
+
+    def get_statuses(self, matrix_build_type: MatrixBuildType) -> dict[DonateStatus, int]:
+        if matrix_build_type == MatrixBuildType.BINARY:
+            return self.binary_statuses
+        return self.trinary_statuses
+
+    def get_bills_sum(self, matrix_build_type: MatrixBuildType) -> float:
+        if matrix_build_type == MatrixBuildType.BINARY:
+            return self.binary_bills_sum
+        return self.trinary_bills_sum
@@ -0,0 +1,161 @@
+import uuid
+
+from app.models.matrix import Matrix, AdminMatrixPool
+from app.models.telegram_user import DonateStatus, MatrixBuildType
+from app.repositories.matrix import RepositoryMatrix, RepositoryAdminMatrixPool
+from app.repositories.telegram_user import RepositoryTelegramUser
+from app.schemas.matrix import MatrixEntity
+from app.services.matrix_occupancy_service import MatrixOccupancyService
+from app.utils.sort import get_sorted_objects_by_ids
+
+
+class AdminMatrixPoolService:
+    """
+    Выдача матриц администратора для донатов без подходящего спонсора.
+    Для каждого статуса и типа построения курсор хранит первую незаполненную
+    матрицу и следующую, созданную заранее. Выбор матрицы - чтение курсора
+    и матрицы по первичному ключу, без просмотра всех матриц администратора.
+    Строка курсора всегда блокируется после строк матриц.
+    """
+
+    def __init__(
+            self,
+            repository_admin_matrix_pool: RepositoryAdminMatrixPool,
+            repository_matrix: RepositoryMatrix,
+            repository_telegram_user: RepositoryTelegramUser,
+            matrix_occupancy_service: MatrixOccupancyService,
+    ) -> None:
+        self._repository_admin_matrix_pool = repository_admin_matrix_pool
+        self._repository_matrix = repository_matrix
+        self._repository_telegram_user = repository_telegram_user
+        self._matrix_occupancy_service = matrix_occupancy_service
+
+    async def get_matrices(
+            self,
+            status: DonateStatus,
+            build_type: MatrixBuildType,
+    ) -> list[Matrix]:
+        """
+        Текущая и следующая матрицы курсора (без блокировки).
+        Вызывающий блокирует их одним раундом lock_matrices вместе с остальными
+        матрицами доната и выбирает матрицу через get_free_matrix.
+        """
+        pool = await self._get_pool(status=status, build_type=build_type)
+        matrices_ids = [pool.matrix_id, pool.next_matrix_id]
+
+        return get_sorted_objects_by_ids(
+            await self._repository_matrix.get_matrices_by_ids_list(matrices_ids),
+            matrices_ids,
+        )
+
+    async def get_free_matrix(self, matrices: list[Matrix]) -> Matrix | None:
+        """
+        Первая незаполненная из заблокированных матриц get_matrices.
+        Заполненные матрицы сдвигают курсор, None - заполнены обе,
+        тогда матрицы берутся из курсора заново.
+        """
+        for matrix in matrices:
+            if not matrix.is_full:
+                return matrix
+
+            await self.advance(matrix)
+
+        return None
+
+    async def advance(self, matrix: Matrix) -> None:
+        """
+        Вызывается после заполнения матрицы, для матриц вне курсоров ничего не делает.
+        Заполненная текущая матрица заменяется следующей, а вместо следующей
+        берется другая свободная матрица администратора или создается новая.
+        """
+        pool = await self._repository_admin_matrix_pool.lock_by_matrix_id(matrix.id)
+        if pool is None:
+            return
+
+        if pool.matrix_id == matrix.id:
+            pool.matrix_id = pool.next_matrix_id
+
+        pool.next_matrix_id = await self._get_next_matrix_id(
+            status=pool.status,
+            build_type=pool.build_type,
+            matrix_id=pool.matrix_id,
+        )
+
+    async def _get_pool(
+            self,
+            status: DonateStatus,
+            build_type: MatrixBuildType,
+    ) -> AdminMatrixPool:
+        pool = await self._repository_admin_matrix_pool.get(
+            status=status, build_type=build_type
+        )
+        if pool is None:
+            pool = await self._create_pool(status=status, build_type=build_type)
+
+        return pool
+
+    async def _create_pool(
+            self,
+            status: DonateStatus,
+            build_type: MatrixBuildType,
+    ) -> AdminMatrixPool:
+        """
+        Создание курсора при первом обращении.
+        Конкурентные транзакции создают курсор по очереди (advisory lock),
+        поэтому матрицы для курсора выбираются и создаются один раз.
+        """
+        await self._repository_admin_matrix_pool.lock_pool_key(
+            status=status, build_type=build_type
+        )
+        pool = await self._repository_admin_matrix_pool.get(
+            status=status, build_type=build_type
+        )
+        if pool is not None:
+            return pool
+
+        matrix_id = await self._get_next_matrix_id(status=status, build_type=build_type)
+        next_matrix_id = await self._get_next_matrix_id(
+            status=status, build_type=build_type, matrix_id=matrix_id
+        )
+
+        return await self._repository_admin_matrix_pool.create(
+            obj_in={
+                "status": status,
+                "build_type": build_type,
+                "matrix_id": matrix_id,
+                "next_matrix_id": next_matrix_id,
+            }
+        )
+
+    async def _get_next_matrix_id(
+            self,
+            status: DonateStatus,
+            build_type: MatrixBuildType,
+            matrix_id: uuid.UUID | None = None,
+    ) -> uuid.UUID:
+        """
+        Следующая матрица курсора: первая по id незаполненная матрица администратора,
+        кроме matrix_id, если в ней есть места с учетом неподтвержденных донатов,
+        иначе новая матрица. Проверяется одна матрица-кандидат.
+        """
+        admin = await self._repository_telegram_user.get(is_admin=True)
+        matrix = await self._repository_matrix.get_first_not_full_matrix(
+            owner_id=admin.id,
+            status=status,
+            build_type=build_type,
+            exclude_ids=[matrix_id] if matrix_id else [],
+        )
+        if matrix is not None:
+            matrices_free_with_donates = await self._matrix_occupancy_service.get_matrices_free_with_donates(
+                matrices=[matrix],
+                matrix_build_type=build_type,
+                status=status,
+            )
+            if matrices_free_with_donates[matrix.id]:
+                return matrix.id
+
+        matrix = await self._repository_matrix.create(
+            obj_in=MatrixEntity(owner_id=admin.id, status=status, build_type=build_type)
+        )
+
+        return matrix.id
@@ -1,14 +1,16 @@
-import math
 import uuid
+from datetime import timedelta
 from typing import Tuple, Any, Optional, List
 
 import loguru
 from app.repositories.telegram_user import RepositoryTelegramUser
 from app.repositories.donate import RepositoryDonate, RepositoryDonateTransaction
 from app.models.telegram_user import TelegramUser
-from app.schemas.donate import DonateEntity, DonateTransactionEntity
+from app.models.donate import Donate, DonateTransaction
+from app.schemas.donate import DonateEntity
 from app.schemas.telegram_user import TelegramUserEntity
 from app.models.telegram_user import MatrixBuildType
+from app.utils.pagination import QueryPaginator
 
 
 class DonateConfirmService:
@@ -39,7 +41,7 @@ class DonateConfirmService:
             "matrix_build_type": matrix_build_type,
         }
         donate = DonateEntity(**donate_dict)
-        donate_obj = self._repository_donate.create(obj_in=donate.model_dump())
+        donate_obj = await self._repository_donate.create(obj_in=donate.model_dump())
         await self._create_donate_transaction(
             donate_id=donate_obj.id, donate_data=donate_data
         )
@@ -47,46 +49,48 @@ class DonateConfirmService:
 
     async def _create_donate_transaction(self, donate_id: uuid.UUID, donate_data: dict):
         """
-        Создание конкретной транзакции (часть доната), перечисляемой одному спонсору.
+        Создание транзакций (частей доната), перечисляемых спонсорам.
         При создании доната через create_donate - создаются автоматически.
-        Всю инфу берет из donate_data.
+        Всю инфу берет из donate_data, доля заблокированного спонсора перечисляется админу.
+        Все транзакции создаются одним запросом.
         """
-        for sponsor, sponsor_amount in donate_data.items():
-            if sponsor.is_banned:
-                sponsor = self._repository_telegram_user.get(is_admin=True)
-            donate_transaction_dict = {
-                "sponsor_id": sponsor.id,
-                "donate_id": donate_id,
-                "quantity": sponsor_amount,
-            }
-            donate_transaction_dict_obj = DonateTransactionEntity(
-                **donate_transaction_dict
-            )
-            self._repository_donate_transaction.create(
-                obj_in=donate_transaction_dict_obj.model_dump()
-            )
+        admin = None
+        if any(sponsor.is_banned for sponsor in donate_data):
+            admin = await self._repository_telegram_user.get(is_admin=True)
+
+        return await self._repository_donate_transaction.bulk_create(
+            [
+                {
+                    "sponsor_id": admin.id if sponsor.is_banned else sponsor.id,
+                    "donate_id": donate_id,
+                    "quantity": sponsor_amount,
+                    "position": position,
+                }
+                for position, (sponsor, sponsor_amount) in enumerate(donate_data.items())
+            ]
+        )
 
     async def get_donate_by_id(self, donate_id: uuid.UUID):
         """Получить донат по id доната"""
-        return self._repository_donate.get(id=donate_id)
+        return await self._repository_donate.get(id=donate_id)
 
     async def get_donate_by_telegram_user_id(
             self,
             telegram_user_id: uuid.UUID,
             matrix_build_type: MatrixBuildType,
     ):
-        return self._repository_donate.get_donate_by_telegram_user_id(
+        return await self._repository_donate.get_donate_by_telegram_user_id(
             telegram_user_id=telegram_user_id,
             matrix_build_type=matrix_build_type,
         )
 
     async def get_donate_transaction_by_id(self, donate_transaction_id: uuid.UUID):
         """Получить транзакцию по id"""
-        return self._repository_donate_transaction.get(id=donate_transaction_id)
+        return await self._repository_donate_transaction.get(id=donate_transaction_id)
 
     async def get_donate_transaction_by_sponsor_id(self, sponsor_id: uuid.UUID):
         """Получить список транзакций по id спонсора (кому должны перечислить)."""
-        return self._repository_donate_transaction.get_donate_transaction_by_sponsor_id(
+        return await self._repository_donate_transaction.get_donate_transaction_by_sponsor_id(
             sponsor_id
         )
 
@@ -96,99 +100,121 @@ class DonateConfirmService:
             matrix_build_type: MatrixBuildType,
     ):
         """Получить список транзакций по id спонсора и типу построения (бинар, или тринар)."""
-        return self._repository_donate_transaction.get_donate_transaction_by_sponsor_id_and_matrix_build_type(
+        return await self._repository_donate_transaction.get_donate_transaction_by_sponsor_id_and_matrix_build_type(
+            sponsor_id=sponsor_id,
+            matrix_build_type=matrix_build_type,
+        )
+
+    async def paginate_donate_transactions_by_sponsor_id_and_matrix_build_type(
+            self,
+            sponsor_id: uuid.UUID,
+            matrix_build_type: MatrixBuildType,
+            page_number: int = 1,
+            per_page: int = 1,
+    ) -> QueryPaginator:
+        """
+        Страница транзакций по id спонсора и типу построения.
+        Донат и отправитель транзакции загружаются тем же запросом.
+        """
+        return await self._repository_donate_transaction.paginate_donate_transactions_by_sponsor_id_and_matrix_build_type(
             sponsor_id=sponsor_id,
             matrix_build_type=matrix_build_type,
+            page_number=page_number,
+            per_page=per_page,
         )
 
-    async def get_all_my_donates_and_transactions(
+    async def paginate_my_donates_and_transactions(
             self,
             telegram_user_id: uuid.UUID,
-            matrix_build_type: Optional[MatrixBuildType] = None
-    ):
-        """Получить все свои отправленные донаты в виде словаря {донат: транзакции доната}"""
+            matrix_build_type: Optional[MatrixBuildType] = None,
+            page_number: int = 1,
+            per_page: int = 1,
+    ) -> QueryPaginator:
+        """Страница своих отправленных донатов, транзакции доступны в donate.transactions"""
         get_donates_kwargs = {"telegram_user_id": telegram_user_id}
         if matrix_build_type:
             get_donates_kwargs["matrix_build_type"] = matrix_build_type
 
-        donates = self._repository_donate.get_donates_list(**get_donates_kwargs)
-        output_dict = {}
-        for donate in donates:
-            donate_transactions = self._repository_donate_transaction.list(
-                donate_id=donate.id
-            )
-            output_dict[donate] = donate_transactions
-        return output_dict
+        return await self._repository_donate.paginate_donates_with_transactions(
+            page_number=page_number, per_page=per_page, **get_donates_kwargs
+        )
 
     async def get_donate_transactions_by_donate_id(self, donate_id: uuid.UUID):
-        return self._repository_donate_transaction.list(
+        return await self._repository_donate_transaction.list(
             donate_id=donate_id, is_confirmed=False
         )
 
-    async def get_all_donates_and_transactions(
+    async def paginate_all_donates_and_transactions(
             self,
-            matrix_build_type: Optional[MatrixBuildType] = None
-    ):
-        """Получить все свои отправленные донаты в виде словаря {донат: транзакции доната}"""
+            matrix_build_type: Optional[MatrixBuildType] = None,
+            page_number: int = 1,
+            per_page: int = 1,
+    ) -> QueryPaginator:
+        """Страница всех донатов, транзакции доступны в donate.transactions"""
         get_donates_kwargs = dict()
         if matrix_build_type:
             get_donates_kwargs["matrix_build_type"] = matrix_build_type
 
-        donates = self._repository_donate.get_donates_list(**get_donates_kwargs)
-        output_dict = {}
-        for donate in donates:
-            donate_transactions = self._repository_donate_transaction.list(
-                donate_id=donate.id
-            )
-            output_dict[donate] = donate_transactions
-        return output_dict
+        return await self._repository_donate.paginate_donates_with_transactions(
+            page_number=page_number, per_page=per_page, **get_donates_kwargs
+        )
 
     async def get_all_donate_transactions(self):
-        return self._repository_donate_transaction.get_transactions_list()
+        return await self._repository_donate_transaction.get_transactions_list()
 
-    async def check_donate_is_confirmed(self, donate_id: uuid.UUID) -> bool:
+    async def confirm_donate_transaction(
+            self,
+            donate_transaction_id: uuid.UUID,
+    ) -> tuple[Donate | None, DonateTransaction | None, bool]:
         """
-        Проверка подтвержденности доната.
-        Достает все транзакции, проверяет их подтверденность.
-        Если все транзакции подтверждены, присваивает donate.is_confirmed True.
-        Возвращает булево значение подтверден/не подтвержден весь донат
+        Подтверждение перечисления части доната спонсору.
+        Донат блокируется до конца транзакции БД, транзакция подтверждается
+        одним UPDATE ... RETURNING, донат подтверждается тем же запросом,
+        что проверяет отсутствие неподтвержденных транзакций.
+        Возвращает донат, подтвержденную транзакцию (None - уже подтверждена или отменена)
+        и подтвержден ли этим вызовом весь донат.
         """
-        donate = await self.get_donate_by_id(donate_id=donate_id)
-        donate_transactions = await self.get_donate_transactions_by_donate_id(
-            donate_id=donate_id
+        donate = await self._repository_donate.lock_donate_by_transaction_id(
+            donate_transaction_id=donate_transaction_id
         )
-        is_confirmed_list = []
-        for donate_transaction in donate_transactions:
-            is_confirmed_list.append(donate_transaction.is_confirmed)
-        is_confirmed = math.prod(is_confirmed_list)
-        if donate.is_confirmed != is_confirmed:
-            donate.is_confirmed = bool(is_confirmed)
-        return donate.is_confirmed
-
-    async def set_donate_transaction_is_confirmed(
-        self, donate_transaction_id: uuid.UUID
-    ):
-        """Подтверждение перечисления части доната спонсору"""
-        donate_transaction = self._repository_donate_transaction.get(
-            id=donate_transaction_id
+        if not donate or donate.is_confirmed:
+            return donate, None, False
+
+        donate_transaction = await self._repository_donate_transaction.confirm(
+            donate_transaction_id=donate_transaction_id
         )
-        self._repository_donate_transaction.update(
-            obj_id=donate_transaction.id, obj_in={"is_confirmed": True}
+        if not donate_transaction:
+            return donate, None, False
+
+        is_donate_confirmed = await self._repository_donate.confirm_if_transactions_confirmed(
+            donate_id=donate.id
         )
-        return donate_transaction
+
+        return donate, donate_transaction, is_donate_confirmed
 
     async def delete_donate_with_transactions(self, donate_id: uuid.UUID) -> None:
-        return self._repository_donate.delete_donate_with_transactions(
+        return await self._repository_donate.delete_donate_with_transactions(
             donate_id=donate_id
         )
 
     async def cancel_donate_with_transactions(self, donate_id: uuid.UUID) -> None:
-        return self._repository_donate.cancel_donate_with_transactions(
+        return await self._repository_donate.cancel_donate_with_transactions(
             donate_id=donate_id
         )
 
+    async def cancel_expired_donates(
+            self,
+            confirmation_time: timedelta,
+            donate_id: uuid.UUID | None = None,
+    ) -> list[tuple[uuid.UUID, uuid.UUID, int]]:
+        """Отмена донатов (или только donate_id), не подтвержденных за confirmation_time"""
+        return await self._repository_donate.cancel_expired_donates(
+            confirmation_time=confirmation_time,
+            donate_id=donate_id,
+        )
+
     async def get_donates_count(self, *args, **kwargs) -> int:
-        return self._repository_donate.get_count(*args, **kwargs)
+        return await self._repository_donate.get_count(*args, **kwargs)
 
     async def get_donates_by_matrices_ids(self, matrices_ids: List[uuid.UUID | str]):
-        return self._repository_donate.get_donates_by_matrices_ids(matrices_ids)
+        return await self._repository_donate.get_donates_by_matrices_ids(matrices_ids)
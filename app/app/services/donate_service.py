@@ -6,14 +6,15 @@ import loguru
 from dependency_injector.wiring import inject
 
 from app.repositories.telegram_user import RepositoryTelegramUser
-from app.repositories.matrix import RepositoryMatrix
-from app.repositories.donate import RepositoryDonate
+from app.repositories.matrix import RepositoryMatrix, RepositoryMatrixWaitlist
 from app.models.telegram_user import TelegramUser, DonateStatus, MatrixBuildType
-from app.models.matrix import Matrix
+from app.models.matrix import Matrix, MatrixWaitlist
+from app.models.tiers import get_status_by_donate_value
+from app.services.admin_matrix_pool_service import AdminMatrixPoolService
+from app.services.matrix_occupancy_service import MatrixOccupancyService
 from app.services.matrix_service import MatrixService
 from app.services.telegram_user_service import TelegramUserService
 from app.schemas.matrix import MatrixEntity
-from app.utils.matrix import get_matrices_length
 from app.utils.matrix import find_first_level_matrix_id
 from app.utils.sort import get_reversed_dict
 
@@ -23,33 +24,21 @@ class DonateService:
             self,
             repository_telegram_user: RepositoryTelegramUser,
             repository_matrix: RepositoryMatrix,
-            repository_donate: RepositoryDonate,
+            repository_matrix_waitlist: RepositoryMatrixWaitlist,
+            admin_matrix_pool_service: AdminMatrixPoolService,
+            matrix_occupancy_service: MatrixOccupancyService,
     ) -> None:
         self._repository_telegram_user = repository_telegram_user
         self._repository_matrix = repository_matrix
-        self._repository_donate = repository_donate
+        self._repository_matrix_waitlist = repository_matrix_waitlist
+        self._admin_matrix_pool_service = admin_matrix_pool_service
+        self._matrix_occupancy_service = matrix_occupancy_service
 
     @staticmethod
     def get_donate_status(
             donate_sum: int,
     ) -> DonateStatus | None:
-
-        if donate_sum == 10:
-            return DonateStatus.BASE
-        elif donate_sum in (20, 30):
-            return DonateStatus.BRONZE
-        elif donate_sum in (40, 100):
-            return DonateStatus.SILVER
-        elif donate_sum in (80, 300):
-            return DonateStatus.GOLD
-        elif donate_sum in (160, 1000):
-            return DonateStatus.PLATINUM
-        elif donate_sum in (320, 3000):
-            return DonateStatus.DIAMOND
-        elif donate_sum in (640, 10000):
-            return DonateStatus.BRILLIANT
-
-        return None
+        return get_status_by_donate_value(donate_sum)
 
     @staticmethod
     def _extend_donations_data(data: dict, sponsor: TelegramUser, donate: int | float):
@@ -68,34 +57,39 @@ class DonateService:
             level_length: int,
     ) -> Matrix:
 
-        admin = self._repository_telegram_user.get(is_admin=True)
-        admin_matrices = self._repository_matrix.get_user_matrices(
-            owner_id=admin.id,
+        admin = await self._repository_telegram_user.get(is_admin=True)
+        matrices = await self._admin_matrix_pool_service.get_matrices(
             status=status,
             build_type=matrix_build_type,
         )
 
-        self._extend_donations_data(donations_data, admin, donate_sum)
-
-        matrices_with_empty_places = []
-        for matrix in admin_matrices:
-            if get_matrices_length(matrix.matrices) < (level_length * level_length) + level_length:
-                matrices_with_empty_places.append(matrix)
-
-        if not matrices_with_empty_places:
-            return admin_matrices[-1], True
-
-        for matrix in matrices_with_empty_places:
-            is_matrix_free_with_donates = self.check_is_matrix_free_with_donates(
-                matrix=matrix,
+        # Следующая матрица курсора блокируется вместе с текущей,
+        # чтобы заменить текущую без второго раунда блокировок
+        await self._lock_matrices_to_add(
+            matrices=matrices,
+            status=status,
+            level_length=level_length,
+        )
+        matrix = await self._admin_matrix_pool_service.get_free_matrix(matrices)
+        if matrix is None:
+            # Пока ждали блокировку, заполнились обе матрицы курсора - берем матрицы заново
+            return await self._add_user_to_admin_matrix(
+                donate_sum,
+                status,
+                donations_data,
                 matrix_build_type=matrix_build_type,
-                status=status,
+                level_length=level_length,
             )
-            if is_matrix_free_with_donates:
-                return matrix, True
 
-        return matrices_with_empty_places[0], False
+        self._extend_donations_data(donations_data, admin, donate_sum)
+
+        is_matrix_free_with_donates = await self.check_is_matrix_free_with_donates(
+            matrix=matrix,
+            matrix_build_type=matrix_build_type,
+            status=status,
+        )
 
+        return matrix, is_matrix_free_with_donates
 
     @inject
     async def _send_donate_to_matrix_owner(
@@ -109,25 +103,22 @@ class DonateService:
             matrix_build_type: MatrixBuildType,
             level_length: int,
     ) -> Matrix:
-        if len(matrix.matrices.keys()) >= level_length:
+        if matrix.first_level_count >= level_length:
             self._extend_donations_data(donations_data, first_sponsor, donate_sum)
             return matrix
         else:
-            parent_matrix = self._repository_matrix.get_parent_matrix(
+            parent_matrix = await self._repository_matrix.get_parent_matrix(
                 matrix_id=matrix.id, status=matrix.status
             )
 
             if not parent_matrix:
-                await self._add_user_to_admin_matrix(
-                    donate_sum,
-                    status,
-                    donations_data,
-                    matrix_build_type=matrix_build_type,
-                    level_length=level_length
-                )
+                # Матрицы спонсора уже заблокированы, донат только начисляется
+                # администратору, без выбора и блокировки его матрицы
+                admin = await self._repository_telegram_user.get(is_admin=True)
+                self._extend_donations_data(donations_data, admin, donate_sum)
                 return matrix
 
-            parent_owner = self._repository_telegram_user.get(id=parent_matrix.owner_id)
+            parent_owner = await self._repository_telegram_user.get(id=parent_matrix.owner_id)
             self._extend_donations_data(donations_data, parent_owner, donate_sum)
 
             return matrix
@@ -142,16 +133,23 @@ class DonateService:
             matrix_build_type: MatrixBuildType,
     ) -> Tuple[Matrix, bool]:
         level_length = 2 if matrix_build_type == MatrixBuildType.BINARY else 3
-        second_level_length = level_length * level_length
-        matrix_max_length = second_level_length + level_length
 
-        first_sponsor_matrices = self._repository_matrix.get_user_matrices(
-            owner_id=first_sponsor.id,
+        if first_sponsor.is_admin:
+            return await self._add_user_to_admin_matrix(
+                donate_sum,
+                status,
+                donations_data,
+                matrix_build_type=matrix_build_type,
+                level_length=level_length,
+            )
+
+        sponsor_free_matrices = await self._repository_matrix.get_sponsors_chain_free_matrices(
+            sponsor_user_id=first_sponsor.user_id,
             status=status,
             build_type=matrix_build_type,
         )
 
-        if first_sponsor.is_admin:
+        if not sponsor_free_matrices:
             return await self._add_user_to_admin_matrix(
                 donate_sum,
                 status,
@@ -160,40 +158,40 @@ class DonateService:
                 level_length=level_length,
             )
 
-        matrices_with_empty_places = []
-        for matrix in first_sponsor_matrices:
-            has_matrix_empty_places = get_matrices_length(matrix.matrices) < matrix_max_length
-            loguru.logger.info(f"has_matrix_empty_places {matrix.id}: {has_matrix_empty_places}")
-
-            if has_matrix_empty_places:
-                matrices_with_empty_places.append(matrix)
-
-        loguru.logger.info(f"\n")
-
-        if not matrices_with_empty_places:
-            return await self._find_free_matrix(
+        locked_sponsor_free_matrices = await self._lock_matrices_to_add(
+            matrices=sponsor_free_matrices,
+            status=status,
+            level_length=level_length,
+        )
+        if not locked_sponsor_free_matrices:
+            # Пока ждали блокировку, места в матрицах заняли - ищем заново
+            return await self.get_matrix_to_add_user(
+                first_sponsor,
                 current_user,
                 donate_sum,
                 status,
                 donations_data,
                 matrix_build_type=matrix_build_type,
-                level_length=level_length,
             )
 
+        sponsor_id = locked_sponsor_free_matrices[0].owner_id
+        sponsor = first_sponsor if sponsor_id == first_sponsor.id \
+            else await self._repository_telegram_user.get(id=sponsor_id)
 
-        for matrix in matrices_with_empty_places:
-            is_matrix_free_with_donates = self.check_is_matrix_free_with_donates(
-                matrix=matrix,
-                matrix_build_type=matrix_build_type,
-                status=status,
-            )
+        matrices_free_with_donates = await self._matrix_occupancy_service.get_matrices_free_with_donates(
+            matrices=locked_sponsor_free_matrices,
+            matrix_build_type=matrix_build_type,
+            status=status,
+        )
+        for matrix in locked_sponsor_free_matrices:
+            is_matrix_free_with_donates = matrices_free_with_donates[matrix.id]
             loguru.logger.info(f"is_matrix_free_with_donates {matrix.id}: {is_matrix_free_with_donates}")
 
             if is_matrix_free_with_donates:
                 return await self._send_donate_to_matrix_owner(
                     matrix,
                     current_user,
-                    first_sponsor,
+                    sponsor,
                     donate_sum,
                     status,
                     donations_data,
@@ -201,197 +199,113 @@ class DonateService:
                     level_length=level_length,
                 ), True
 
-        return matrices_with_empty_places[0], False
-
-
+        return locked_sponsor_free_matrices[0], False
 
-    @inject
-    async def _find_free_matrix(
+    async def _lock_matrices_to_add(
             self,
-            user_to_add: TelegramUser,
-            donate_sum: int | float,
+            matrices: list[Matrix],
             status: DonateStatus,
-            donations_data: dict,
-            matrix_build_type: MatrixBuildType,
             level_length: int,
-    ):
-        matrix_max_length = (level_length * level_length) + level_length
+    ) -> list[Matrix]:
+        """
+        Блокировка матриц-кандидатов и их родительских матриц до конца транзакции.
+        Свободные места матрицы зависят от неподтвержденных донатов в ней
+        и в родительской матрице, поэтому конкурентные донаты в эти матрицы
+        выполняются по очереди и видят донаты друг друга.
+        Возвращает кандидатов, в которых после блокировки еще есть места.
+        """
+        parent_matrices = await self._repository_matrix.get_parent_matrices_by_children_ids(
+            matrices_ids=[
+                matrix.id for matrix in matrices if matrix.first_level_count < level_length
+            ],
+            status=status,
+        )
+        await self._repository_matrix.lock_matrices(
+            matrices_ids=[matrix.id for matrix in matrices]
+            + [parent_matrix.id for parent_matrix in parent_matrices.values()]
+        )
 
-        while True:
-            next_sponsor = self._repository_telegram_user.get(
-                user_id=user_to_add.sponsor_user_id
-            )
-            if next_sponsor is None:
-                loguru.logger.info("next")
-                return await self._add_user_to_admin_matrix(
-                    donate_sum,
-                    status,
-                    donations_data,
-                    matrix_build_type=matrix_build_type,
-                    level_length=level_length,
-                )
-
-            if next_sponsor.get_status(matrix_build_type) == DonateStatus.NOT_ACTIVE or not (
-                int(status.get_status_donate_value()) <= int(
-                    next_sponsor.get_status(matrix_build_type)
-                    .get_status_donate_value()
-                )
-            ):
-                user_to_add = next_sponsor
-                continue
-
-            next_sponsor_matrices = self._repository_matrix.get_user_matrices(
-                owner_id=next_sponsor.id,
-                status=status,
-                build_type=matrix_build_type,
-            )
+        return [matrix for matrix in matrices if not matrix.is_full]
 
-            matrices_with_empty_places = []
-            for matrix in next_sponsor_matrices:
-                if get_matrices_length(matrix.matrices) < matrix_max_length:
-                    matrices_with_empty_places.append(matrix)
+    async def check_is_matrix_free_with_donates(
+            self,
+            matrix: Matrix,
+            matrix_build_type: MatrixBuildType,
+            status: DonateStatus,
+    ) -> bool:
+        matrices_free_with_donates = await self._matrix_occupancy_service.get_matrices_free_with_donates(
+            matrices=[matrix],
+            matrix_build_type=matrix_build_type,
+            status=status,
+        )
 
-            if not matrices_with_empty_places:
-                loguru.logger.info("no matrices")
-                user_to_add = next_sponsor
-                continue
+        return matrices_free_with_donates[matrix.id]
 
-            for matrix in matrices_with_empty_places:
-                is_matrix_free_with_donates = self.check_is_matrix_free_with_donates(
-                    matrix=matrix,
-                    matrix_build_type=matrix_build_type,
-                    status=status,
-                )
-                if is_matrix_free_with_donates:
-                    await self._send_donate_to_matrix_owner(
-                        matrix,
-                        user_to_add,
-                        next_sponsor,
-                        donate_sum,
-                        status,
-                        donations_data,
-                        matrix_build_type=matrix_build_type,
-                        level_length=level_length,
-                    )
-                    return matrix, True
-
-            return matrices_with_empty_places[0], False
-
-
-    def check_is_matrix_free_with_donates(
+    async def add_to_matrix_waitlist(
             self,
             matrix: Matrix,
+            telegram_user: TelegramUser,
             matrix_build_type: MatrixBuildType,
-            status: DonateStatus
-    ):
-        current_matrix = matrix
-        level_length = 2 if matrix_build_type == MatrixBuildType.BINARY else 3
-        second_level_length = level_length * level_length
-
-        first_level_current_matrix_length = len(list(current_matrix.matrices.keys()))
-        current_matrix_donates_count = self._repository_donate.get_count(
-            matrix_id=current_matrix.id,
-            is_confirmed=False,
-            is_canceled=False,
+            donate_sum: int,
+    ) -> None:
+        """Ожидание освобождения места в матрице"""
+        await self._repository_matrix_waitlist.add(
+            matrix_id=matrix.id,
+            telegram_user_id=telegram_user.id,
+            user_id=telegram_user.user_id,
+            build_type=matrix_build_type,
+            donate_sum=donate_sum,
         )
 
-        if first_level_current_matrix_length < level_length:
-            first_level_empty_places_count = level_length - first_level_current_matrix_length
+    async def remove_from_matrix_waitlist(
+            self,
+            telegram_user_id: uuid.UUID,
+            matrix_build_type: MatrixBuildType,
+    ) -> None:
+        await self._repository_matrix_waitlist.delete_by_telegram_user_id(
+            telegram_user_id=telegram_user_id,
+            build_type=matrix_build_type,
+        )
 
-            if first_level_empty_places_count <= current_matrix_donates_count:
-                return False
+    async def pop_matrix_waitlist(self, matrix_id: uuid.UUID) -> list[MatrixWaitlist]:
+        """
+        Вызывается после подтверждения или отмены доната в матрицу matrix_id.
+        Возвращает и удаляет из листа ожидания пользователей, которые могут
+        снова отправить донат: место в ожидаемой матрице освободилось,
+        или матрица заполнилась и донат будет отправлен в другую матрицу.
+        """
+        waitlist = await self._repository_matrix_waitlist.get_by_affected_matrix_id(
+            matrix_id=matrix_id
+        )
+        if not waitlist:
+            return []
 
-            parent_matrix = self._repository_matrix.get_parent_matrix(
-                matrix_id=current_matrix.id,
-                status=status,
-            )
-            if not parent_matrix:
-                return True
-            parent_first_level_matrices = self._repository_matrix.get_matrices_by_ids_list(
-                matrices_ids=list(parent_matrix.matrices.keys())
+        matrices = {
+            matrix.id: matrix
+            for matrix in await self._repository_matrix.get_matrices_by_ids_list(
+                list({waiting.matrix_id for waiting in waitlist})
             )
+        }
 
-            sorted_parent_first_level_matrices = sorted(
-                parent_first_level_matrices,
-                key=lambda x: x.created_at,
-            )
-            current_matrix_index = sorted_parent_first_level_matrices.index(current_matrix)
+        waitlist_by_status: dict[tuple[MatrixBuildType, DonateStatus], list[MatrixWaitlist]] = {}
+        for waiting in waitlist:
+            key = (waiting.build_type, self.get_donate_status(waiting.donate_sum))
+            waitlist_by_status.setdefault(key, []).append(waiting)
 
-            p_matrix_max_length_till_current_matrix = (
-                (level_length * (current_matrix_index + 1)) + level_length
+        available_ids = []
+        for (matrix_build_type, status), status_waitlist in waitlist_by_status.items():
+            status_matrices = list(
+                {waiting.matrix_id: matrices[waiting.matrix_id] for waiting in status_waitlist}.values()
             )
-            p_matrix_length_till_current_matrix = len(parent_first_level_matrices)
-
-            for parent_first_level_matrix in sorted_parent_first_level_matrices[:current_matrix_index + 1]:
-                p_matrix_length_till_current_matrix += len(list(parent_first_level_matrix.matrices.keys()))
-
-            p_matrix_empty_places_count_till_current_matrix = (
-                p_matrix_max_length_till_current_matrix - p_matrix_length_till_current_matrix
+            matrices_free_with_donates = await self._matrix_occupancy_service.get_matrices_free_with_donates(
+                matrices=[matrix for matrix in status_matrices if not matrix.is_full],
+                matrix_build_type=matrix_build_type,
+                status=status,
             )
-            donate_matrices_ids = [
-                matrix.id for matrix in parent_first_level_matrices[:current_matrix_index]
-                if len(list(matrix.matrices.keys())) < level_length
-            ]
-            donate_matrices_ids.append(parent_matrix.id)
-
-            matrices_donates = self._repository_donate.get_donates_by_matrices_ids(
-                matrices_ids=donate_matrices_ids,
-                is_confirmed=False,
-                is_canceled=False,
+            available_ids.extend(
+                waiting.id for waiting in status_waitlist
+                if matrices[waiting.matrix_id].is_full
+                or matrices_free_with_donates[waiting.matrix_id]
             )
-            total_donates_count = len(matrices_donates) + current_matrix_donates_count
-
-            if p_matrix_empty_places_count_till_current_matrix <= total_donates_count:
-                return False
-
-            return True
-
-        second_level_current_matrix_length = get_matrices_length(current_matrix.matrices) - level_length
-        second_level_empty_places_count = second_level_length - second_level_current_matrix_length
-
-        if second_level_empty_places_count <= current_matrix_donates_count:
-            return False
-
-        first_level_matrices = self._repository_matrix.get_matrices_by_ids_list(
-            matrices_ids=list(matrix.matrices.keys())
-        )
-        sorted_first_level_matrices = sorted(first_level_matrices, key=lambda x: x.created_at)
-
-        donate_first_level_matrices_ids = [
-            matrix.id for matrix in sorted_first_level_matrices
-            if len(list(matrix.matrices.keys())) < level_length
-        ]
-        first_level_matrices_donates = self._repository_donate.get_donates_by_matrices_ids(
-            matrices_ids=donate_first_level_matrices_ids,
-            is_confirmed=False,
-            is_canceled=False,
-        )
-        total_donates_count = len(first_level_matrices_donates) + current_matrix_donates_count
-        if second_level_empty_places_count <= total_donates_count:
-            return False
-
-        return True
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
 
+        return await self._repository_matrix_waitlist.delete_by_ids(available_ids)
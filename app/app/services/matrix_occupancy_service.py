@@ -0,0 +1,129 @@
+import uuid
+
+from app.models.matrix import Matrix
+from app.models.telegram_user import DonateStatus, MatrixBuildType
+from app.repositories.donate import RepositoryDonate
+from app.repositories.matrix import RepositoryMatrix
+
+
+class MatrixOccupancyService:
+    """Свободные места матриц с учетом мест, занятых неподтвержденными донатами"""
+
+    def __init__(
+            self,
+            repository_matrix: RepositoryMatrix,
+            repository_donate: RepositoryDonate,
+    ) -> None:
+        self._repository_matrix = repository_matrix
+        self._repository_donate = repository_donate
+
+    async def get_matrices_free_with_donates(
+            self,
+            matrices: list[Matrix],
+            matrix_build_type: MatrixBuildType,
+            status: DonateStatus,
+            matrices_donates_count: dict[uuid.UUID, int] | None = None,
+    ) -> dict[uuid.UUID, bool]:
+        """
+        Проверка, хватит ли свободных мест в матрицах с учетом неподтвержденных донатов.
+        Для всего списка матриц выполняется не более трех запросов.
+        """
+        level_length = 2 if matrix_build_type == MatrixBuildType.BINARY else 3
+        second_level_length = level_length * level_length
+
+        first_level_not_full_matrices_ids = [
+            matrix.id for matrix in matrices if matrix.first_level_count < level_length
+        ]
+        parent_matrices = await self._repository_matrix.get_parent_matrices_by_children_ids(
+            matrices_ids=first_level_not_full_matrices_ids,
+            status=status,
+        )
+
+        first_level_matrices = await self._repository_matrix.get_first_level_matrices_by_parents_ids(
+            parents_ids=list(
+                {parent_matrix.id for parent_matrix in parent_matrices.values()}
+                | {matrix.id for matrix in matrices if matrix.first_level_count >= level_length}
+            )
+        )
+
+        matrices_donates_count = dict(matrices_donates_count or {})
+        matrices_ids_to_count = (
+            {matrix.id for matrix in matrices}
+            | {parent_matrix.id for parent_matrix in parent_matrices.values()}
+            | {
+                first_level_matrix.id
+                for matrices_list in first_level_matrices.values()
+                for first_level_matrix in matrices_list
+            }
+        ) - matrices_donates_count.keys()
+        for matrix_id in matrices_ids_to_count:
+            matrices_donates_count[matrix_id] = 0
+        matrices_donates_count.update(
+            await self._repository_donate.count_pending_by_matrix_ids(
+                matrices_ids=list(matrices_ids_to_count)
+            )
+        )
+
+        matrices_free_with_donates = {}
+        for current_matrix in matrices:
+            current_matrix_donates_count = matrices_donates_count[current_matrix.id]
+
+            if current_matrix.first_level_count < level_length:
+                first_level_empty_places_count = level_length - current_matrix.first_level_count
+
+                if first_level_empty_places_count <= current_matrix_donates_count:
+                    matrices_free_with_donates[current_matrix.id] = False
+                    continue
+
+                parent_matrix = parent_matrices.get(current_matrix.id)
+                if not parent_matrix:
+                    matrices_free_with_donates[current_matrix.id] = True
+                    continue
+
+                parent_first_level_matrices = first_level_matrices[parent_matrix.id]
+                current_matrix_index = [
+                    matrix.id for matrix in parent_first_level_matrices
+                ].index(current_matrix.id)
+
+                p_matrix_max_length_till_current_matrix = (
+                    (level_length * (current_matrix_index + 1)) + level_length
+                )
+                p_matrix_length_till_current_matrix = len(parent_first_level_matrices) + sum(
+                    matrix.first_level_count
+                    for matrix in parent_first_level_matrices[:current_matrix_index + 1]
+                )
+                p_matrix_empty_places_count_till_current_matrix = (
+                    p_matrix_max_length_till_current_matrix - p_matrix_length_till_current_matrix
+                )
+                donate_matrices_ids = [
+                    matrix.id for matrix in parent_first_level_matrices[:current_matrix_index]
+                    if matrix.first_level_count < level_length
+                ]
+                donate_matrices_ids.append(parent_matrix.id)
+
+                total_donates_count = current_matrix_donates_count + sum(
+                    matrices_donates_count[matrix_id] for matrix_id in donate_matrices_ids
+                )
+                matrices_free_with_donates[current_matrix.id] = (
+                    p_matrix_empty_places_count_till_current_matrix > total_donates_count
+                )
+                continue
+
+            second_level_empty_places_count = second_level_length - current_matrix.second_level_count
+
+            if second_level_empty_places_count <= current_matrix_donates_count:
+                matrices_free_with_donates[current_matrix.id] = False
+                continue
+
+            donate_first_level_matrices_ids = [
+                matrix.id for matrix in first_level_matrices[current_matrix.id]
+                if matrix.first_level_count < level_length
+            ]
+            total_donates_count = current_matrix_donates_count + sum(
+                matrices_donates_count[matrix_id] for matrix_id in donate_first_level_matrices_ids
+            )
+            matrices_free_with_donates[current_matrix.id] = (
+                second_level_empty_places_count > total_donates_count
+            )
+
+        return matrices_free_with_donates
@@ -0,0 +1,48 @@
+import time
+
+from app.repositories.telegram_user import RepositoryTelegramUser
+from app.schemas.statistic import UsersStatisticEntity
+
+
+class StatisticService:
+    """
+    Статистика для админ-панели.
+    Результат хранится в памяти процесса cache_ttl_seconds секунд.
+    """
+
+    def __init__(
+            self,
+            repository_telegram_user: RepositoryTelegramUser,
+            cache_ttl_seconds: int = 0,
+    ) -> None:
+        self._repository_telegram_user = repository_telegram_user
+        self._cache_ttl_seconds = cache_ttl_seconds
+        self._users_statistic: UsersStatisticEntity | None = None
+        self._users_statistic_expires_at = 0.0
+
+    async def get_users_statistic(self) -> UsersStatisticEntity:
+        if self._users_statistic and time.monotonic() < self._users_statistic_expires_at:
+            return self._users_statistic
+
+        users_statistic = UsersStatisticEntity()
+        for (
+            trinary_status,
+            binary_status,
+            users_count,
+            trinary_bills_sum,
+            binary_bills_sum,
+        ) in await self._repository_telegram_user.get_statuses_statistic():
+            users_statistic.users_count += users_count
+            users_statistic.trinary_statuses[trinary_status] = (
+                users_statistic.trinary_statuses.get(trinary_status, 0) + users_count
+            )
+            users_statistic.binary_statuses[binary_status] = (
+                users_statistic.binary_statuses.get(binary_status, 0) + users_count
+            )
+            users_statistic.trinary_bills_sum += trinary_bills_sum or 0
+            users_statistic.binary_bills_sum += binary_bills_sum or 0
+
+        self._users_statistic = users_statistic
+        self._users_statistic_expires_at = time.monotonic() + self._cache_ttl_seconds
+
+        return users_statistic
@@ -0,0 +1,75 @@
+from aiogram import Bot
+from aiogram.enums import ChatMemberStatus
+from loguru import logger
+
+from app.utils.cache import BaseCache
+
+
+class SubscriptionService:
+    """
+    Проверка подписки пользователя на чат сообщества.
+    Результат get_chat_member кэшируется: подписка на member_ttl_seconds,
+    отсутствие подписки (left/kicked) на более короткий not_member_ttl_seconds.
+    """
+
+    def __init__(
+            self,
+            cache: BaseCache,
+            chat_id: int,
+            member_ttl_seconds: int,
+            not_member_ttl_seconds: int,
+            stats_log_interval: int = 1000,
+    ) -> None:
+        self._cache = cache
+        self._chat_id = chat_id
+        self._member_ttl_seconds = member_ttl_seconds
+        self._not_member_ttl_seconds = not_member_ttl_seconds
+        self._stats_log_interval = stats_log_interval
+        self.hits = 0
+        self.misses = 0
+
+    async def is_subscribed(
+            self,
+            bot: Bot,
+            user_id: int,
+            refresh: bool = False,
+    ) -> bool:
+        """
+        Подписан ли пользователь на чат.
+        refresh=True - запросить статус у Telegram в обход кэша.
+        """
+        cache_key = str(user_id)
+
+        if not refresh:
+            is_subscribed = await self._cache.get(cache_key)
+            if is_subscribed is not None:
+                self._count(hit=True)
+                return is_subscribed
+
+        self._count(hit=False)
+        chat_member = await bot.get_chat_member(
+            chat_id=self._chat_id, user_id=user_id
+        )
+        is_subscribed = chat_member.status not in (
+            ChatMemberStatus.LEFT, ChatMemberStatus.KICKED
+        )
+        await self._cache.set(
+            cache_key,
+            is_subscribed,
+            ttl=self._member_ttl_seconds
+            if is_subscribed else self._not_member_ttl_seconds,
+        )
+
+        return is_subscribed
+
+    def _count(self, hit: bool) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+        if (self.hits + self.misses) % self._stats_log_interval == 0:
+            logger.info(f"Chat member cache stats: {self.get_stats()}")
+
+    def get_stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
@@ -6,12 +6,41 @@ from app.models.telegram_user import TelegramUser
 from app.schemas.telegram_user import TelegramUserEntity
 from app.models.matrix import Matrix
 from app.models.telegram_user import MatrixBuildType
+from app.utils.cache import BaseCache
+from app.utils.pagination import QueryPaginator
 
 
 class TelegramUserService:
 
-    def __init__(self, repository_telegram_user: RepositoryTelegramUser) -> None:
+    def __init__(
+            self,
+            repository_telegram_user: RepositoryTelegramUser,
+            ban_cache: BaseCache,
+            ban_cache_ttl_seconds: int = 0,
+    ) -> None:
         self._repository_telegram_user = repository_telegram_user
+        # str(user_id) -> is_banned
+        self._ban_cache = ban_cache
+        self._ban_cache_ttl_seconds = ban_cache_ttl_seconds
+
+    async def get_cached_is_banned(self, user_id: int) -> bool | None:
+        """Флаг блокировки из кэша, None - если его нет в кэше"""
+        return await self._ban_cache.get(str(user_id))
+
+    async def cache_is_banned(self, telegram_user: TelegramUser) -> None:
+        await self._ban_cache.set(
+            str(telegram_user.user_id),
+            telegram_user.is_banned,
+            ttl=self._ban_cache_ttl_seconds,
+        )
+
+    async def set_is_banned(self, telegram_user: TelegramUser, is_banned: bool) -> None:
+        """
+        Блокировка/разблокировка пользователя с обновлением кэша.
+        С redis хранилищем новый флаг сразу видят все процессы бота.
+        """
+        telegram_user.is_banned = is_banned
+        await self.cache_is_banned(telegram_user)
 
     async def get_list(
             self,
@@ -19,53 +48,90 @@ class TelegramUserService:
             join_sponsor: bool = False,
             **kwargs
     ) -> list[TelegramUser]:
-        return self._repository_telegram_user.get_list(
+        return await self._repository_telegram_user.get_list(
             *args,
             join_sponsor=join_sponsor,
             **kwargs
         )
 
+    async def paginate_list(
+            self,
+            *args,
+            page_number: int = 1,
+            per_page: int = 1,
+            **kwargs
+    ) -> QueryPaginator:
+        return await self._repository_telegram_user.paginate_list(
+            *args,
+            page_number=page_number,
+            per_page=per_page,
+            **kwargs
+        )
+
+    def stream_users_with_sponsors(self, yield_per: int = 1000):
+        return self._repository_telegram_user.stream_users_with_sponsors(
+            yield_per=yield_per
+        )
+
     async def get_telegram_user(self, **kwargs) -> TelegramUser:
-        return self._repository_telegram_user.get(**kwargs)
+        return await self._repository_telegram_user.get(**kwargs)
 
     async def get_sponsors_chain(self, user_id):
-        return self._repository_telegram_user.get_sponsors_chain(user_id)
+        return await self._repository_telegram_user.get_sponsors_chain(user_id)
 
     async def exist(self, **kwargs) -> TelegramUser:
-        return self._repository_telegram_user.exists(**kwargs)
+        return await self._repository_telegram_user.exists(**kwargs)
 
     async def get_admin(self) -> TelegramUser:
-        return self._repository_telegram_user.get(is_admin=True)
+        return await self._repository_telegram_user.get(is_admin=True)
 
     async def create_telegram_user(
         self,
         user: TelegramUserEntity,
         sponsor: TelegramUser = None,
     ) -> TelegramUser | None:
-        user_exist = self._repository_telegram_user.get(user_id=user.user_id)
+        user_exist = await self._repository_telegram_user.get(user_id=user.user_id)
         if user_exist:
             return user_exist
         if sponsor:
             user.sponsor_user_id = sponsor.user_id
-            sponsor.invites_count += 1
-        return self._repository_telegram_user.create(obj_in=user.model_dump())
+            await self._repository_telegram_user.increase_invites_count(sponsor.id)
+        telegram_user = await self._repository_telegram_user.create(obj_in=user.model_dump())
+        await self._repository_telegram_user.add_ancestors(
+            user_id=telegram_user.user_id,
+            sponsor_user_id=telegram_user.sponsor_user_id,
+        )
+
+        return telegram_user
+
+    async def add_to_bill(
+        self,
+        telegram_user: TelegramUser,
+        value: int,
+        matrix_build_type: MatrixBuildType,
+    ) -> TelegramUser:
+        return await self._repository_telegram_user.add_to_bill(
+            obj_id=telegram_user.id,
+            value=value,
+            build_type=matrix_build_type,
+        )
 
     async def get_telegram_user_sponsors(
         self, user_id: int
     ) -> tuple[TelegramUser, TelegramUser, TelegramUser]:
 
-        return self._repository_telegram_user.get_telegram_user_sponsors(
+        return await self._repository_telegram_user.get_telegram_user_sponsors(
             user_id=user_id
         )
 
     async def get_one_sponsor(self, user_id: int):
-        return self._repository_telegram_user.get_one_sponsor(user_id=user_id)
+        return await self._repository_telegram_user.get_one_sponsor(user_id=user_id)
 
     async def delete(self, obj_id: uuid.UUID):
-        self._repository_telegram_user.delete(obj_id=obj_id)
+        await self._repository_telegram_user.delete(obj_id=obj_id)
 
     async def get_sponsors_for_separating_donate(self, user_id: int):
-        return self._repository_telegram_user.get_sponsors_for_separating_donate(
+        return await self._repository_telegram_user.get_sponsors_for_separating_donate(
             user_id=user_id
         )
 
@@ -74,34 +140,29 @@ class TelegramUserService:
             sponsor_user_id: int
     ):
         """Получение списка всех приглашенных пользователей"""
-        return self._repository_telegram_user.get_invited_users(
+        return await self._repository_telegram_user.get_invited_users(
             sponsor_user_id=sponsor_user_id
         )
 
-    async def get_user_depth_level(self, user_id: int) -> int | None:
-        """
-        Вычисляет глубину пользователя итеративным подъемом по спонсорам.
-        """
-        current_id = user_id
-        depth = 0
-
-        while True:
-            user = self._repository_telegram_user.get(user_id=current_id)
-
-            if not user:
-                return None
-
-            if user.is_admin:
-                return depth
-
-            current_id = user.sponsor_user_id
-            depth += 1
+    async def paginate_invited_users(
+            self,
+            sponsor_user_id: int,
+            page_number: int = 1,
+            per_page: int = 1,
+    ) -> QueryPaginator:
+        """Получение страницы приглашенных пользователей"""
+        return await self._repository_telegram_user.paginate_invited_users(
+            sponsor_user_id=sponsor_user_id,
+            page_number=page_number,
+            per_page=per_page,
+        )
 
-            if depth > 10000:
-                return None
+    async def get_user_depth_level(self, user_id: int) -> int | None:
+        """Глубина пользователя - расстояние до администратора по цепочке спонсоров"""
+        return await self._repository_telegram_user.get_depth_level(user_id=user_id)
 
     async def get_count(self, *args, **kwargs) -> int:
-        return self._repository_telegram_user.get_count(*args, **kwargs)
+        return await self._repository_telegram_user.get_count(*args, **kwargs)
 
     async def get_bills_sum(
             self,
@@ -110,7 +171,7 @@ class TelegramUserService:
             **kwargs
     ) -> int:
         return sum(
-            self._repository_telegram_user.get_bills(
+            await self._repository_telegram_user.get_bills(
                 *args,
                 build_type=build_type,
                 **kwargs,
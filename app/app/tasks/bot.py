@@ -3,6 +3,7 @@ import uuid
 from typing import Optional
 
 from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError
 from aiogram.types import Message
 from celery import shared_task
 
@@ -14,17 +15,54 @@ from app.services.donate_confirm_service import DonateConfirmService
 from app.services.telegram_user_service import TelegramUserService
 from app.core import celery_app
 from app.loader import bot
-from app.tasks.const import loop
+from app.tasks.loop import worker_loop
+from app.utils.broadcast import broadcaster, BroadcastProgress
 
 @celery_app.task
 def send_message_task(
         chat_id: int | str,
         text: str,
 ):
-    loop.run_until_complete(
+    worker_loop.run(
         bot.send_message(
             chat_id=chat_id,
             text=text
         )
     )
 
+
+@celery_app.task
+def broadcast_message_task(
+        chat_ids: list[int],
+        serialized_message: dict,
+        header_text: str | None = None,
+        status_chat_id: int | None = None,
+        status_message_id: int | None = None,
+):
+    async def edit_status_message(progress: BroadcastProgress, text: str):
+        if not status_chat_id or not status_message_id:
+            return
+
+        await bot.edit_message_text(
+            chat_id=status_chat_id,
+            message_id=status_message_id,
+            text=f"{text}\n"
+                 f"Доставлено: {progress.sent} из {progress.total}\n"
+                 f"Не доставлено: {progress.failed}",
+        )
+
+    async def broadcast():
+        progress = await broadcaster.broadcast(
+            chat_ids=chat_ids,
+            serialized_message=serialized_message,
+            header_text=header_text,
+            on_progress=lambda progress: edit_status_message(
+                progress, "Рассылка отправляется ⏳"
+            ),
+        )
+        try:
+            await edit_status_message(progress, "Рассылка отправлена ✅")
+        except TelegramAPIError:
+            pass
+
+    worker_loop.run(broadcast())
@@ -1,4 +0,0 @@
-import asyncio
-
-
-loop = asyncio.get_event_loop()
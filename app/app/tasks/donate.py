@@ -1,59 +1,70 @@
-import asyncio
 import uuid
+from datetime import timedelta
 from typing import Optional
 
-from aiogram import Bot
-from aiogram.exceptions import TelegramAPIError
-from celery import shared_task
+from loguru import logger
 
-from app.core.container import Container
 from app.db.commit_decorator import commit_and_close_session
-from app.models.donate import Donate
-from app.models.telegram_user import TelegramUser
-from app.services.donate_confirm_service import DonateConfirmService
-from app.services.telegram_user_service import TelegramUserService
+from app.models.matrix import MatrixWaitlist
 from app.core import celery_app
-from app.loader import bot
-from app.tasks.const import (
-    loop
-)
+from app.core.config import settings
+from app.tasks.loop import worker_loop
+from app.tasks.matrix import send_matrix_waitlist_notifications
+from app.tasks.worker import get_worker_container
+from app.utils.broadcast import broadcaster
 
 
 @commit_and_close_session
-async def check_is_donate_confirmed_or_delete_donate(
-        donate_id: str | uuid.UUID,
-        donate_sender_user_id: Optional[int],
-):
-    container = Container()
+async def cancel_expired_donates(
+        donate_id: uuid.UUID | None = None,
+) -> tuple[list[int], list[MatrixWaitlist]]:
+    """
+    Отмена донатов (или только donate_id), не подтвержденных за donate_confirmation_time_minutes.
+    Возвращает user_id отправителей отмененных донатов и пользователей,
+    дождавшихся освободившихся мест в матрицах.
+    """
+    container = get_worker_container()
     donate_confirm_service = container.donate_confirm_service()
-    telegram_user_service = container.telegram_user_service()
-    is_confirmed: bool = await donate_confirm_service.check_donate_is_confirmed(donate_id=donate_id)
+    donate_service = container.donate_service()
+
+    expired_donates = await donate_confirm_service.cancel_expired_donates(
+        confirmation_time=timedelta(minutes=settings.donate_confirmation_time_minutes),
+        donate_id=donate_id,
+    )
+
+    waitlist = []
+    for matrix_id in {matrix_id for _, matrix_id, _ in expired_donates}:
+        waitlist.extend(await donate_service.pop_matrix_waitlist(matrix_id=matrix_id))
 
-    if is_confirmed:
+    return [sender_user_id for *_, sender_user_id in expired_donates], waitlist
+
+
+async def sweep_expired_donates(donate_id: uuid.UUID | None = None) -> None:
+    senders_user_ids, waitlist = await cancel_expired_donates(donate_id=donate_id)
+    if not senders_user_ids:
         return
 
-    if not donate_sender_user_id:
-        donate: Donate = await donate_confirm_service.get_donate_by_id(donate_id)
-        telegram_user: TelegramUser = await telegram_user_service.get_telegram_user(id=donate.telegram_user_id)
-        donate_sender_user_id = telegram_user.user_id
+    logger.info(f"Canceled {len(senders_user_ids)} expired donates")
+    await broadcaster.broadcast(
+        chat_ids=senders_user_ids,
+        serialized_message={"text": "Время отправки подарка вышло."},
+    )
+    await send_matrix_waitlist_notifications(waitlist)
 
-    await donate_confirm_service.cancel_donate_with_transactions(donate_id=donate_id)
 
-    try:
-        await bot.send_message(
-            chat_id=donate_sender_user_id,
-            text="Время отправки подарка вышло."
-        )
-    except TelegramAPIError:
-        pass
+@celery_app.task
+def cancel_expired_donates_task():
+    return worker_loop.run(sweep_expired_donates())
 
 
 @celery_app.task
 def check_is_donate_confirmed_or_delete_donate_task(
         donate_id: str | uuid.UUID,
-        donate_sender_user_id: Optional[int],
+        donate_sender_user_id: Optional[int] = None,
 ):
-    return loop.run_until_complete(check_is_donate_confirmed_or_delete_donate(
-        donate_id=donate_id,
-        donate_sender_user_id=donate_sender_user_id,
-    ))
+    """
+    Устаревшая задача отмены одного доната по ETA, оставлена на один релиз
+    для сообщений, поставленных в очередь до перехода на периодическую отмену
+    (см. CHANGELOG.md). Отменяется только донат donate_id, если он просрочен.
+    """
+    return worker_loop.run(sweep_expired_donates(donate_id=uuid.UUID(str(donate_id))))
@@ -0,0 +1,97 @@
+import asyncio
+import os
+import threading
+from typing import Any, Coroutine
+
+from celery.signals import worker_process_shutdown, worker_shutdown
+from loguru import logger
+
+from app.core.config import settings
+
+
+class WorkerEventLoop:
+    """
+    Event loop celery воркера, работающий в отдельном потоке процесса.
+    Задачи передают в него корутины и ждут результат, поэтому корутины разных
+    задач выполняются конкурентно, а не по очереди через run_until_complete.
+    Число одновременно выполняемых корутин ограничено max_concurrency.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self._max_concurrency = max_concurrency
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._pid: int | None = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            # После fork поток родительского процесса в дочернем не существует
+            if self._loop is None or self._pid != os.getpid():
+                self._start()
+
+            return self._loop
+
+    def _start(self) -> None:
+        self._pid = os.getpid()
+        self._loop = asyncio.new_event_loop()
+        self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        self._thread = threading.Thread(
+            target=self._loop.run_forever,
+            name="celery-event-loop",
+            daemon=True,
+        )
+        self._thread.start()
+        logger.info(f"Worker event loop started in process {self._pid}")
+
+    async def _run_limited(self, coroutine: Coroutine) -> Any:
+        async with self._semaphore:
+            return await coroutine
+
+    def run(self, coroutine: Coroutine, timeout: float | None = None) -> Any:
+        """
+        Выполнение корутины в event loop воркера с ожиданием результата.
+        Из потока самого event loop ожидание заблокировало бы его навсегда,
+        поэтому такой вызов - ошибка, корутину нужно ожидать через await.
+        """
+        loop = self.loop
+        if self._thread is threading.current_thread():
+            coroutine.close()
+            raise RuntimeError("WorkerEventLoop.run() cannot be called from the event loop thread")
+
+        future = asyncio.run_coroutine_threadsafe(
+            self._run_limited(coroutine), loop
+        )
+        return future.result(timeout=timeout)
+
+    def stop(self, *shutdown_coroutines: Coroutine) -> None:
+        """Выполнение завершающих корутин и остановка event loop"""
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                return
+
+            for coroutine in shutdown_coroutines:
+                asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+
+
+worker_loop = WorkerEventLoop(
+    max_concurrency=settings.celery_async_tasks_concurrency,
+)
+
+
+@worker_shutdown.connect
+@worker_process_shutdown.connect
+def stop_worker_loop(**kwargs) -> None:
+    from app.loader import bot
+    from app.tasks.worker import get_worker_container
+
+    db = get_worker_container().db()
+    logger.info(f"DB pool stats: {db.get_pool_stats()}")
+    worker_loop.stop(bot.session.close(), db.engine.dispose())
@@ -1,6 +1,6 @@
 import asyncio
 import uuid
-from datetime import timedelta, datetime
+from functools import partial
 from typing import Optional
 
 from aiogram import Bot
@@ -8,16 +8,15 @@ from aiogram.types import Message
 from celery import shared_task
 from dependency_injector.wiring import inject, Provide
 
-from app.models.matrix import Matrix
+from app.models.matrix import Matrix, MatrixWaitlist
 from app.models.telegram_user import TelegramUser, statuses_colors_data
 from app.services.donate_confirm_service import DonateConfirmService
 from app.services.telegram_user_service import TelegramUserService
 from app.core import celery_app
 from app.keyboards.donate import get_donate_keyboard
 from app.loader import bot
-from app.tasks.const import (
-    loop
-)
+from app.tasks.loop import worker_loop
+from app.utils.broadcast import broadcaster
 from app.models.telegram_user import DonateStatus, MatrixBuildType
 from app.core.config import settings
 
@@ -26,9 +25,9 @@ async def send_first_level_notification(
         matrix_id: uuid.UUID,
         matrix_owner_user_id: int | None = None,
 ) -> Message:
-    from app.core.container import Container
+    from app.tasks.worker import get_worker_container
 
-    container = Container()
+    container = get_worker_container()
     matrix_service = container.matrix_service()
     telegram_user_service = container.telegram_user_service()
 
@@ -62,62 +61,146 @@ def send_matrix_first_level_notification_task(
         matrix_id: uuid.UUID,
         matrix_owner_user_id: int | None = None,
 ) -> None:
-    loop.run_until_complete(
-        send_first_level_notification(
+    from app.db.commit_decorator import commit_and_close_session
+
+    worker_loop.run(
+        commit_and_close_session(send_first_level_notification)(
             matrix_id,
             matrix_owner_user_id
         )
     )
 
 
+def group_matrix_waitlist(
+        waitlist: list[MatrixWaitlist],
+) -> dict[MatrixBuildType, list[int]]:
+    """user_id ожидающих по типу построения"""
+    users_ids: dict[MatrixBuildType, list[int]] = {}
+    for waiting in waitlist:
+        users_ids.setdefault(waiting.build_type, []).append(waiting.user_id)
+
+    return users_ids
+
+
+async def broadcast_matrix_waitlist_notification(
+        build_type: MatrixBuildType,
+        users_ids: list[int],
+) -> None:
+    await broadcaster.broadcast(
+        chat_ids=users_ids,
+        serialized_message={
+            "text": f"Вы можете отправить донат в маркетинге \"{build_type.value}\""
+        },
+    )
+
+
+async def send_matrix_waitlist_notifications(
+        waitlist: list[MatrixWaitlist],
+) -> None:
+    """
+    Уведомление пользователей, дождавшихся свободного места в матрице.
+    Вызывается после commit транзакции, удалившей их из листа ожидания.
+    """
+    for build_type, users_ids in group_matrix_waitlist(waitlist).items():
+        await broadcast_matrix_waitlist_notification(build_type, users_ids)
+
+
 @celery_app.task
-def check_is_matrix_free_with_donates_task(
+def send_matrix_waitlist_notifications_task(
+        build_type_name: str,
+        users_ids: list[int],
+) -> None:
+    worker_loop.run(
+        broadcast_matrix_waitlist_notification(MatrixBuildType[build_type_name], users_ids)
+    )
+
+
+def schedule_matrix_waitlist_notifications(
+        waitlist: list[MatrixWaitlist],
+) -> None:
+    """
+    Отправка уведомлений ожидающим задачей celery после commit текущей транзакции,
+    чтобы не держать блокировки матриц на время отправки сообщений.
+    """
+    from app.db.commit_decorator import call_after_commit
+
+    for build_type, users_ids in group_matrix_waitlist(waitlist).items():
+        call_after_commit(
+            partial(
+                send_matrix_waitlist_notifications_task.delay,
+                build_type_name=build_type.name,
+                users_ids=users_ids,
+            )
+        )
+
+
+async def add_legacy_waiting_to_matrix_waitlist(
         chat_id: int | str,
         matrix_id: uuid.UUID,
-        build_type_str: str, # "b" or "t"
+        build_type_str: str,  # "b" or "t"
         donate_sum: int,
-) -> None:
-    from app.core.container import Container
-
-    container = Container()
+) -> list[MatrixWaitlist]:
+    """
+    Перенос ожидания из сообщения check_is_matrix_free_with_donates_task в лист ожидания.
+    Если место в матрице уже свободно, пользователь сразу удаляется из листа
+    и возвращается вместе с остальными дождавшимися.
+    """
+    from app.tasks.worker import get_worker_container
+
+    container = get_worker_container()
     donate_service = container.donate_service()
-    repository_matrix = container.repository_matrix()
+    matrix_service = container.matrix_service()
+    telegram_user_service = container.telegram_user_service()
 
-    matrix_build_type = MatrixBuildType.BINARY \
-        if build_type_str == "b" else MatrixBuildType.TRINARY
+    telegram_user = await telegram_user_service.get_telegram_user(user_id=int(chat_id))
+    matrix = await matrix_service.get_matrix(id=matrix_id)
+    if not telegram_user or not matrix:
+        return []
 
-    status = donate_service.get_donate_status(
+    await donate_service.add_to_matrix_waitlist(
+        matrix=matrix,
+        telegram_user=telegram_user,
+        matrix_build_type=MatrixBuildType.BINARY
+        if build_type_str == "b" else MatrixBuildType.TRINARY,
         donate_sum=donate_sum,
     )
 
-    matrix = repository_matrix.get(id=matrix_id)
-    is_matrix_free_with_donates = donate_service.check_is_matrix_free_with_donates(
-        matrix=matrix,
-        matrix_build_type=matrix_build_type,
-        status=status,
+    return await donate_service.pop_matrix_waitlist(matrix_id=matrix.id)
+
+
+async def check_is_matrix_free_with_donates(
+        chat_id: int | str,
+        matrix_id: uuid.UUID,
+        build_type_str: str,  # "b" or "t"
+        donate_sum: int,
+) -> None:
+    from app.db.commit_decorator import commit_and_close_session
+
+    waitlist = await commit_and_close_session(add_legacy_waiting_to_matrix_waitlist)(
+        chat_id=chat_id,
+        matrix_id=matrix_id,
+        build_type_str=build_type_str,
+        donate_sum=donate_sum,
     )
+    await send_matrix_waitlist_notifications(waitlist)
 
-    if not is_matrix_free_with_donates:
-        now = datetime.now()
-        check_is_matrix_free_with_donates_task.apply_async(
-            eta=now + timedelta(
-                minutes=settings.check_is_matrix_free_with_donates_minutes_interval
-            ),
-            kwargs={
-                "chat_id": chat_id,
-                "matrix_id": matrix.id,
-                "build_type_str": build_type_str,
-                "donate_sum": donate_sum,
-            },
-        )
-        return
 
-    loop.run_until_complete(
-        bot.send_message(
+@celery_app.task
+def check_is_matrix_free_with_donates_task(
+        chat_id: int | str,
+        matrix_id: uuid.UUID,
+        build_type_str: str,  # "b" or "t"
+        donate_sum: int,
+) -> None:
+    """
+    Устаревшая задача проверки свободного места по ETA, оставлена на один релиз
+    для сообщений, поставленных в очередь до перехода на лист ожидания (см. CHANGELOG.md).
+    """
+    worker_loop.run(
+        check_is_matrix_free_with_donates(
             chat_id=chat_id,
-            text=(
-                f"Вы можете отправить донат "
-                f"в маркетинге \"{matrix_build_type.value}\""
-            )
+            matrix_id=matrix_id,
+            build_type_str=build_type_str,
+            donate_sum=donate_sum,
         )
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,68 @@
+import itertools
+import os
+import threading
+
+from celery.signals import worker_init, worker_process_init, task_postrun
+from loguru import logger
+
+from app.core.config import settings
+from app.core.container import Container
+
+
+class WorkerContainer:
+    """
+    Контейнер зависимостей процесса celery воркера.
+    Создается один раз на процесс (в worker_process_init / worker_init,
+    или при первом обращении), задачи используют его вместо создания
+    Container() на каждый вызов. Сессия БД по-прежнему своя у каждой задачи.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._container: Container | None = None
+        self._pid: int | None = None
+
+    def init(self) -> Container:
+        with self._lock:
+            if self._container is None or self._pid != os.getpid():
+                if self._container is not None:
+                    # Соединения пула, открытые родительским процессом до fork,
+                    # не должны использоваться дочерним процессом
+                    self._container.db().engine.sync_engine.dispose(close=False)
+                self._pid = os.getpid()
+                self._container = Container()
+                logger.info(f"Worker container initialized in process {self._pid}")
+
+            return self._container
+
+    @property
+    def container(self) -> Container:
+        if self._container is None or self._pid != os.getpid():
+            return self.init()
+
+        return self._container
+
+
+worker_container = WorkerContainer()
+
+_tasks_counter = itertools.count(1)
+
+
+def get_worker_container() -> Container:
+    return worker_container.container
+
+
+def log_pool_stats() -> None:
+    logger.info(f"DB pool stats: {get_worker_container().db().get_pool_stats()}")
+
+
+@worker_init.connect
+@worker_process_init.connect
+def init_worker_container(**kwargs) -> None:
+    worker_container.init()
+
+
+@task_postrun.connect
+def log_pool_stats_on_interval(**kwargs) -> None:
+    if next(_tasks_counter) % settings.celery_pool_stats_log_interval == 0:
+        log_pool_stats()
@@ -3,6 +3,7 @@ from typing import Dict, Any
 from aiogram import Bot
 from aiogram.types import (
     Message,
+    MessageEntity,
     InlineKeyboardMarkup,
     InlineKeyboardButton
 )
@@ -162,16 +163,23 @@ async def send_assembled_message(
         return await bot.send_message(chat_id, "❌ Сообщение пустое")
 
 
-def serialize_message(message: Message) -> Dict[str, Any]:
-    """Сериализует объект Message в словарь"""
+def serialize_message(message: Message, compact: bool = False) -> Dict[str, Any]:
+    """
+    Сериализует объект Message в словарь.
+    compact=True - только поля, нужные для повторной отправки
+    (send_serialized_message), например для хранения в состоянии FSM.
+    """
+    if compact:
+        return serialize_message_compact(message)
+
     serialized = {
         "message_id": message.message_id,
         "chat_id": message.chat.id,
         "date": message.date.isoformat() if message.date else None,
         "text": message.text,
         "caption": message.caption,
-        "entities": [entity.to_dict() for entity in message.entities] if message.entities else None,
-        "caption_entities": [entity.to_dict() for entity in
+        "entities": [entity.model_dump(mode="json", exclude_none=True) for entity in message.entities] if message.entities else None,
+        "caption_entities": [entity.model_dump(mode="json", exclude_none=True) for entity in
                              message.caption_entities] if message.caption_entities else None,
     }
 
@@ -198,6 +206,39 @@ def serialize_message(message: Message) -> Dict[str, Any]:
         }
         serialized["media_type"] = "video"
 
+    elif message.video_note:
+        serialized["video_note"] = {
+            "file_id": message.video_note.file_id,
+            "file_unique_id": message.video_note.file_unique_id,
+            "length": message.video_note.length,
+            "duration": message.video_note.duration,
+            "file_size": message.video_note.file_size
+        }
+        serialized["media_type"] = "video_note"
+
+    elif message.voice:
+        serialized["voice"] = {
+            "file_id": message.voice.file_id,
+            "file_unique_id": message.voice.file_unique_id,
+            "duration": message.voice.duration,
+            "mime_type": message.voice.mime_type,
+            "file_size": message.voice.file_size
+        }
+        serialized["media_type"] = "voice"
+
+    # Анимация проверяется до документа: в сообщении с GIF заполнены оба поля
+    elif message.animation:
+        serialized["animation"] = {
+            "file_id": message.animation.file_id,
+            "file_unique_id": message.animation.file_unique_id,
+            "width": message.animation.width,
+            "height": message.animation.height,
+            "duration": message.animation.duration,
+            "file_name": message.animation.file_name,
+            "file_size": message.animation.file_size
+        }
+        serialized["media_type"] = "animation"
+
     elif message.document:
         serialized["document"] = {
             "file_id": message.document.file_id,
@@ -220,6 +261,40 @@ def serialize_message(message: Message) -> Dict[str, Any]:
         }
         serialized["media_type"] = "audio"
 
+    elif message.sticker:
+        serialized["sticker"] = {
+            "file_id": message.sticker.file_id,
+            "file_unique_id": message.sticker.file_unique_id,
+            "emoji": message.sticker.emoji,
+            "set_name": message.sticker.set_name
+        }
+        serialized["media_type"] = "sticker"
+
+    elif message.location:
+        serialized["location"] = {
+            "latitude": message.location.latitude,
+            "longitude": message.location.longitude
+        }
+        serialized["media_type"] = "location"
+
+    elif message.contact:
+        serialized["contact"] = {
+            "phone_number": message.contact.phone_number,
+            "first_name": message.contact.first_name,
+            "last_name": message.contact.last_name
+        }
+        serialized["media_type"] = "contact"
+
+    elif message.poll:
+        serialized["poll"] = {
+            "question": message.poll.question,
+            "options": [option.text for option in message.poll.options],
+            "is_anonymous": message.poll.is_anonymous,
+            "type": message.poll.type,
+            "allows_multiple_answers": message.poll.allows_multiple_answers
+        }
+        serialized["media_type"] = "poll"
+
     # Сериализация кнопок
     if message.reply_markup:
         serialized["reply_markup"] = serialize_reply_markup(message.reply_markup)
@@ -227,6 +302,49 @@ def serialize_message(message: Message) -> Dict[str, Any]:
     return serialized
 
 
+# Поля медиа, нужные send_serialized_message, у файлов без перечисленных полей - только file_id
+COMPACT_MEDIA_FIELDS = {
+    "audio": ("file_id", "title"),
+    "location": ("latitude", "longitude"),
+    "contact": ("phone_number", "first_name", "last_name"),
+    "poll": ("question", "options", "is_anonymous", "type", "allows_multiple_answers"),
+}
+
+
+def serialize_message_compact(message: Message) -> Dict[str, Any]:
+    """Сериализует объект Message в словарь минимального размера"""
+    full = serialize_message(message)
+    serialized = {
+        key: full[key]
+        for key in (
+            "message_id", "chat_id", "text", "caption",
+            "entities", "caption_entities", "media_type", "reply_markup",
+        )
+        if full.get(key) is not None
+    }
+
+    media_type = full.get("media_type")
+    if media_type == "photo":
+        # Для отправки достаточно самого большого размера
+        serialized["photo"] = [{"file_id": full["photo"][-1]["file_id"]}]
+    elif media_type:
+        serialized[media_type] = {
+            key: value
+            for key, value in full[media_type].items()
+            if key in COMPACT_MEDIA_FIELDS.get(media_type, ("file_id",)) and value is not None
+        }
+
+    if serialized.get("reply_markup"):
+        serialized["reply_markup"]["inline_keyboard"] = [
+            [
+                {key: value for key, value in button.items() if value is not None}
+                for button in row
+            ] for row in serialized["reply_markup"]["inline_keyboard"]
+        ]
+
+    return serialized
+
+
 def serialize_reply_markup(reply_markup) -> Dict[str, Any]:
     """Сериализует клавиатуру"""
     if hasattr(reply_markup, "inline_keyboard"):
@@ -238,9 +356,137 @@ def serialize_reply_markup(reply_markup) -> Dict[str, Any]:
                         "text": button.text,
                         "url": button.url,
                         "callback_data": button.callback_data,
-                        "web_app": button.web_app.to_dict() if button.web_app else None
+                        "web_app": button.web_app.model_dump(mode="json") if button.web_app else None
                     } for button in row
                 ] for row in reply_markup.inline_keyboard
             ]
         }
     return None
+
+
+def deserialize_reply_markup(
+        serialized_reply_markup: Dict[str, Any] | None
+) -> InlineKeyboardMarkup | None:
+    """Восстанавливает клавиатуру из serialize_reply_markup"""
+    if not serialized_reply_markup:
+        return None
+
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                InlineKeyboardButton(
+                    **{key: value for key, value in button.items() if value is not None}
+                ) for button in row
+            ] for row in serialized_reply_markup["inline_keyboard"]
+        ]
+    )
+
+
+async def send_serialized_message(
+        chat_id: int,
+        serialized_message: Dict[str, Any],
+        reply_to_message_id: int | None = None
+) -> Message:
+    """Отправляет сообщение, сериализованное через serialize_message"""
+    text = serialized_message.get("text")
+    caption = serialized_message.get("caption")
+    entities = serialized_message.get("entities")
+    caption_entities = serialized_message.get("caption_entities")
+
+    default_kwargs = dict(
+        chat_id=chat_id,
+        reply_markup=deserialize_reply_markup(
+            serialized_message.get("reply_markup")
+        ),
+        reply_to_message_id=reply_to_message_id,
+    )
+    caption_kwargs = dict(
+        caption=caption,
+        caption_entities=[
+            MessageEntity(**entity) for entity in caption_entities
+        ] if caption_entities else None,
+        **default_kwargs
+    )
+
+    media_type = serialized_message.get("media_type")
+
+    if media_type == "photo":
+        return await bot.send_photo(
+            photo=serialized_message["photo"][-1]["file_id"],
+            **caption_kwargs
+        )
+    elif media_type == "video":
+        return await bot.send_video(
+            video=serialized_message["video"]["file_id"],
+            **caption_kwargs
+        )
+    elif media_type == "document":
+        return await bot.send_document(
+            document=serialized_message["document"]["file_id"],
+            **caption_kwargs
+        )
+    elif media_type == "audio":
+        return await bot.send_audio(
+            audio=serialized_message["audio"]["file_id"],
+            title=serialized_message["audio"].get("title"),
+            **caption_kwargs
+        )
+    elif media_type == "animation":
+        return await bot.send_animation(
+            animation=serialized_message["animation"]["file_id"],
+            **caption_kwargs
+        )
+    elif media_type == "voice":
+        return await bot.send_voice(
+            voice=serialized_message["voice"]["file_id"],
+            **caption_kwargs
+        )
+    elif media_type == "video_note":
+        return await bot.send_video_note(
+            video_note=serialized_message["video_note"]["file_id"],
+            **default_kwargs
+        )
+    elif media_type == "sticker":
+        return await bot.send_sticker(
+            sticker=serialized_message["sticker"]["file_id"],
+            **default_kwargs
+        )
+    elif media_type == "location":
+        return await bot.send_location(
+            latitude=serialized_message["location"]["latitude"],
+            longitude=serialized_message["location"]["longitude"],
+            **default_kwargs
+        )
+    elif media_type == "contact":
+        return await bot.send_contact(
+            phone_number=serialized_message["contact"]["phone_number"],
+            first_name=serialized_message["contact"]["first_name"],
+            last_name=serialized_message["contact"].get("last_name"),
+            **default_kwargs
+        )
+    elif media_type == "poll":
+        poll = serialized_message["poll"]
+        return await bot.send_poll(
+            question=poll["question"],
+            options=poll["options"],
+            is_anonymous=poll.get("is_anonymous"),
+            type=poll.get("type"),
+            allows_multiple_answers=poll.get("allows_multiple_answers"),
+            **default_kwargs
+        )
+    elif text:
+        return await bot.send_message(
+            text=text,
+            entities=[
+                MessageEntity(**entity) for entity in entities
+            ] if entities else None,
+            **default_kwargs
+        )
+
+    # Остальные типы (игры, дайсы, истории...) не сериализуются,
+    # поэтому копируются из исходного чата
+    return await bot.copy_message(
+        from_chat_id=serialized_message["chat_id"],
+        message_id=serialized_message["message_id"],
+        **default_kwargs
+    )
@@ -0,0 +1,212 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable
+
+from aiogram.exceptions import TelegramAPIError, TelegramRetryAfter
+from loguru import logger
+
+from app.core.config import settings
+from app.utils.bot import send_serialized_message
+
+
+class TokenBucket:
+    """
+    Ограничитель частоты отправки сообщений (token bucket).
+    Токены пополняются со скоростью rate в секунду, но не больше capacity.
+    Токены резервируются сразу при вызове acquire (баланс может уйти в минус),
+    поэтому конкурентные корутины одного event loop встают в очередь без lock.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self._rate = rate
+        self._capacity = capacity or rate
+        self._tokens = self._capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(
+            self._capacity,
+            self._tokens + (now - self._updated_at) * self._rate
+        )
+        self._updated_at = now
+
+    def pause(self, seconds: float) -> None:
+        """Приостановка выдачи токенов (после TelegramRetryAfter)"""
+        now = time.monotonic()
+        self._paused_until = max(self._paused_until, now + seconds)
+        # Ожидающие корутины не должны отправить накопленное сразу после паузы
+        self._refill(now)
+        self._tokens = min(self._tokens, 0)
+
+    async def acquire(self, tokens: float = 1) -> None:
+        while (delay := self._paused_until - time.monotonic()) > 0:
+            await asyncio.sleep(delay)
+
+        now = time.monotonic()
+        self._refill(now)
+        self._tokens -= tokens
+
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self._rate)
+
+
+@dataclass
+class BroadcastProgress:
+    """Прогресс рассылки"""
+
+    total: int
+    sent: int = 0
+    failed: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def processed(self) -> int:
+        return self.sent + self.failed
+
+    @property
+    def is_finished(self) -> bool:
+        return self.processed >= self.total
+
+
+ProgressCallback = Callable[[BroadcastProgress], Awaitable[Any]]
+
+
+class Broadcaster:
+    """
+    Рассылка сообщения списку пользователей.
+    Получатели раздаются из очереди пулу из workers_count корутин,
+    каждое обращение к Telegram API проходит через общий TokenBucket.
+    """
+
+    def __init__(
+            self,
+            bucket: TokenBucket,
+            workers_count: int,
+            max_retries: int = 3,
+            progress_interval_seconds: float = 5,
+    ):
+        self._bucket = bucket
+        self._workers_count = workers_count
+        self._max_retries = max_retries
+        self._progress_interval_seconds = progress_interval_seconds
+
+    async def _send_with_retry(
+            self,
+            send: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        for attempt in range(self._max_retries + 1):
+            await self._bucket.acquire()
+            try:
+                return await send()
+            except TelegramRetryAfter as e:
+                if attempt == self._max_retries:
+                    raise
+                logger.warning(f"Broadcast flood control, retry after {e.retry_after}s")
+                self._bucket.pause(e.retry_after)
+
+    async def _send_to_user(
+            self,
+            chat_id: int,
+            serialized_message: Dict[str, Any],
+            header_text: str | None,
+    ) -> None:
+        reply_to_message_id = None
+        if header_text:
+            header_message = await self._send_with_retry(
+                lambda: send_serialized_message(
+                    chat_id=chat_id,
+                    serialized_message={"text": header_text},
+                )
+            )
+            reply_to_message_id = header_message.message_id
+
+        await self._send_with_retry(
+            lambda: send_serialized_message(
+                chat_id=chat_id,
+                serialized_message=serialized_message,
+                reply_to_message_id=reply_to_message_id,
+            )
+        )
+
+    async def _worker(
+            self,
+            queue: asyncio.Queue,
+            progress: BroadcastProgress,
+            serialized_message: Dict[str, Any],
+            header_text: str | None,
+    ) -> None:
+        while True:
+            chat_id = await queue.get()
+            try:
+                await self._send_to_user(chat_id, serialized_message, header_text)
+                progress.sent += 1
+            except TelegramAPIError:
+                progress.failed += 1
+            except Exception as e:
+                logger.exception(f"Broadcast to {chat_id} failed: {e}")
+                progress.failed += 1
+            finally:
+                queue.task_done()
+
+    async def _report_progress(
+            self,
+            progress: BroadcastProgress,
+            on_progress: ProgressCallback,
+    ) -> None:
+        while not progress.is_finished:
+            await asyncio.sleep(self._progress_interval_seconds)
+            try:
+                await on_progress(progress)
+            except TelegramAPIError:
+                continue
+
+    async def broadcast(
+            self,
+            chat_ids: Iterable[int],
+            serialized_message: Dict[str, Any],
+            header_text: str | None = None,
+            on_progress: ProgressCallback | None = None,
+    ) -> BroadcastProgress:
+        queue = asyncio.Queue()
+        for chat_id in chat_ids:
+            queue.put_nowait(chat_id)
+
+        progress = BroadcastProgress(total=queue.qsize())
+        workers = [
+            asyncio.create_task(
+                self._worker(queue, progress, serialized_message, header_text)
+            )
+            for _ in range(min(self._workers_count, progress.total))
+        ]
+        reporter = asyncio.create_task(
+            self._report_progress(progress, on_progress)
+        ) if on_progress else None
+
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            if reporter:
+                reporter.cancel()
+            await asyncio.gather(
+                *workers, *([reporter] if reporter else []),
+                return_exceptions=True
+            )
+
+        logger.info(
+            f"Broadcast finished: {progress.sent} sent, {progress.failed} failed "
+            f"in {time.monotonic() - progress.started_at:.1f}s"
+        )
+        return progress
+
+
+# Лимит Telegram общий для бота, поэтому bucket один на процесс
+broadcast_bucket = TokenBucket(rate=settings.broadcast_messages_per_second)
+
+broadcaster = Broadcaster(
+    bucket=broadcast_bucket,
+    workers_count=settings.broadcast_workers_count,
+)
@@ -0,0 +1,87 @@
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any
+
+from redis.asyncio import Redis
+
+
+class BaseCache(ABC):
+    """Асинхронный key-value кэш с временем жизни записей"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Any | None:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+
+class MemoryCache(BaseCache):
+    """
+    Кэш в памяти процесса.
+    Хранит не больше maxsize записей, при переполнении вытесняется
+    давно не использованная (LRU), просроченные записи удаляются при чтении.
+    """
+
+    def __init__(self, maxsize: int):
+        self._maxsize = maxsize
+        # key -> (value, время истечения)
+        self._data: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    async def get(self, key: str) -> Any | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+
+        value, expires_at = item
+        if time.monotonic() >= expires_at:
+            del self._data[key]
+            return None
+
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._data[key] = (value, time.monotonic() + ttl)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+
+class RedisCache(BaseCache):
+    """Кэш в Redis, общий для всех процессов бота. Значения хранятся в JSON"""
+
+    def __init__(self, redis: Redis, prefix: str):
+        self._redis = redis
+        self._prefix = prefix
+
+    def _get_key(self, key: str) -> str:
+        return f"{self._prefix}:{key}"
+
+    async def get(self, key: str) -> Any | None:
+        value = await self._redis.get(self._get_key(key))
+        return json.loads(value) if value is not None else None
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        await self._redis.set(
+            self._get_key(key),
+            json.dumps(value),
+            px=int(ttl * 1000),
+        )
+
+    async def delete(self, key: str) -> None:
+        await self._redis.delete(self._get_key(key))
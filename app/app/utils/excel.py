@@ -1,12 +1,50 @@
-from io import BytesIO
+import asyncio
 
-import pandas as pd
 from dependency_injector.wiring import inject, Provide
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
 
 from app.core.container import Container
-from app.models.telegram_user import TelegramUser
 from app.services.telegram_user_service import TelegramUserService
-from openpyxl.utils import get_column_letter
+
+
+# Заголовок столбца и его ширина. В write-only режиме ширину нужно задать
+# до записи строк, поэтому она фиксированная, а не по самому длинному значению.
+users_excel_columns = {
+    "Уровень глубины": 17,
+    "Логин ТГ": 25,
+    "Имя фамилия": 30,
+    "Логин тг пригласителя": 25,
+    "Тринарный статус": 18,
+    "Бинарный статус": 18,
+    "Кол-во приглашенных": 21,
+    "Тринарный общий доход": 23,
+    "Бинарный общий доход": 22,
+    "Tg ID": 14,
+    "Дата время регистрации": 24,
+}
+
+
+def _append_users_rows(worksheet, rows) -> None:
+    for row in rows:
+        if row.sponsor_user_id is None:
+            sponsor = None
+        else:
+            sponsor = row.sponsor_username or f"Пользователь: {row.sponsor_user_id}"
+
+        worksheet.append([
+            row.depth_level,
+            row.username,
+            " ".join(filter(None, [row.first_name, row.last_name])),
+            sponsor,
+            row.trinary_status.value,
+            row.binary_status.value,
+            row.invites_count,
+            row.trinary_bill,
+            row.binary_bill,
+            row.user_id,
+            row.created_at.strftime("%d.%m.%Y %H:%M"),
+        ])
 
 
 @inject
@@ -17,43 +55,19 @@ async def export_users_to_excel(
         ],
 ):
     """
-    Экспортирует данные пользователй в Excel.
+    Экспортирует данные пользователей в Excel.
+    Пользователи читаются из БД пачками, а запись в файл (openpyxl write-only)
+    выполняется в отдельном потоке, поэтому память не растет с размером базы
+    и бот не блокируется на время выгрузки.
     """
-    data = []
-
-    users: list[TelegramUser] = await telegram_user_service.get_list(
-        join_sponsor=True
-    )
-
-    for user in users:
-        data.append({
-            "Уровень глубины": user.depth_level,
-            "Логин ТГ": user.username,
-            "Имя фамилия": user.full_name,
-            "Логин тг пригласителя": user.sponsor,
-            "Тринарный статус": user.trinary_status.value,
-            "Бинарный статус": user.binary_status.value,
-            "Кол-во приглашенных": user.invites_count,
-            "Тринарный общий доход": user.trinary_bill,
-            "Бинарный общий доход": user.binary_bill,
-            "Tg ID": user.user_id,
-            "Дата время регистрации": \
-                user.created_at.strftime("%d.%m.%Y %H:%M")
-        })
-
-    df = pd.DataFrame(data)
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        df.to_excel(writer, index=False)
-
-        # Получаем активный лист
-        worksheet = writer.sheets['Sheet1']
-
-        # Устанавливаем ширину столбцов
-        for idx, col in enumerate(df.columns):
-            max_length = max(df[col].astype(str).map(len).max(), len(col))  # Максимальная длина
-            adjusted_width = (max_length + 2)  # Добавляем немного пространства
-            worksheet.column_dimensions[get_column_letter(idx + 1)].width = adjusted_width
-
-    with open(file_name, 'wb') as f:
-        f.write(output.getvalue())
\ No newline at end of file
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet("Sheet1")
+
+    for idx, width in enumerate(users_excel_columns.values(), start=1):
+        worksheet.column_dimensions[get_column_letter(idx)].width = width
+    worksheet.append(list(users_excel_columns.keys()))
+
+    async for rows in telegram_user_service.stream_users_with_sponsors():
+        await asyncio.to_thread(_append_users_rows, worksheet, rows)
+
+    await asyncio.to_thread(workbook.save, file_name)
@@ -1,5 +1,4 @@
 import uuid
-from datetime import datetime
 from typing import List
 
 import loguru
@@ -42,52 +41,27 @@ def get_matrices_list(matrices) -> tuple[list[Matrix], list[Matrix]]:
 def get_my_team_telegram_usernames(
         matrix: Matrix,
 ) -> tuple[list, list, int]:
-    first_level_usernames = []
-    second_level_usernames = []
-
-    level_length = 2 if matrix.build_type == MatrixBuildType.BINARY else 3
+    """
+    Username пользователей первого и второго уровня матрицы, свободные места - 0.
+    Второй уровень выводится только под занятыми местами первого уровня.
+    """
+    first_level_slots = matrix.get_level_slots(level=1)
 
-    first_matrix_usernames = list(matrix.matrix_telegram_usernames.keys())
+    first_level_usernames = [slot.username or slot.user_id for slot in first_level_slots]
+    first_level_usernames.extend([0] * (matrix.level_length - len(first_level_slots)))
+    length = len(first_level_slots)
 
-    sorted_first_level_usernames = sorted(
-        first_matrix_usernames, key=lambda x: datetime.strptime(
-            f"{x.split()[-2]} {x.split()[-1]}", "%Y-%m-%d %H:%M:%S.%f"
-        )
-    )
-
-    length = 0
-    for i in range(level_length):
-        try:
-            first_level_usernames.append(
-                sorted_first_level_usernames[i]
-            )
-            length += 1
-        except IndexError:
-            first_level_usernames.append(0)
-
-    for first_level_matrix in sorted_first_level_usernames:
-        if first_level_matrix == 0:
-            second_level_usernames.extend( [0] * level_length )
-            continue
-        second_list = []
-        for second_level_matrix in matrix.matrix_telegram_usernames[first_level_matrix]:
-            second_list.append(second_level_matrix.split()[0])
-            length += 1
-
-        while len(second_list) < level_length:
-            second_list.append(0)
+    second_level_usernames = []
+    for first_level_slot in first_level_slots:
+        second_list = [
+            slot.username or slot.user_id
+            for slot in matrix.get_children_slots(first_level_slot)
+        ]
+        length += len(second_list)
+        second_list.extend([0] * (matrix.level_length - len(second_list)))
 
         second_level_usernames.extend(second_list)
 
-    lst = []
-    for telegram_username in first_level_usernames:
-        if telegram_username != 0:
-            lst.append(telegram_username.split()[0])
-        else:
-            lst.append(telegram_username)
-
-    first_level_usernames = lst
-
     return first_level_usernames, second_level_usernames, length
 
 
@@ -106,13 +80,7 @@ def get_archived_matrices(
         matrices: List[Matrix],
         build_type: MatrixBuildType
 ) -> List[Matrix]:
-    level_length = 2 if build_type == MatrixBuildType.BINARY else 3
-    matrix_max_length = (level_length * level_length) + level_length
-
-    archived_matrices = [
-        matrix for matrix in matrices
-        if get_matrices_length(matrix.matrices) == matrix_max_length
-    ]
+    archived_matrices = [matrix for matrix in matrices if matrix.is_full]
 
     return archived_matrices
 
@@ -121,13 +89,7 @@ def get_active_matrices(
         matrices: List[Matrix],
         build_type: MatrixBuildType
 ) -> List[Matrix]:
-    level_length = 2 if build_type == MatrixBuildType.BINARY else 3
-    matrix_max_length = (level_length * level_length) + level_length
-
-    archived_matrices = [
-        matrix for matrix in matrices
-        if get_matrices_length(matrix.matrices) < matrix_max_length
-    ]
+    archived_matrices = [matrix for matrix in matrices if not matrix.is_full]
 
     return archived_matrices
 
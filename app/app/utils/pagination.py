@@ -1,4 +1,8 @@
 import math
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Select, func, select, tuple_
 
 
 class Paginator:
@@ -23,3 +27,65 @@ class Paginator:
 
     def has_previous(self):
         return self.page_number > 1
+
+
+class QueryPaginator(Paginator):
+    """
+    Пагинатор по SQLAlchemy запросу.
+    Вместо загрузки всего списка выполняет COUNT и запрос одной страницы:
+    LIMIT/OFFSET или, если передан cursor, keyset по (created_at, id)
+    после записи cursor. После paginate интерфейс совпадает с Paginator.
+    """
+
+    def __init__(
+        self,
+        statement: Select,
+        page_number: int = 1,
+        per_page: int = 1,
+        cursor: tuple[datetime, uuid.UUID] | None = None,
+    ):
+        self.statement = statement
+        self.page_number = page_number
+        self.per_page = per_page
+        self.cursor = cursor
+        self.count = 0
+        self.pages = 0
+        self.array = []
+
+    async def paginate(self, session) -> "QueryPaginator":
+        count_statement = (
+            select(func.count())
+            .select_from(self.statement.order_by(None).subquery())
+        )
+        self.count = (await session.execute(count_statement)).scalar()
+        self.pages = math.ceil(self.count / self.per_page)
+
+        if self.cursor is None:
+            page_statement = (
+                self.statement
+                .limit(self.per_page)
+                .offset((self.page_number - 1) * self.per_page)
+            )
+        else:
+            model = self.statement.column_descriptions[0]["entity"]
+            page_statement = (
+                self.statement
+                .filter(tuple_(model.created_at, model.id) > tuple_(*self.cursor))
+                .order_by(None)
+                .order_by(model.created_at, model.id)
+                .limit(self.per_page)
+            )
+
+        self.array = (await session.execute(page_statement)).scalars().all()
+        return self
+
+    def get_page(self):
+        return self.array
+
+    def get_cursor(self) -> tuple[datetime, uuid.UUID] | None:
+        """Курсор для получения следующей страницы в keyset режиме"""
+        if not self.array:
+            return None
+
+        last_object = self.array[-1]
+        return last_object.created_at, last_object.id
@@ -3,6 +3,7 @@ from aiogram.types import Message
 from app.models.telegram_user import DonateStatus, status_list
 from app.keyboards.donate import get_donate_keyboard
 from app.models.telegram_user import TelegramUser
+from app.models.tiers import is_status_higher
 
 
 def get_callback_value(callback_data: str) -> str:
@@ -14,12 +15,4 @@ def check_is_second_status_higher(status_1: DonateStatus, status_2: DonateStatus
     if status_1 == DonateStatus.NOT_ACTIVE:
         return True
 
-    expression = (
-        status_2.get_status_donate_value() > status_1.get_status_donate_value()
-    )
-
-    return expression
-
-
-
-
+    return is_status_higher(status_2, status_1)
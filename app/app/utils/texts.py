@@ -36,22 +36,17 @@ def get_donate_confirm_message(
 
 
 def get_user_statuses_statistic_message(
-        users: list[TelegramUser],
-        matrix_build_type: MatrixBuildType
+        statuses_count: dict[DonateStatus, int],
 ) -> str:
     status_emoji_data = {
         status_list[i]: status_emoji_list[i]
         for i in range(len(status_list))
     }
-    statuses_data = {"🆓": 0}
-    statuses_data.update({status: 0 for status in status_emoji_list})
-
-    for user in users:
-        if user.get_status(matrix_build_type) == DonateStatus.NOT_ACTIVE:
-            statuses_data["🆓"] += 1
-            continue
-
-        statuses_data[status_emoji_data[user.get_status(matrix_build_type)]] += 1
+    statuses_data = {"🆓": statuses_count.get(DonateStatus.NOT_ACTIVE, 0)}
+    statuses_data.update({
+        status_emoji_data[status]: statuses_count.get(status, 0)
+        for status in status_list
+    })
 
     message = ""
 
@@ -0,0 +1,106 @@
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+
+from redis.asyncio import Redis
+
+
+@dataclass(frozen=True)
+class ThrottlingRate:
+    """Не больше limit событий за window_seconds секунд"""
+
+    limit: int
+    window_seconds: float
+
+
+class BaseThrottlingBackend(ABC):
+    """Хранилище счетчиков скользящего окна"""
+
+    @abstractmethod
+    async def hit(self, key: str, rate: ThrottlingRate) -> bool:
+        """Регистрация события, False - если лимит окна исчерпан"""
+        ...
+
+
+class MemoryThrottlingBackend(BaseThrottlingBackend):
+    """
+    Скользящее окно в памяти процесса.
+    Хранит не больше maxsize ключей: записи с истекшим окном удаляются,
+    при переполнении вытесняются давно не использованные.
+    """
+
+    def __init__(self, maxsize: int):
+        self._maxsize = maxsize
+        # key -> (время событий в окне, время истечения окна)
+        self._hits: OrderedDict[str, tuple[deque[float], float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._hits)
+
+    def _remove_expired(self, now: float) -> None:
+        while self._hits:
+            key, (_, expires_at) = next(iter(self._hits.items()))
+            if expires_at > now and len(self._hits) <= self._maxsize:
+                break
+            del self._hits[key]
+
+    async def hit(self, key: str, rate: ThrottlingRate) -> bool:
+        now = time.monotonic()
+        hits, _ = self._hits.pop(key, (deque(), 0.0))
+
+        while hits and hits[0] <= now - rate.window_seconds:
+            hits.popleft()
+
+        is_allowed = len(hits) < rate.limit
+        if is_allowed:
+            hits.append(now)
+
+        if hits:
+            self._hits[key] = (hits, hits[-1] + rate.window_seconds)
+        self._remove_expired(now)
+
+        return is_allowed
+
+
+class RedisThrottlingBackend(BaseThrottlingBackend):
+    """
+    Скользящее окно в Redis, общее для всех реплик бота.
+    События хранятся в sorted set, проверка и запись выполняются
+    атомарно одним lua скриптом.
+    """
+
+    script = """
+    local key = KEYS[1]
+    local now = tonumber(ARGV[1])
+    local window = tonumber(ARGV[2])
+    local limit = tonumber(ARGV[3])
+
+    redis.call("ZREMRANGEBYSCORE", key, "-inf", now - window)
+    if redis.call("ZCARD", key) >= limit then
+        return 0
+    end
+
+    redis.call("ZADD", key, now, ARGV[4])
+    redis.call("PEXPIRE", key, window)
+    return 1
+    """
+
+    def __init__(self, redis: Redis, prefix: str = "throttling"):
+        self._prefix = prefix
+        self._script = redis.register_script(self.script)
+
+    async def hit(self, key: str, rate: ThrottlingRate) -> bool:
+        now_ms = int(time.time() * 1000)
+        is_allowed = await self._script(
+            keys=[f"{self._prefix}:{key}"],
+            args=[
+                now_ms,
+                int(rate.window_seconds * 1000),
+                rate.limit,
+                f"{now_ms}:{uuid.uuid4().hex}",
+            ],
+        )
+
+        return bool(is_allowed)
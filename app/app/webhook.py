@@ -0,0 +1,81 @@
+import asyncio
+import multiprocessing
+
+from aiohttp import web
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from loguru import logger
+
+from app.core.config import settings, CacheBackend
+from app.core.container import Container
+from app import handlers
+
+from loader import dp, bot
+from main import setup_dispatcher
+
+
+def create_app(container: Container) -> web.Application:
+    """aiohttp приложение, принимающее апдейты бота"""
+    setup_dispatcher(dp, container)
+
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        secret_token=settings.webhook_secret,
+    ).register(app, path=settings.webhook_path)
+    setup_application(app, dp, bot=bot)
+
+    return app
+
+
+def run_worker() -> None:
+    """
+    Процесс веб-сервера.
+    Процессы слушают один порт (SO_REUSEPORT), апдейты между ними распределяет ядро,
+    а состояния FSM хранятся в Redis, поэтому апдейт может попасть в любой процесс.
+    """
+    container = Container()
+    container.wire(modules=[handlers])
+    web.run_app(
+        create_app(container),
+        host=settings.webhook_host,
+        port=settings.webhook_port,
+        reuse_port=True,
+        print=None,
+    )
+
+
+async def set_webhook() -> None:
+    setup_dispatcher(dp, Container())
+    try:
+        await bot.set_webhook(
+            url=f"{settings.webhook_url}{settings.webhook_path}",
+            secret_token=settings.webhook_secret,
+            allowed_updates=dp.resolve_used_update_types(),
+        )
+    finally:
+        await bot.session.close()
+
+
+if __name__ == "__main__":
+    if not settings.webhook_url:
+        raise RuntimeError("WEBHOOK_URL is not set")
+
+    if settings.webhook_workers > 1 and settings.cache_backend == CacheBackend.MEMORY:
+        logger.warning(
+            "CACHE_BACKEND=memory with several webhook workers: caches are not shared, "
+            "ban/unban reaches other workers only after BAN_CACHE_TTL_SECONDS"
+        )
+
+    asyncio.run(set_webhook())
+    logger.info(f"Bot is starting in webhook mode with {settings.webhook_workers} workers")
+
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=run_worker, name=f"webhook-worker-{i}")
+        for i in range(settings.webhook_workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
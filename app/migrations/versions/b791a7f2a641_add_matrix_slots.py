@@ -0,0 +1,159 @@
+"""add matrix slots
+
+Revision ID: b791a7f2a641
+Revises: daad72b2e78b
+Create Date: 2026-10-18 07:36:29.224653
+
+"""
+import json
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b791a7f2a641'
+down_revision: Union[str, None] = 'daad72b2e78b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _parse_username_key(key: str) -> tuple[str | None, str, datetime]:
+    """Разбор строки вида "username matrix_id 2024-01-01 12:00:00.123456" """
+    *username, matrix_id, date, time = key.split()
+    username = " ".join(username)
+
+    return (
+        None if username == "None" else username,
+        matrix_id,
+        datetime.fromisoformat(f"{date} {time}"),
+    )
+
+
+def build_slots(
+        build_type: str,
+        matrix_telegram_usernames: dict[str, list[str]],
+        owners_user_ids: dict[str, int],
+) -> list[list]:
+    """Места матрицы (MatrixSlot.to_row) из matrix_telegram_usernames"""
+    level_length = 2 if build_type == "BINARY" else 3
+
+    first_level = sorted(
+        (
+            (_parse_username_key(key), children)
+            for key, children in matrix_telegram_usernames.items()
+        ),
+        key=lambda item: item[0][2],
+    )
+    slots = []
+    for position, ((username, child_id, joined_at), children) in enumerate(first_level):
+        slots.append(
+            [1, position, child_id, owners_user_ids.get(child_id), username, joined_at.isoformat()]
+        )
+        for index, child_key in enumerate(children):
+            username, child_id, joined_at = _parse_username_key(child_key)
+            slots.append(
+                [
+                    2,
+                    position * level_length + index,
+                    child_id,
+                    owners_user_ids.get(child_id),
+                    username,
+                    joined_at.isoformat(),
+                ]
+            )
+
+    return slots
+
+
+def build_matrix_telegram_usernames(build_type: str, slots: list[list]) -> dict[str, list[str]]:
+    """Обратное преобразование build_slots для downgrade"""
+    level_length = 2 if build_type == "BINARY" else 3
+
+    def get_key(slot: list) -> str:
+        _, _, child_id, _, username, joined_at = slot
+        return f"{username} {child_id} {datetime.fromisoformat(joined_at)}"
+
+    first_level = {
+        slot[1]: get_key(slot)
+        for slot in sorted(slots, key=lambda slot: slot[1]) if slot[0] == 1
+    }
+    matrix_telegram_usernames = {key: [] for key in first_level.values()}
+    for slot in sorted(slots, key=lambda slot: slot[1]):
+        if slot[0] == 2:
+            matrix_telegram_usernames[first_level[slot[1] // level_length]].append(
+                get_key(slot)
+            )
+
+    return matrix_telegram_usernames
+
+
+def upgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.add_column('matrices', sa.Column('slots', postgresql.JSONB(astext_type=sa.Text()), server_default='[]', nullable=False))
+    # ### end Alembic commands ###
+
+    # Перенос matrix_telegram_usernames в slots
+    connection = op.get_bind()
+    owners_user_ids = dict(
+        connection.execute(
+            sa.text(
+                """
+                SELECT m.id::text, tu.user_id
+                FROM matrices m JOIN telegram_users tu ON tu.id = m.owner_id
+                """
+            )
+        ).all()
+    )
+    matrices = connection.execute(
+        sa.text(
+            """
+            SELECT id, build_type, matrix_telegram_usernames FROM matrices
+            WHERE matrix_telegram_usernames IS NOT NULL
+                AND matrix_telegram_usernames != '{}'::jsonb
+            """
+        )
+    ).all()
+
+    for matrix_id, build_type, matrix_telegram_usernames in matrices:
+        slots = build_slots(build_type, matrix_telegram_usernames, owners_user_ids)
+
+        connection.execute(
+            sa.text("UPDATE matrices SET slots = CAST(:slots AS jsonb) WHERE id = :id"),
+            {"slots": json.dumps(slots), "id": matrix_id},
+        )
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_index('ix_matrices_matrix_telegram_usernames', table_name='matrices')
+    op.drop_column('matrices', 'matrix_telegram_usernames')
+    # ### end Alembic commands ###
+
+
+def downgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.add_column('matrices', sa.Column('matrix_telegram_usernames', postgresql.JSONB(astext_type=sa.Text()), autoincrement=False, nullable=True))
+    op.create_index('ix_matrices_matrix_telegram_usernames', 'matrices', ['matrix_telegram_usernames'], unique=False)
+    # ### end Alembic commands ###
+
+    connection = op.get_bind()
+    matrices = connection.execute(
+        sa.text("SELECT id, build_type, slots FROM matrices WHERE slots != '[]'::jsonb")
+    ).all()
+
+    for matrix_id, build_type, slots in matrices:
+        matrix_telegram_usernames = build_matrix_telegram_usernames(build_type, slots)
+
+        connection.execute(
+            sa.text(
+                "UPDATE matrices SET matrix_telegram_usernames = CAST(:usernames AS jsonb) "
+                "WHERE id = :id"
+            ),
+            {"usernames": json.dumps(matrix_telegram_usernames), "id": matrix_id},
+        )
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_column('matrices', 'slots')
+    # ### end Alembic commands ###
@@ -0,0 +1,64 @@
+from loguru import logger
+from sqlalchemy import text
+
+from app.db.session import SyncSession
+from app.core.config import settings
+
+
+# Используется также миграцией 4b7e2c1d9a3f_add_matrix_edges
+BACKFILL_MATRIX_EDGES_QUERY = text(
+    """
+    INSERT INTO matrix_edges (id, parent_id, child_id, level, position, created_at, updated_at)
+    SELECT
+        gen_random_uuid(),
+        edges.parent_id,
+        edges.child_id,
+        edges.level,
+        row_number() OVER (
+            PARTITION BY edges.parent_id, edges.level
+            ORDER BY child.created_at, child.id
+        ) - 1,
+        now(),
+        now()
+    FROM (
+        SELECT matrices.id AS parent_id, first_level.key::uuid AS child_id, 1 AS level
+        FROM matrices, jsonb_each(matrices.matrices) AS first_level
+        WHERE jsonb_typeof(matrices.matrices) = 'object'
+        UNION ALL
+        SELECT matrices.id, second_level.value::uuid, 2
+        FROM matrices,
+            jsonb_each(matrices.matrices) AS first_level,
+            jsonb_array_elements_text(first_level.value) AS second_level
+        WHERE jsonb_typeof(matrices.matrices) = 'object'
+    ) AS edges
+    JOIN matrices AS child ON child.id = edges.child_id
+    ON CONFLICT DO NOTHING
+    """
+)
+
+
+class MatrixEdgesBackfiller:
+    """
+    Класс для заполнения таблицы matrix_edges из JSONB поля matrices.
+    Уже существующие связи не изменяются, поэтому скрипт можно запускать повторно.
+    """
+
+    def __init__(self, sync_session):
+        self._sync_session = sync_session
+
+    def backfill(self):
+        session = self._sync_session.create_session()
+        try:
+            result = session.execute(BACKFILL_MATRIX_EDGES_QUERY)
+            session.commit()
+        finally:
+            session.close()
+
+        logger.info(f"Добавлено связей матриц: {result.rowcount}")
+
+
+if __name__ == "__main__":
+    session = SyncSession(db_url=settings.postgres_url)
+
+    backfiller = MatrixEdgesBackfiller(session)
+    backfiller.backfill()
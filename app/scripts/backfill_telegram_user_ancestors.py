@@ -0,0 +1,54 @@
+from loguru import logger
+from sqlalchemy import text
+
+from app.db.session import SyncSession
+from app.core.config import settings
+
+
+# Используется также миграцией f027db47b500_add_telegram_user_ancestors
+BACKFILL_TELEGRAM_USER_ANCESTORS_QUERY = text(
+    """
+    WITH RECURSIVE ancestors (user_id, ancestor_user_id, depth, path) AS (
+        SELECT user_id, user_id, 0, ARRAY[user_id]
+        FROM telegram_users
+        UNION ALL
+        SELECT ancestors.user_id, sponsor.user_id, ancestors.depth + 1, ancestors.path || sponsor.user_id
+        FROM ancestors
+        JOIN telegram_users AS ancestor ON ancestor.user_id = ancestors.ancestor_user_id
+        JOIN telegram_users AS sponsor ON sponsor.user_id = ancestor.sponsor_user_id
+        WHERE sponsor.user_id != ALL(ancestors.path)
+    )
+    INSERT INTO telegram_user_ancestors (id, user_id, ancestor_user_id, depth, created_at, updated_at)
+    SELECT gen_random_uuid(), user_id, ancestor_user_id, depth, now(), now()
+    FROM ancestors
+    ON CONFLICT DO NOTHING
+    """
+)
+
+
+class TelegramUserAncestorsBackfiller:
+    """
+    Класс для заполнения таблицы замыкания telegram_user_ancestors
+    по полю sponsor_user_id. Уже существующие строки не изменяются,
+    поэтому скрипт можно запускать повторно.
+    """
+
+    def __init__(self, sync_session):
+        self._sync_session = sync_session
+
+    def backfill(self):
+        session = self._sync_session.create_session()
+        try:
+            result = session.execute(BACKFILL_TELEGRAM_USER_ANCESTORS_QUERY)
+            session.commit()
+        finally:
+            session.close()
+
+        logger.info(f"Добавлено строк цепочек спонсоров: {result.rowcount}")
+
+
+if __name__ == "__main__":
+    session = SyncSession(db_url=settings.postgres_url)
+
+    backfiller = TelegramUserAncestorsBackfiller(session)
+    backfiller.backfill()
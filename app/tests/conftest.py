@@ -0,0 +1,27 @@
+import os
+
+
+# Обязательные настройки app.core.config.Settings для импорта модулей приложения,
+# переменные окружения, заданные явно, не перезаписываются
+for name, value in {
+    "BOT_TOKEN": "123456:ABCdefGhIJKlmNoPQRsTUVwxyZ",
+    "BOT_LINK": "https://t.me/{bot_name}",
+    "BOT_NAME": "test_bot",
+    "CHAT_ID": "1",
+    "CHAT_LINK": "https://t.me/chat",
+    "GROUP_LINK": "https://t.me/group",
+    "PRESENTATION_LINK": "https://example.com",
+    "DONATES_CHANNEL_ID": "2",
+    "DONATES_CHANNEL_LINK": "https://t.me/donates",
+    "WEB_APP_LINK": "https://example.com",
+    "SUPPORT_USERNAME": "support",
+    "POSTGRES_USER": "postgres",
+    "POSTGRES_PASSWORD": "postgres",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_DB": "bot",
+    "RABBITMQ_PORT": "5672",
+    "TOKEN": "token",
+    "MANIFEST_URL": "https://example.com/manifest.json",
+    "BOT_WALLET_ADDRESS": "wallet",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,127 @@
+"""
+Запросы заполнения matrix_edges и telegram_user_ancestors (используются миграциями).
+Выполняются на БД с примененными миграциями из TEST_POSTGRES_URL
+(например postgresql://postgres@localhost:5432/bot) в транзакции, которая откатывается.
+"""
+import os
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from scripts.backfill_matrix_edges import BACKFILL_MATRIX_EDGES_QUERY
+from scripts.backfill_telegram_user_ancestors import BACKFILL_TELEGRAM_USER_ANCESTORS_QUERY
+
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("TEST_POSTGRES_URL"), reason="TEST_POSTGRES_URL не задан"
+)
+
+
+@pytest.fixture
+def connection():
+    engine = create_engine(os.environ["TEST_POSTGRES_URL"])
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        connection.execute(text("DELETE FROM matrix_edges"))
+        connection.execute(text("DELETE FROM telegram_user_ancestors"))
+        try:
+            yield connection
+        finally:
+            transaction.rollback()
+    engine.dispose()
+
+
+def create_telegram_user(connection, user_id: int, sponsor_user_id: int | None = None) -> uuid.UUID:
+    telegram_user_id = uuid.uuid4()
+    connection.execute(
+        text(
+            "INSERT INTO telegram_users (id, user_id, sponsor_user_id) "
+            "VALUES (:id, :user_id, :sponsor_user_id)"
+        ),
+        {"id": telegram_user_id, "user_id": user_id, "sponsor_user_id": sponsor_user_id},
+    )
+    return telegram_user_id
+
+
+def test_backfill_telegram_user_ancestors(connection):
+    root_user_id, sponsor_user_id, user_id = -3, -2, -1
+    create_telegram_user(connection, root_user_id)
+    create_telegram_user(connection, sponsor_user_id, sponsor_user_id=root_user_id)
+    create_telegram_user(connection, user_id, sponsor_user_id=sponsor_user_id)
+
+    connection.execute(BACKFILL_TELEGRAM_USER_ANCESTORS_QUERY)
+    # повторный запуск не добавляет строк
+    assert connection.execute(BACKFILL_TELEGRAM_USER_ANCESTORS_QUERY).rowcount == 0
+
+    rows = connection.execute(
+        text(
+            "SELECT user_id, ancestor_user_id, depth FROM telegram_user_ancestors "
+            "WHERE user_id IN (:root, :sponsor, :user) ORDER BY user_id, depth"
+        ),
+        {"root": root_user_id, "sponsor": sponsor_user_id, "user": user_id},
+    ).all()
+    assert rows == [
+        (root_user_id, root_user_id, 0),
+        (sponsor_user_id, sponsor_user_id, 0),
+        (sponsor_user_id, root_user_id, 1),
+        (user_id, user_id, 0),
+        (user_id, sponsor_user_id, 1),
+        (user_id, root_user_id, 2),
+    ]
+
+
+def test_backfill_telegram_user_ancestors_stops_on_cycle(connection):
+    create_telegram_user(connection, -2)
+    create_telegram_user(connection, -1, sponsor_user_id=-2)
+    connection.execute(text("UPDATE telegram_users SET sponsor_user_id = -1 WHERE user_id = -2"))
+
+    connection.execute(BACKFILL_TELEGRAM_USER_ANCESTORS_QUERY)
+
+    rows = connection.execute(
+        text(
+            "SELECT user_id, ancestor_user_id, depth FROM telegram_user_ancestors "
+            "WHERE user_id IN (-2, -1) ORDER BY user_id, depth"
+        )
+    ).all()
+    assert rows == [(-2, -2, 0), (-2, -1, 1), (-1, -1, 0), (-1, -2, 1)]
+
+
+def test_backfill_matrix_edges(connection):
+    owner_id = create_telegram_user(connection, -1)
+    parent_id, first_id, second_id, child_id, other_child_id = (uuid.uuid4() for _ in range(5))
+    for index, matrix_id in enumerate((parent_id, second_id, first_id, other_child_id, child_id)):
+        connection.execute(
+            text(
+                "INSERT INTO matrices (id, owner_id, matrices, created_at) "
+                "VALUES (:id, :owner_id, CAST(:matrices AS jsonb), :created_at)"
+            ),
+            {
+                "id": matrix_id,
+                "owner_id": owner_id,
+                "matrices": (
+                    f'{{"{first_id}": ["{child_id}"], "{second_id}": ["{other_child_id}"]}}'
+                    if matrix_id == parent_id else "{}"
+                ),
+                "created_at": datetime(2024, 1, 1, index),
+            },
+        )
+
+    connection.execute(BACKFILL_MATRIX_EDGES_QUERY)
+    assert connection.execute(BACKFILL_MATRIX_EDGES_QUERY).rowcount == 0
+
+    rows = connection.execute(
+        text(
+            "SELECT child_id, level, position FROM matrix_edges "
+            "WHERE parent_id = :parent_id ORDER BY level, position"
+        ),
+        {"parent_id": parent_id},
+    ).all()
+    # позиции нумеруются по времени создания дочерних матриц
+    assert rows == [
+        (second_id, 1, 0),
+        (first_id, 1, 1),
+        (other_child_id, 2, 0),
+        (child_id, 2, 1),
+    ]
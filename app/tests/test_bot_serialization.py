@@ -0,0 +1,182 @@
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+from aiogram.types import (
+    Animation,
+    Chat,
+    Contact,
+    Dice,
+    Document,
+    InlineKeyboardButton,
+    InlineKeyboardMarkup,
+    Location,
+    Message,
+    MessageEntity,
+    PhotoSize,
+    Poll,
+    PollOption,
+    Sticker,
+    Voice,
+)
+
+from app.utils import bot as bot_utils
+
+
+class FakeBot:
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, method):
+        async def call(**kwargs):
+            self.calls.append((method, kwargs))
+
+        return call
+
+
+@pytest.fixture
+def fake_bot(monkeypatch):
+    fake_bot = FakeBot()
+    monkeypatch.setattr(bot_utils, "bot", fake_bot)
+    return fake_bot
+
+
+def create_message(**kwargs) -> Message:
+    return Message(
+        message_id=5,
+        date=datetime(2024, 1, 1),
+        chat=Chat(id=1, type="private"),
+        **kwargs,
+    )
+
+
+def resend(message: Message, compact: bool, fake_bot: FakeBot) -> tuple[str, dict]:
+    # сериализованное сообщение хранится в JSON (состояние FSM, аргументы задач celery)
+    serialized_message = json.loads(json.dumps(bot_utils.serialize_message(message, compact=compact)))
+    asyncio.run(bot_utils.send_serialized_message(chat_id=7, serialized_message=serialized_message))
+
+    method, kwargs = fake_bot.calls.pop()
+    assert kwargs.pop("chat_id") == 7
+    return method, {key: value for key, value in kwargs.items() if value is not None}
+
+
+MESSAGES = [
+    (
+        create_message(
+            photo=[
+                PhotoSize(file_id="small", file_unique_id="s", width=1, height=1),
+                PhotoSize(file_id="big", file_unique_id="b", width=10, height=10),
+            ],
+            caption="photo",
+        ),
+        "send_photo",
+        {"photo": "big", "caption": "photo"},
+    ),
+    (
+        create_message(voice=Voice(file_id="voice", file_unique_id="v", duration=3)),
+        "send_voice",
+        {"voice": "voice"},
+    ),
+    (
+        create_message(
+            animation=Animation(file_id="gif", file_unique_id="g", width=1, height=1, duration=1),
+            document=Document(file_id="gif", file_unique_id="g"),
+        ),
+        "send_animation",
+        {"animation": "gif"},
+    ),
+    (
+        create_message(
+            sticker=Sticker(
+                file_id="sticker", file_unique_id="s", type="regular",
+                width=1, height=1, is_animated=False, is_video=False,
+            )
+        ),
+        "send_sticker",
+        {"sticker": "sticker"},
+    ),
+    (
+        create_message(location=Location(latitude=1.5, longitude=2.5)),
+        "send_location",
+        {"latitude": 1.5, "longitude": 2.5},
+    ),
+    (
+        create_message(contact=Contact(phone_number="+1", first_name="First")),
+        "send_contact",
+        {"phone_number": "+1", "first_name": "First"},
+    ),
+    (
+        create_message(
+            poll=Poll(
+                id="poll", question="question", total_voter_count=0, is_closed=False,
+                is_anonymous=False, type="regular", allows_multiple_answers=True,
+                allows_revoting=False, members_only=False,
+                options=[
+                    PollOption(text="first", voter_count=0, persistent_id="1"),
+                    PollOption(text="second", voter_count=0, persistent_id="2"),
+                ],
+            )
+        ),
+        "send_poll",
+        {
+            "question": "question", "options": ["first", "second"], "is_anonymous": False,
+            "type": "regular", "allows_multiple_answers": True,
+        },
+    ),
+    (
+        create_message(dice=Dice(emoji="🎲", value=3)),
+        "copy_message",
+        {"from_chat_id": 1, "message_id": 5},
+    ),
+]
+
+
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize("message, method, kwargs", MESSAGES)
+def test_resend_serialized_message(fake_bot, message, method, kwargs, compact):
+    assert resend(message, compact, fake_bot) == (method, kwargs)
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_resend_text_with_entities_and_keyboard(fake_bot, compact):
+    message = create_message(
+        text="bold link",
+        entities=[MessageEntity(type="bold", offset=0, length=4)],
+        reply_markup=InlineKeyboardMarkup(
+            inline_keyboard=[[
+                InlineKeyboardButton(text="url", url="https://example.com"),
+                InlineKeyboardButton(text="callback", callback_data="data"),
+            ]]
+        ),
+    )
+
+    method, kwargs = resend(message, compact, fake_bot)
+
+    assert method == "send_message"
+    assert kwargs["text"] == "bold link"
+    assert kwargs["entities"] == [MessageEntity(type="bold", offset=0, length=4)]
+    assert kwargs["reply_markup"] == message.reply_markup
+
+
+def test_compact_serialization_keeps_only_resend_fields():
+    message = create_message(
+        photo=[
+            PhotoSize(file_id="small", file_unique_id="s", width=1, height=1, file_size=1),
+            PhotoSize(file_id="big", file_unique_id="b", width=10, height=10, file_size=10),
+        ],
+        reply_markup=InlineKeyboardMarkup(
+            inline_keyboard=[[InlineKeyboardButton(text="url", url="https://example.com")]]
+        ),
+    )
+
+    assert bot_utils.serialize_message(message, compact=True) == {
+        "message_id": 5,
+        "chat_id": 1,
+        "media_type": "photo",
+        "photo": [{"file_id": "big"}],
+        "reply_markup": {
+            "type": "inline_keyboard",
+            "inline_keyboard": [[{"text": "url", "url": "https://example.com"}]],
+        },
+    }
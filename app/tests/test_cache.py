@@ -0,0 +1,106 @@
+import asyncio
+import json
+
+import pytest
+
+from app.utils import cache
+from app.utils.cache import MemoryCache, RedisCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.ttl = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, px=None):
+        self.data[key] = value
+        self.ttl[key] = px
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+def test_memory_cache_ttl(clock):
+    memory_cache = MemoryCache(maxsize=10)
+
+    async def run():
+        await memory_cache.set("key", {"value": 1}, ttl=5)
+        assert await memory_cache.get("key") == {"value": 1}
+
+        clock.now += 4.9
+        assert await memory_cache.get("key") == {"value": 1}
+
+        clock.now += 0.1
+        assert await memory_cache.get("key") is None
+        assert len(memory_cache) == 0
+
+    asyncio.run(run())
+
+
+def test_memory_cache_evicts_least_recently_used(clock):
+    memory_cache = MemoryCache(maxsize=2)
+
+    async def run():
+        await memory_cache.set("first", 1, ttl=60)
+        await memory_cache.set("second", 2, ttl=60)
+        assert await memory_cache.get("first") == 1
+
+        await memory_cache.set("third", 3, ttl=60)
+
+        assert len(memory_cache) == 2
+        assert await memory_cache.get("second") is None
+        assert await memory_cache.get("first") == 1
+        assert await memory_cache.get("third") == 3
+
+    asyncio.run(run())
+
+
+def test_memory_cache_keeps_falsy_values_and_deletes(clock):
+    memory_cache = MemoryCache(maxsize=10)
+
+    async def run():
+        await memory_cache.set("key", False, ttl=60)
+        assert await memory_cache.get("key") is False
+
+        await memory_cache.delete("key")
+        await memory_cache.delete("missing")
+        assert await memory_cache.get("key") is None
+
+    asyncio.run(run())
+
+
+def test_redis_cache():
+    redis = FakeRedis()
+    redis_cache = RedisCache(redis=redis, prefix="chat_member")
+
+    async def run():
+        await redis_cache.set("1", {"is_member": True}, ttl=1.5)
+        assert redis.ttl == {"chat_member:1": 1500}
+        assert json.loads(redis.data["chat_member:1"]) == {"is_member": True}
+        assert await redis_cache.get("1") == {"is_member": True}
+
+        await redis_cache.set("2", False, ttl=1)
+        assert await redis_cache.get("2") is False
+
+        await redis_cache.delete("1")
+        assert await redis_cache.get("1") is None
+
+    asyncio.run(run())
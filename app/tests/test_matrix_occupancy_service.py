@@ -0,0 +1,186 @@
+import asyncio
+import uuid
+
+from app.models.matrix import Matrix
+from app.models.telegram_user import DonateStatus, MatrixBuildType
+from app.services.matrix_occupancy_service import MatrixOccupancyService
+
+
+class FakeRepositoryMatrix:
+    def __init__(
+            self,
+            parent_matrices: dict[uuid.UUID, Matrix] | None = None,
+            first_level_matrices: dict[uuid.UUID, list[Matrix]] | None = None,
+    ):
+        self.parent_matrices = parent_matrices or {}
+        self.first_level_matrices = first_level_matrices or {}
+        self.calls = []
+
+    async def get_parent_matrices_by_children_ids(self, matrices_ids, status):
+        self.calls.append(("get_parent_matrices_by_children_ids", sorted(matrices_ids)))
+        return {
+            matrix_id: parent_matrix
+            for matrix_id, parent_matrix in self.parent_matrices.items()
+            if matrix_id in matrices_ids
+        }
+
+    async def get_first_level_matrices_by_parents_ids(self, parents_ids):
+        self.calls.append(("get_first_level_matrices_by_parents_ids", sorted(parents_ids)))
+        return {parent_id: self.first_level_matrices.get(parent_id, []) for parent_id in parents_ids}
+
+
+class FakeRepositoryDonate:
+    def __init__(self, pending_count: dict[uuid.UUID, int] | None = None):
+        self.pending_count = pending_count or {}
+        self.calls = []
+
+    async def count_pending_by_matrix_ids(self, matrices_ids):
+        self.calls.append(sorted(matrices_ids))
+        return {
+            matrix_id: count
+            for matrix_id, count in self.pending_count.items()
+            if matrix_id in matrices_ids
+        }
+
+
+def create_matrix(
+        first_level_count: int = 0,
+        second_level_count: int = 0,
+        build_type: MatrixBuildType = MatrixBuildType.TRINARY,
+) -> Matrix:
+    return Matrix(
+        id=uuid.uuid4(),
+        status=DonateStatus.BASE,
+        build_type=build_type,
+        first_level_count=first_level_count,
+        second_level_count=second_level_count,
+    )
+
+
+def get_matrices_free_with_donates(
+        matrices: list[Matrix],
+        repository_matrix: FakeRepositoryMatrix | None = None,
+        repository_donate: FakeRepositoryDonate | None = None,
+        build_type: MatrixBuildType = MatrixBuildType.TRINARY,
+        matrices_donates_count: dict[uuid.UUID, int] | None = None,
+) -> dict[uuid.UUID, bool]:
+    service = MatrixOccupancyService(
+        repository_matrix=repository_matrix or FakeRepositoryMatrix(),
+        repository_donate=repository_donate or FakeRepositoryDonate(),
+    )
+    return asyncio.run(
+        service.get_matrices_free_with_donates(
+            matrices=matrices,
+            matrix_build_type=build_type,
+            status=DonateStatus.BASE,
+            matrices_donates_count=matrices_donates_count,
+        )
+    )
+
+
+def test_first_level_without_parent():
+    matrix = create_matrix(first_level_count=1)
+
+    for pending_count, is_free in ((0, True), (1, True), (2, False)):
+        result = get_matrices_free_with_donates(
+            [matrix], repository_donate=FakeRepositoryDonate({matrix.id: pending_count})
+        )
+        assert result == {matrix.id: is_free}
+
+
+def test_first_level_binary():
+    matrix = create_matrix(first_level_count=1, build_type=MatrixBuildType.BINARY)
+
+    result = get_matrices_free_with_donates(
+        [matrix],
+        repository_donate=FakeRepositoryDonate({matrix.id: 1}),
+        build_type=MatrixBuildType.BINARY,
+    )
+
+    assert result == {matrix.id: False}
+
+
+def test_first_level_counts_parent_and_previous_siblings_donates():
+    parent_matrix = create_matrix(first_level_count=3, second_level_count=1)
+    full_sibling = create_matrix(first_level_count=3)
+    not_full_sibling = create_matrix(first_level_count=0)
+    matrix = create_matrix(first_level_count=0)
+    repository_matrix = FakeRepositoryMatrix(
+        parent_matrices={matrix.id: parent_matrix},
+        first_level_matrices={parent_matrix.id: [full_sibling, not_full_sibling, matrix]},
+    )
+
+    # свободно мест второго уровня родителя до matrix: 3 * 3 + 3 - (3 + 3 + 0 + 0) = 6,
+    # их занимают донаты в matrix, родителя и не заполненных соседей перед matrix
+    for pending_count, is_free in (
+            ({parent_matrix.id: 2, not_full_sibling.id: 2, full_sibling.id: 5}, True),
+            ({parent_matrix.id: 2, not_full_sibling.id: 2, matrix.id: 1}, True),
+            ({parent_matrix.id: 3, not_full_sibling.id: 2, matrix.id: 1}, False),
+    ):
+        result = get_matrices_free_with_donates(
+            [matrix],
+            repository_matrix=repository_matrix,
+            repository_donate=FakeRepositoryDonate(pending_count),
+        )
+        assert result == {matrix.id: is_free}
+
+
+def test_second_level_counts_not_full_children_donates():
+    matrix = create_matrix(first_level_count=3, second_level_count=5)
+    children = [
+        create_matrix(first_level_count=3),
+        create_matrix(first_level_count=2),
+        create_matrix(first_level_count=0),
+    ]
+    repository_matrix = FakeRepositoryMatrix(first_level_matrices={matrix.id: children})
+
+    # свободно 9 - 5 = 4 места второго уровня
+    for pending_count, is_free in (
+            ({matrix.id: 1, children[1].id: 1, children[2].id: 1, children[0].id: 3}, True),
+            ({matrix.id: 1, children[1].id: 1, children[2].id: 2}, False),
+            ({matrix.id: 4}, False),
+    ):
+        result = get_matrices_free_with_donates(
+            [matrix],
+            repository_matrix=repository_matrix,
+            repository_donate=FakeRepositoryDonate(pending_count),
+        )
+        assert result == {matrix.id: is_free}
+
+
+def test_queries_count_does_not_depend_on_matrices_count():
+    parent_matrix = create_matrix(first_level_count=2)
+    first_level_matrices = [create_matrix(first_level_count=1), create_matrix(first_level_count=2)]
+    second_level_matrices = [create_matrix(first_level_count=3) for _ in range(3)]
+    repository_matrix = FakeRepositoryMatrix(
+        parent_matrices={matrix.id: parent_matrix for matrix in first_level_matrices},
+        first_level_matrices={parent_matrix.id: first_level_matrices},
+    )
+    repository_donate = FakeRepositoryDonate()
+
+    result = get_matrices_free_with_donates(
+        first_level_matrices + second_level_matrices,
+        repository_matrix=repository_matrix,
+        repository_donate=repository_donate,
+    )
+
+    assert set(result) == {matrix.id for matrix in first_level_matrices + second_level_matrices}
+    assert len(repository_matrix.calls) == 2
+    assert len(repository_donate.calls) == 1
+    assert set(repository_donate.calls[0]) == (
+        {matrix.id for matrix in first_level_matrices + second_level_matrices} | {parent_matrix.id}
+    )
+
+
+def test_uses_passed_donates_count():
+    matrix = create_matrix(first_level_count=1)
+    repository_donate = FakeRepositoryDonate({matrix.id: 0})
+
+    result = get_matrices_free_with_donates(
+        [matrix],
+        repository_donate=repository_donate,
+        matrices_donates_count={matrix.id: 2},
+    )
+
+    assert result == {matrix.id: False}
+    assert repository_donate.calls == [[]]
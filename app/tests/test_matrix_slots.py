@@ -0,0 +1,115 @@
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.models.matrix import Matrix, MatrixSlot
+from app.models.telegram_user import MatrixBuildType
+
+
+JOINED_AT = datetime(2024, 1, 1, 12, 0, 0, 123456)
+
+
+def create_matrix(build_type: MatrixBuildType) -> Matrix:
+    return Matrix(
+        id=uuid.uuid4(),
+        build_type=build_type,
+        slots=[],
+        first_level_count=0,
+        second_level_count=0,
+        is_full=False,
+    )
+
+
+def add_first_level_slot(matrix: Matrix) -> MatrixSlot:
+    return matrix.add_first_level_slot(
+        matrix_id=uuid.uuid4(), user_id=1, username="user", joined_at=JOINED_AT
+    )
+
+
+def add_second_level_slot(matrix: Matrix, parent_slot: MatrixSlot) -> MatrixSlot:
+    return matrix.add_second_level_slot(
+        parent_matrix_id=parent_slot.matrix_id,
+        matrix_id=uuid.uuid4(),
+        user_id=2,
+        username=None,
+        joined_at=JOINED_AT,
+    )
+
+
+def test_slot_row_round_trip():
+    slot = MatrixSlot(
+        level=2, position=4, matrix_id=uuid.uuid4(), user_id=7, username=None, joined_at=JOINED_AT
+    )
+    restored_slot = MatrixSlot.from_row(slot.to_row())
+
+    assert restored_slot.to_row() == slot.to_row()
+    assert restored_slot.joined_at == JOINED_AT
+
+
+def test_first_level_positions():
+    matrix = create_matrix(MatrixBuildType.TRINARY)
+
+    slots = [add_first_level_slot(matrix) for _ in range(3)]
+
+    assert [slot.position for slot in slots] == [0, 1, 2]
+    assert [slot.matrix_id for slot in matrix.get_level_slots(level=1)] == [
+        slot.matrix_id for slot in slots
+    ]
+
+
+@pytest.mark.parametrize("build_type, level_length", [
+    (MatrixBuildType.BINARY, 2),
+    (MatrixBuildType.TRINARY, 3),
+])
+def test_second_level_positions(build_type, level_length):
+    matrix = create_matrix(build_type)
+    first_slot, second_slot = add_first_level_slot(matrix), add_first_level_slot(matrix)
+
+    # места второго уровня занимаются не по порядку мест первого уровня
+    second_slot_children = [add_second_level_slot(matrix, second_slot) for _ in range(2)]
+    first_slot_child = add_second_level_slot(matrix, first_slot)
+
+    assert first_slot_child.position == 0
+    assert [slot.position for slot in second_slot_children] == [level_length, level_length + 1]
+    assert [slot.matrix_id for slot in matrix.get_children_slots(second_slot)] == [
+        slot.matrix_id for slot in second_slot_children
+    ]
+    assert matrix.get_slot(first_slot_child.matrix_id).level == 2
+
+
+def test_second_level_slot_requires_first_level_parent():
+    matrix = create_matrix(MatrixBuildType.TRINARY)
+    first_slot = add_first_level_slot(matrix)
+    child_slot = add_second_level_slot(matrix, first_slot)
+
+    with pytest.raises(ValueError):
+        add_second_level_slot(matrix, child_slot)
+
+    with pytest.raises(ValueError):
+        matrix.add_second_level_slot(
+            parent_matrix_id=uuid.uuid4(),
+            matrix_id=uuid.uuid4(),
+            user_id=None,
+            username=None,
+            joined_at=JOINED_AT,
+        )
+
+
+@pytest.mark.parametrize("build_type, level_length", [
+    (MatrixBuildType.BINARY, 2),
+    (MatrixBuildType.TRINARY, 3),
+])
+def test_increase_level_count_sets_is_full(build_type, level_length):
+    matrix = create_matrix(build_type)
+
+    for _ in range(level_length):
+        matrix.increase_level_count(level=1)
+    for _ in range(level_length * level_length - 1):
+        matrix.increase_level_count(level=2)
+    assert not matrix.is_full
+
+    matrix.increase_level_count(level=2)
+    assert matrix.is_full
+    assert matrix.first_level_count == level_length
+    assert matrix.second_level_count == level_length * level_length
@@ -0,0 +1,77 @@
+import importlib.util
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from app.models.matrix import Matrix
+
+
+def load_migration():
+    path = Path(__file__).parents[1] / "migrations" / "versions" / "b791a7f2a641_add_matrix_slots.py"
+    spec = importlib.util.spec_from_file_location("b791a7f2a641_add_matrix_slots", path)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+
+    return migration
+
+
+migration = load_migration()
+
+
+def get_key(username: str | None, matrix_id: str, joined_at: datetime) -> str:
+    return f"{username} {matrix_id} {joined_at}"
+
+
+FIRST_ID, SECOND_ID, CHILD_ID, OTHER_CHILD_ID = (str(uuid.UUID(int=index)) for index in range(1, 5))
+MATRIX_TELEGRAM_USERNAMES = {
+    # первый уровень заполняется в порядке joined_at, а не в порядке ключей JSON
+    get_key("second", SECOND_ID, datetime(2024, 1, 2)): [
+        get_key("child", CHILD_ID, datetime(2024, 1, 3, 10, 0, 0, 500)),
+    ],
+    get_key("first name", FIRST_ID, datetime(2024, 1, 1)): [],
+    get_key(None, OTHER_CHILD_ID, datetime(2024, 1, 4)): [],
+}
+
+
+def test_parse_username_key():
+    assert migration._parse_username_key(get_key("first name", FIRST_ID, datetime(2024, 1, 1))) == (
+        "first name", FIRST_ID, datetime(2024, 1, 1)
+    )
+    assert migration._parse_username_key(get_key(None, FIRST_ID, datetime(2024, 1, 1, 0, 0, 0, 5)))[0] is None
+
+
+def test_build_slots():
+    slots = migration.build_slots(
+        "TRINARY", MATRIX_TELEGRAM_USERNAMES, owners_user_ids={FIRST_ID: 1, CHILD_ID: 3}
+    )
+
+    assert slots == [
+        [1, 0, FIRST_ID, 1, "first name", "2024-01-01T00:00:00"],
+        [1, 1, SECOND_ID, None, "second", "2024-01-02T00:00:00"],
+        [2, 3, CHILD_ID, 3, "child", "2024-01-03T10:00:00.000500"],
+        [1, 2, OTHER_CHILD_ID, None, None, "2024-01-04T00:00:00"],
+    ]
+
+
+def test_build_slots_binary_positions():
+    slots = migration.build_slots("BINARY", MATRIX_TELEGRAM_USERNAMES, owners_user_ids={})
+
+    assert [slot[:2] for slot in slots] == [[1, 0], [1, 1], [2, 2], [1, 2]]
+
+
+def test_slots_are_readable_by_model():
+    matrix = Matrix(
+        id=uuid.uuid4(),
+        slots=migration.build_slots("TRINARY", MATRIX_TELEGRAM_USERNAMES, owners_user_ids={}),
+    )
+
+    first_level_slots = matrix.get_level_slots(level=1)
+    assert [str(slot.matrix_id) for slot in first_level_slots] == [FIRST_ID, SECOND_ID, OTHER_CHILD_ID]
+    assert [str(slot.matrix_id) for slot in matrix.get_children_slots(first_level_slots[1])] == [CHILD_ID]
+
+
+def test_downgrade_restores_matrix_telegram_usernames():
+    for build_type in ("BINARY", "TRINARY"):
+        slots = migration.build_slots(build_type, MATRIX_TELEGRAM_USERNAMES, owners_user_ids={})
+
+        assert migration.build_matrix_telegram_usernames(build_type, slots) == MATRIX_TELEGRAM_USERNAMES
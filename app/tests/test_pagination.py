@@ -0,0 +1,105 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.models.telegram_user import TelegramUser
+from app.utils.pagination import Paginator, QueryPaginator
+
+
+class FakeResult:
+    def __init__(self, value):
+        self._value = value
+
+    def scalar(self):
+        return self._value
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._value
+
+
+class FakeSession:
+    def __init__(self, count: int, page: list):
+        self._results = [count, page]
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(
+            str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+        )
+        return FakeResult(self._results.pop(0))
+
+
+def test_paginator():
+    paginator = Paginator(list(range(7)), page_number=3, per_page=3)
+
+    assert paginator.pages == 3
+    assert paginator.get_page() == [6]
+    assert not paginator.has_next()
+    assert paginator.has_previous()
+
+    paginator = Paginator(list(range(7)), page_number=1, per_page=3)
+    assert paginator.get_page() == [0, 1, 2]
+    assert paginator.has_next()
+    assert not paginator.has_previous()
+
+
+def test_query_paginator_offset():
+    statement = select(TelegramUser).order_by(TelegramUser.created_at)
+    session = FakeSession(count=25, page=["user"])
+
+    paginator = asyncio.run(
+        QueryPaginator(statement, page_number=3, per_page=10).paginate(session)
+    )
+
+    count_statement, page_statement = session.statements
+    assert count_statement.startswith("SELECT count(*) AS count_1")
+    assert "ORDER BY" not in count_statement
+    assert "ORDER BY telegram_users.created_at" in page_statement
+    assert page_statement.endswith("LIMIT 10 OFFSET 20")
+
+    assert paginator.count == 25
+    assert paginator.pages == 3
+    assert paginator.get_page() == ["user"]
+    assert paginator.has_previous()
+    assert not paginator.has_next()
+
+
+def test_query_paginator_keyset():
+    statement = select(TelegramUser).order_by(TelegramUser.user_id.desc())
+    cursor = (datetime(2024, 1, 1), uuid.UUID(int=1))
+    session = FakeSession(count=5, page=[])
+
+    paginator = asyncio.run(
+        QueryPaginator(statement, per_page=2, cursor=cursor).paginate(session)
+    )
+
+    _, page_statement = session.statements
+    assert (
+        "WHERE (telegram_users.created_at, telegram_users.id) > "
+        "('2024-01-01 00:00:00', '00000000-0000-0000-0000-000000000001')"
+    ) in page_statement
+    assert "ORDER BY telegram_users.created_at, telegram_users.id" in page_statement
+    assert "user_id DESC" not in page_statement
+    assert "OFFSET" not in page_statement
+    assert page_statement.endswith("LIMIT 2")
+
+    assert paginator.pages == 3
+    assert paginator.get_cursor() is None
+
+
+def test_query_paginator_cursor():
+    users = [
+        TelegramUser(id=uuid.UUID(int=index), created_at=datetime(2024, 1, index))
+        for index in (1, 2)
+    ]
+    session = FakeSession(count=2, page=users)
+
+    paginator = asyncio.run(QueryPaginator(select(TelegramUser), per_page=2).paginate(session))
+
+    assert paginator.get_cursor() == (datetime(2024, 1, 2), uuid.UUID(int=2))
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from app.utils import throttling
+from app.utils.throttling import MemoryThrottlingBackend, RedisThrottlingBackend, ThrottlingRate
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeRedis:
+    def __init__(self):
+        self.calls = []
+
+    def register_script(self, script):
+        async def run_script(keys, args):
+            self.calls.append((keys, args))
+            return 1
+
+        return run_script
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(throttling.time, "monotonic", clock)
+    monkeypatch.setattr(throttling.time, "time", clock)
+    return clock
+
+
+def hit(backend, key: str, rate: ThrottlingRate) -> bool:
+    return asyncio.run(backend.hit(key, rate))
+
+
+def test_memory_backend_limit_and_window(clock):
+    backend = MemoryThrottlingBackend(maxsize=10)
+    rate = ThrottlingRate(limit=2, window_seconds=1)
+
+    assert hit(backend, "user", rate)
+    clock.now += 0.5
+    assert hit(backend, "user", rate)
+    assert not hit(backend, "user", rate)
+    assert hit(backend, "other_user", rate)
+
+    # первое событие вышло из окна, второе еще нет
+    clock.now += 0.5
+    assert hit(backend, "user", rate)
+    assert not hit(backend, "user", rate)
+
+
+def test_memory_backend_removes_expired_keys(clock):
+    backend = MemoryThrottlingBackend(maxsize=10)
+    rate = ThrottlingRate(limit=1, window_seconds=1)
+
+    hit(backend, "first", rate)
+    hit(backend, "second", rate)
+    assert len(backend) == 2
+
+    clock.now += 1
+    hit(backend, "third", rate)
+    assert len(backend) == 1
+
+
+def test_memory_backend_maxsize(clock):
+    backend = MemoryThrottlingBackend(maxsize=2)
+    rate = ThrottlingRate(limit=1, window_seconds=60)
+
+    hit(backend, "first", rate)
+    hit(backend, "second", rate)
+    hit(backend, "third", rate)
+
+    assert len(backend) == 2
+    # вытеснен давно не использованный ключ, его лимит сброшен
+    assert hit(backend, "first", rate)
+    assert not hit(backend, "third", rate)
+
+
+def test_redis_backend_script_arguments(clock):
+    redis = FakeRedis()
+    backend = RedisThrottlingBackend(redis=redis)
+
+    assert hit(backend, "user", ThrottlingRate(limit=3, window_seconds=0.5))
+
+    (keys, args), = redis.calls
+    assert keys == ["throttling:user"]
+    assert args[:3] == [1000000, 500, 3]
+    assert args[3].startswith("1000000:")
@@ -0,0 +1,83 @@
+import pytest
+
+from app.models.telegram_user import DonateStatus, MatrixBuildType
+from app.models.tiers import (
+    DONATE_VALUES,
+    STATUSES,
+    get_donate_value,
+    get_next_status,
+    get_previous_status,
+    get_rank,
+    get_status_by_donate_value,
+    get_statuses_from,
+    is_status_higher,
+)
+
+
+def test_statuses_exclude_not_active():
+    assert DonateStatus.NOT_ACTIVE not in STATUSES
+    assert STATUSES[0] == DonateStatus.BASE
+    assert STATUSES[-1] == DonateStatus.BRILLIANT
+
+
+@pytest.mark.parametrize(
+    "matrix_build_type, values",
+    [
+        (MatrixBuildType.BINARY, [10, 20, 40, 80, 160, 320, 640]),
+        (MatrixBuildType.TRINARY, [10, 30, 100, 300, 1000, 3000, 10000]),
+    ],
+)
+def test_donate_values(matrix_build_type, values):
+    assert [get_donate_value(status, matrix_build_type) for status in STATUSES] == values
+    assert get_donate_value(DonateStatus.NOT_ACTIVE, matrix_build_type) is None
+
+
+def test_get_donate_value_defaults_to_trinary():
+    assert get_donate_value(DonateStatus.BRONZE) == 30
+
+
+@pytest.mark.parametrize("matrix_build_type", list(MatrixBuildType))
+def test_status_by_donate_value_is_inverse(matrix_build_type):
+    for status, value in DONATE_VALUES[matrix_build_type].items():
+        assert get_status_by_donate_value(value, matrix_build_type) == status
+
+
+def test_status_by_donate_value_without_build_type():
+    assert get_status_by_donate_value(10) == DonateStatus.BASE
+    assert get_status_by_donate_value(20) == DonateStatus.BRONZE
+    assert get_status_by_donate_value(30) == DonateStatus.BRONZE
+    assert get_status_by_donate_value(10000) == DonateStatus.BRILLIANT
+    assert get_status_by_donate_value(15) is None
+
+
+def test_status_by_donate_value_of_other_build_type():
+    assert get_status_by_donate_value(30, MatrixBuildType.BINARY) is None
+    assert get_status_by_donate_value(20, MatrixBuildType.TRINARY) is None
+
+
+def test_ranks():
+    assert get_rank(DonateStatus.NOT_ACTIVE) == -1
+    assert [get_rank(status) for status in STATUSES] == list(range(len(STATUSES)))
+
+
+def test_next_and_previous_status():
+    assert get_next_status(DonateStatus.NOT_ACTIVE) == DonateStatus.BASE
+    assert get_next_status(DonateStatus.BASE) == DonateStatus.BRONZE
+    assert get_next_status(DonateStatus.BRILLIANT) is None
+
+    assert get_previous_status(DonateStatus.BRONZE) == DonateStatus.BASE
+    assert get_previous_status(DonateStatus.BASE) is None
+    assert get_previous_status(DonateStatus.NOT_ACTIVE) is None
+
+
+def test_statuses_from():
+    assert get_statuses_from(DonateStatus.NOT_ACTIVE) == STATUSES
+    assert get_statuses_from(DonateStatus.BASE) == STATUSES
+    assert get_statuses_from(DonateStatus.BRILLIANT) == (DonateStatus.BRILLIANT,)
+
+
+def test_is_status_higher():
+    assert is_status_higher(DonateStatus.BRONZE, DonateStatus.BASE)
+    assert is_status_higher(DonateStatus.BASE, DonateStatus.NOT_ACTIVE)
+    assert not is_status_higher(DonateStatus.BASE, DonateStatus.BASE)
+    assert not is_status_higher(DonateStatus.BASE, DonateStatus.BRONZE)